@@ -0,0 +1,359 @@
+"""
+Vectorized (NumPy) versions of the analytics views.
+
+The ranking fact table is loaded once into columnar arrays and every view is computed with
+group-bys over integer keys. Each function returns (columns, rows) with the same columns and
+order as the SQL view of the same name, so export.py can use either engine.
+"""
+import sqlite3
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+UNRANKED = 26  # rank used for "not ranked that week", same as the views
+
+Table = Tuple[List[str], List[tuple]]
+
+
+class RankingFrame:
+    """ranking joined to its dimensions, one NumPy array per column."""
+
+    LOAD_QUERY = """
+        SELECT
+            r.ranking_pk, r.ranking_poll_fk, r.ranking_week_fk, r.ranking_team_fk,
+            s.season_year, w.week_season_type_fk, w.week_number,
+            t.team_school_fk,
+            r.ranking_current_rank, r.ranking_points, r.ranking_first_place_votes,
+            r.ranking_record_wins, r.ranking_record_losses, r.ranking_trend
+        FROM ranking r
+        JOIN poll p        ON r.ranking_poll_fk = p.poll_pk
+        JOIN week w        ON r.ranking_week_fk = w.week_pk
+        JOIN season s      ON w.week_season_fk = s.season_pk
+        JOIN season_type st ON w.week_season_type_fk = st.season_type_pk
+        JOIN team t        ON r.ranking_team_fk = t.team_pk
+        JOIN school sc     ON t.team_school_fk = sc.school_pk
+    """
+    INT_COLUMNS = ["ranking_pk", "poll_pk", "week_pk", "team_pk", "season_year", "season_type_pk",
+                   "week_number", "school_pk", "rank"]
+    # nullable in the schema, kept as float64 with NaN for NULL
+    NULLABLE_COLUMNS = ["points", "first_place_votes", "record_wins", "record_losses", "trend"]
+
+    def __init__(self, columns: Dict[str, np.ndarray], poll_names: Dict[int, str], season_type_names: Dict[int, str],
+                 team_names: Dict[int, str], team_abbreviations: Dict[int, str], school_names: Dict[int, str]):
+        self.columns = columns
+        self.poll_names = poll_names
+        self.season_type_names = season_type_names
+        self.team_names = team_names
+        self.team_abbreviations = team_abbreviations
+        self.school_names = school_names
+        for name, values in columns.items():
+            setattr(self, name, values)
+
+    def __len__(self):
+        return len(self.ranking_pk)
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection) -> "RankingFrame":
+        rows = conn.execute(cls.LOAD_QUERY).fetchall()
+        names = cls.INT_COLUMNS + cls.NULLABLE_COLUMNS
+        if rows:
+            cols = list(zip(*rows))
+        else:
+            cols = [()] * len(names)
+        columns = {}
+        for name, values in zip(names, cols):
+            if name in cls.NULLABLE_COLUMNS:
+                columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                columns[name] = np.array(values, dtype=np.int64)
+
+        def lookup(query):
+            return dict(conn.execute(query).fetchall())
+
+        return cls(
+            columns,
+            poll_names=lookup("SELECT poll_pk, poll_name FROM poll"),
+            season_type_names=lookup("SELECT season_type_pk, season_type_name FROM season_type"),
+            team_names=lookup("SELECT team_pk, team_name FROM team"),
+            team_abbreviations=lookup("SELECT team_pk, team_abbreviation FROM team"),
+            school_names=lookup("SELECT school_pk, school_name FROM school"),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snap) -> "RankingFrame":
+        """Same frame from a snapshot.Snapshot: dimension columns gathered from the mapped arrays, no SQL."""
+        def row_of(table: str, pks: np.ndarray) -> np.ndarray:
+            return np.searchsorted(snap.column(table, f"{table}_pk"), pks)   # snapshot tables are sorted by pk
+
+        week = row_of("week", snap.column("ranking", "ranking_week_fk"))
+        team = row_of("team", snap.column("ranking", "ranking_team_fk"))
+        columns = {
+            "ranking_pk": snap.column("ranking", "ranking_pk"),
+            "poll_pk": snap.column("ranking", "ranking_poll_fk"),
+            "week_pk": snap.column("ranking", "ranking_week_fk"),
+            "team_pk": snap.column("ranking", "ranking_team_fk"),
+            "season_year": snap.column("week", "season_year")[week],
+            "season_type_pk": snap.column("week", "week_season_type_fk")[week],
+            "week_number": snap.column("week", "week_number")[week],
+            "school_pk": snap.column("team", "team_school_fk")[team],
+            "rank": snap.column("ranking", "ranking_current_rank"),
+        }
+        columns = {name: values.astype(np.int64) for name, values in columns.items()}
+        for name in cls.NULLABLE_COLUMNS:
+            source = f"ranking_{name}"
+            values = snap.column("ranking", source).astype(np.float64)
+            values[snap.null_mask("ranking", source)] = np.nan
+            columns[name] = values
+
+        return cls(
+            columns,
+            poll_names=snap.lookup("poll", "poll_name"),
+            season_type_names=snap.lookup("season_type", "season_type_name"),
+            team_names=snap.lookup("team", "team_name"),
+            team_abbreviations=snap.lookup("team", "team_abbreviation"),
+            school_names=snap.lookup("school", "school_name"),
+        )
+
+    def name_order(self, codes: np.ndarray, names: Dict[int, str]) -> np.ndarray:
+        """Sort position of each code's name, so string ORDER BYs become integer sorts."""
+        ordered = sorted(names, key=lambda k: names[k])
+        position = np.zeros(max(names, default=0) + 1, dtype=np.int64)
+        position[ordered] = np.arange(len(ordered))
+        return position[codes]
+
+
+# ---------------- Helpers ----------------
+
+def group_by(*keys: np.ndarray) -> Tuple[List[np.ndarray], np.ndarray]:
+    """Unique key combinations (one array per key, sorted) and each row's group index."""
+    if len(keys[0]) == 0:
+        return [k[:0] for k in keys], np.zeros(0, dtype=np.int64)
+    stacked = np.column_stack(keys)
+    unique, inverse = np.unique(stacked, axis=0, return_inverse=True)
+    return [unique[:, i] for i in range(len(keys))], inverse.reshape(-1)
+
+
+def group_min(values: np.ndarray, inverse: np.ndarray, n: int, initial) -> np.ndarray:
+    out = np.full(n, initial, dtype=values.dtype)
+    np.minimum.at(out, inverse, values)
+    return out
+
+
+def group_max(values: np.ndarray, inverse: np.ndarray, n: int, initial) -> np.ndarray:
+    out = np.full(n, initial, dtype=values.dtype)
+    np.maximum.at(out, inverse, values)
+    return out
+
+
+def sort_rows(*keys: np.ndarray) -> np.ndarray:
+    """
+    Row order for ORDER BY keys[0], keys[1], ... (negate a key for DESC). Every view ends its ORDER BY
+    on a unique tie-break (sql/16_*, sql/18_*), and the last key here must be the same one.
+    """
+    return np.lexsort(tuple(reversed(keys)))
+
+
+def to_table(columns: List[str], arrays: List, order: np.ndarray) -> Table:
+    """Materialize arrays (or lists of Python values) as rows of plain Python values."""
+    ordered = []
+    for values in arrays:
+        if isinstance(values, np.ndarray):
+            ordered.append(values[order].tolist())
+        else:
+            ordered.append([values[i] for i in order])
+    return columns, list(zip(*ordered)) if ordered and len(order) else []
+
+
+def nullable(values: np.ndarray) -> list:
+    return [None if np.isnan(v) else int(v) for v in values]
+
+
+def status(ranks: np.ndarray) -> list:
+    return ["Unranked" if r == UNRANKED else "Ranked" for r in ranks.tolist()]
+
+
+# ---------------- Team seasons ----------------
+
+class TeamSeasons:
+    """Per (poll, season, team): best, start and end rank. The engine equivalent of team_season."""
+
+    def __init__(self, frame: RankingFrame):
+        (self.poll_pk, self.season_year, self.team_pk), inverse = group_by(
+            frame.poll_pk, frame.season_year, frame.team_pk)
+        n = len(self.poll_pk)
+
+        # first/last week of each poll season, by week_pk like the views
+        (_, _), season_inverse = group_by(frame.poll_pk, frame.season_year)
+        n_seasons = season_inverse.max() + 1 if len(season_inverse) else 0
+        first_week = group_min(frame.week_pk, season_inverse, n_seasons, np.iinfo(np.int64).max)[season_inverse]
+        last_week = group_max(frame.week_pk, season_inverse, n_seasons, -1)[season_inverse]
+
+        self.best_rank = group_min(frame.rank, inverse, n, np.iinfo(np.int64).max)
+        self.start_rank = np.full(n, UNRANKED, dtype=np.int64)
+        at_first = frame.week_pk == first_week
+        np.minimum.at(self.start_rank, inverse[at_first], frame.rank[at_first])
+        self.end_rank = np.full(n, UNRANKED, dtype=np.int64)
+        at_last = frame.week_pk == last_week
+        np.minimum.at(self.end_rank, inverse[at_last], frame.rank[at_last])
+
+        self.frame = frame
+
+    def poll_name_order(self):
+        return self.frame.name_order(self.poll_pk, self.frame.poll_names)
+
+
+# ---------------- Views ----------------
+
+def rankings(frame: RankingFrame) -> Table:
+    """v_team_rankings"""
+    f = frame
+    order = sort_rows(
+        -f.name_order(f.poll_pk, f.poll_names),
+        f.season_year,
+        -f.name_order(f.season_type_pk, f.season_type_names),
+        f.week_number,
+        f.rank,
+        f.ranking_pk,   # tie-break
+    )
+    poll_names = [f.poll_names[k] for k in f.poll_pk.tolist()]
+    type_names = [f.season_type_names[k] for k in f.season_type_pk.tolist()]
+    team_names = [f.team_names[k] for k in f.team_pk.tolist()]
+    abbreviations = [f.team_abbreviations[k] for k in f.team_pk.tolist()]
+    school_names = [f.school_names[k] for k in f.school_pk.tolist()]
+    return to_table(
+        ["ranking_pk", "ranking_poll_fk", "ranking_week_fk", "ranking_team_fk",
+         "season_year", "season_type_name", "week_pk", "week_number",
+         "poll_pk", "poll_name", "school_pk", "school_name",
+         "team_pk", "team_name", "team_abbreviation",
+         "ranking_current_rank", "ranking_points", "ranking_first_place_votes",
+         "ranking_record_wins", "ranking_record_losses", "ranking_trend"],
+        [f.ranking_pk, f.poll_pk, f.week_pk, f.team_pk,
+         f.season_year, type_names, f.week_pk, f.week_number,
+         f.poll_pk, poll_names, f.school_pk, school_names,
+         f.team_pk, team_names, abbreviations,
+         f.rank, nullable(f.points), nullable(f.first_place_votes),
+         nullable(f.record_wins), nullable(f.record_losses), nullable(f.trend)],
+        order,
+    )
+
+
+def alltime_summary(frame: RankingFrame) -> Table:
+    """v_team_alltime_summary"""
+    f = frame
+    # best rank per (poll, team, week), so duplicated rankings count once like COUNT(DISTINCT week)
+    (poll_pk, team_pk, _), week_inverse = group_by(f.poll_pk, f.team_pk, f.week_pk)
+    week_rank = group_min(f.rank, week_inverse, len(poll_pk), np.iinfo(np.int64).max)
+
+    (poll_pk, team_pk), inverse = group_by(poll_pk, team_pk)
+    n = len(poll_pk)
+    total = np.bincount(inverse, minlength=n)
+    at_one = np.bincount(inverse, weights=week_rank == 1, minlength=n).astype(np.int64)
+    top_3 = np.bincount(inverse, weights=week_rank <= 3, minlength=n).astype(np.int64)
+    top_10 = np.bincount(inverse, weights=week_rank <= 10, minlength=n).astype(np.int64)
+
+    order = sort_rows(f.name_order(poll_pk, f.poll_names), -total, team_pk)   # tie-break by team_pk
+    return to_table(
+        ["poll_name", "team_pk", "team_name", "team_abbreviation",
+         "total_weeks_ranked", "weeks_at_number_one", "weeks_in_top_3", "weeks_in_top_10"],
+        [[f.poll_names[k] for k in poll_pk.tolist()], team_pk,
+         [f.team_names[k] for k in team_pk.tolist()], [f.team_abbreviations[k] for k in team_pk.tolist()],
+         total, at_one, top_3, top_10],
+        order,
+    )
+
+
+def collapse_index(frame: RankingFrame, seasons: Optional[TeamSeasons] = None) -> Table:
+    """v_team_collapse_index"""
+    ts = seasons or TeamSeasons(frame)
+    f = frame
+    collapse = ts.end_rank - ts.best_rank
+    order = sort_rows(-ts.poll_name_order(), ts.season_year, -collapse, ts.team_pk)   # tie-break by team_pk
+    return to_table(
+        ["season_year", "poll_name", "team_pk", "team_name", "team_abbreviation",
+         "best_rank", "final_rank", "collapse_index", "final_status"],
+        [ts.season_year, [f.poll_names[k] for k in ts.poll_pk.tolist()], ts.team_pk,
+         [f.team_names[k] for k in ts.team_pk.tolist()], [f.team_abbreviations[k] for k in ts.team_pk.tolist()],
+         ts.best_rank, ts.end_rank, collapse, status(ts.end_rank)],
+        order,
+    )
+
+
+def overrated_index(frame: RankingFrame, seasons: Optional[TeamSeasons] = None) -> Table:
+    """v_team_overrated_index"""
+    ts = seasons or TeamSeasons(frame)
+    f = frame
+    overrated = ts.end_rank - ts.start_rank
+    # avoid teams that slip in the rankings then drop mid-season
+    keep = ~((ts.start_rank == UNRANKED) & (ts.end_rank == UNRANKED))
+    order = sort_rows(ts.poll_name_order(), ts.season_year, ts.start_rank, ts.team_pk)   # tie-break by team_pk
+    order = order[keep[order]]
+    return to_table(
+        ["poll_name", "season_year", "team_pk", "team_name",
+         "start_rank", "starting_status", "end_rank", "ending_status", "overrated_index"],
+        [[f.poll_names[k] for k in ts.poll_pk.tolist()], ts.season_year, ts.team_pk,
+         [f.team_names[k] for k in ts.team_pk.tolist()],
+         ts.start_rank, status(ts.start_rank), ts.end_rank, status(ts.end_rank), overrated],
+        order,
+    )
+
+
+def index_stats(table: Table, index_column: str, since_year: Optional[int] = None, std: bool = False) -> Table:
+    """
+    Per (poll_name, team_name) avg/min/max of an index column from collapse_index() or overrated_index(),
+    like the *_stats views. since_year and std give the last-N-years and standard deviation variants
+    that are commented out in the SQL.
+    """
+    columns, rows = table
+    poll_col, team_col, year_col, value_col = (columns.index(c) for c in
+                                               ("poll_name", "team_name", "season_year", index_column))
+    if since_year is not None:
+        rows = [r for r in rows if r[year_col] >= since_year]
+
+    poll_names = sorted({r[poll_col] for r in rows})
+    team_names = sorted({r[team_col] for r in rows})
+    poll_code = {name: i for i, name in enumerate(poll_names)}
+    team_code = {name: i for i, name in enumerate(team_names)}
+    polls = np.array([poll_code[r[poll_col]] for r in rows], dtype=np.int64)
+    teams = np.array([team_code[r[team_col]] for r in rows], dtype=np.int64)
+    values = np.array([r[value_col] for r in rows], dtype=np.int64)
+
+    (poll_key, team_key), inverse = group_by(polls, teams) if len(rows) else ([polls, teams], polls)
+    n = len(poll_key)
+    count = np.bincount(inverse, minlength=n)
+    total = np.bincount(inverse, weights=values, minlength=n)
+    avg = total / np.maximum(count, 1)
+    minimum = group_min(values, inverse, n, np.iinfo(np.int64).max)
+    maximum = group_max(values, inverse, n, np.iinfo(np.int64).min)
+
+    name = index_column
+    out_columns = ["poll_name", "team_name", f"avg_{name}", f"min_{name}", f"max_{name}", "seasons_counted"]
+    arrays = [[poll_names[k] for k in poll_key.tolist()], [team_names[k] for k in team_key.tolist()],
+              avg, minimum, maximum, count]
+    if std:
+        squares = np.bincount(inverse, weights=values.astype(np.float64) ** 2, minlength=n)
+        out_columns.insert(3, f"std_{name}")
+        arrays.insert(3, np.sqrt(np.maximum(squares / np.maximum(count, 1) - avg ** 2, 0)))
+
+    order = sort_rows(-poll_key, -avg, -team_key)   # tie-break by team name DESC
+    return to_table(out_columns, arrays, order)
+
+
+def collapse_index_stats(frame: RankingFrame, seasons: Optional[TeamSeasons] = None, **kwargs) -> Table:
+    """v_team_collapse_index_stats"""
+    return index_stats(collapse_index(frame, seasons), "collapse_index", **kwargs)
+
+
+def overrated_index_stats(frame: RankingFrame, seasons: Optional[TeamSeasons] = None, **kwargs) -> Table:
+    """v_team_overrated_index_stats"""
+    return index_stats(overrated_index(frame, seasons), "overrated_index", **kwargs)
+
+
+# view name -> engine function, for export.py
+VIEWS: Dict[str, Callable[..., Table]] = {
+    "v_team_rankings": rankings,
+    "v_team_alltime_summary": alltime_summary,
+    "v_team_overrated_index": overrated_index,
+    "v_team_overrated_index_stats": overrated_index_stats,
+    "v_team_collapse_index": collapse_index,
+    "v_team_collapse_index_stats": collapse_index_stats,
+}
@@ -0,0 +1,317 @@
+"""
+Local read-only HTTP query API over college.db.
+
+Serves the analytics views with filters and pagination, in the same columnar table layout as the
+export.py files (tables.py: column names once, one value array per column, dictionary-encoded strings):
+
+    python database/api.py --port 8000
+    curl 'http://127.0.0.1:8000/rankings?poll=1&season=2024&week=5'
+    curl 'http://127.0.0.1:8000/rankings?team=333&limit=50&offset=50'
+    curl 'http://127.0.0.1:8000/overrated?poll=1&season=2024'
+
+Queries run on a small pool of read-only connections. Responses are kept in an LRU cache that is
+dropped whenever another connection commits to the db (PRAGMA data_version), so an ingest is
+visible on the next request. Every response has a content ETag (If-None-Match gets a 304) and is
+gzipped for clients that accept it. Further pages are linked in a `Link: <...>; rel="next"` header.
+"""
+import gzip
+import hashlib
+import io
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from metrics import METRICS
+from tables import write_table
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+DB_PATH = BASE_DIR / "data" / "college.db"
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_INTEGER = 2 ** 63 - 1   # SQLite integers are 64-bit signed
+GZIP_MIN_BYTES = 1024   # smaller bodies are not worth the CPU
+
+# filter parameter -> SQL condition on the view; every value is an integer
+POLL_BY_NAME = "poll_name = (SELECT poll_name FROM poll WHERE poll_pk = ?)"
+SEASON = "season_year = ?"
+TEAM = "team_pk = ?"
+# the season's week_pks, so a per-week query seeks ix_ranking_poll_week_team on (poll, week) instead of
+# reading every ranking of the poll and filtering on season_year
+RANKINGS_SEASON = ("ranking_week_fk IN (SELECT week_pk FROM week WHERE week_season_fk = "
+                   "(SELECT season_pk FROM season WHERE season_year = ?))")
+
+# endpoint -> (view, {filter parameter: condition})
+ENDPOINTS: Dict[str, Tuple[str, Dict[str, str]]] = {
+    "/rankings": ("v_team_rankings", {
+        "poll": "poll_pk = ?", "season": RANKINGS_SEASON, "team": TEAM, "week": "week_number = ?",
+        "season_type": "ranking_week_fk IN (SELECT week_pk FROM week WHERE week_season_type_fk = ?)",
+    }),
+    "/alltime_summary": ("v_team_alltime_summary", {"poll": POLL_BY_NAME, "team": TEAM}),
+    "/overrated": ("v_team_overrated_index", {"poll": POLL_BY_NAME, "season": SEASON, "team": TEAM}),
+    "/overrated_stats": ("v_team_overrated_index_stats", {"poll": POLL_BY_NAME}),
+    "/collapse": ("v_team_collapse_index", {"poll": POLL_BY_NAME, "season": SEASON, "team": TEAM}),
+    "/collapse_stats": ("v_team_collapse_index_stats", {"poll": POLL_BY_NAME}),
+    "/polls": ("poll", {}),
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def build_query(path: str, params: Dict[str, str]) -> Tuple[str, List[int], int, int]:
+    """(sql, args, limit, offset) for an endpoint; raises BadRequest on unknown filters or bad values."""
+    view, filters = ENDPOINTS[path]
+    params = dict(params)
+
+    def integer(name: str, value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise BadRequest(f"{name} must be an integer, got {value!r}") from None
+        if not -MAX_INTEGER <= number <= MAX_INTEGER:
+            raise BadRequest(f"{name} is out of range, got {value!r}")
+        return number
+
+    limit = integer("limit", params.pop("limit", str(DEFAULT_LIMIT)))
+    offset = integer("offset", params.pop("offset", "0"))
+    if not 0 < limit <= MAX_LIMIT or offset < 0:
+        raise BadRequest(f"limit must be 1-{MAX_LIMIT} and offset non-negative")
+    unknown = set(params) - set(filters)
+    if unknown:
+        raise BadRequest(f"unknown filter(s) {', '.join(sorted(unknown))} for {path}; "
+                         f"supported: {', '.join(filters) or 'none'}")
+
+    conditions, args = [], []
+    for name in filters:   # fixed order, so equal queries give equal SQL
+        if name in params:
+            conditions.append(filters[name])
+            args.append(integer(name, params[name]))
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    # one extra row tells whether there is a next page
+    return f"SELECT * FROM {view}{where} LIMIT ? OFFSET ?", args + [limit + 1, offset], limit, offset
+
+
+class ConnectionPool:
+    """Fixed set of read-only connections shared by the request threads."""
+    def __init__(self, db_path: Path, size: int = 4):
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            self._idle.put(conn)
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for _ in range(self.size):
+            self._idle.get().close()
+
+
+class Response:
+    __slots__ = ("body", "etag", "link", "_gzipped")
+
+    def __init__(self, body: bytes, link: Optional[str] = None):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.link = link
+        self._gzipped = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:   # compressed on first use, then kept with the cached response
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+class ResponseLRU:
+    """LRU of rendered responses, emptied when the database changes."""
+    def __init__(self, db_path: Path, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Response]" = OrderedDict()
+        self._lock = threading.Lock()
+        # data_version of a connection changes when any *other* connection commits
+        self._watcher = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True,
+                                        check_same_thread=False)
+        self._version = self._data_version()
+
+    def _data_version(self) -> int:
+        return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def get(self, key: str) -> Tuple[Optional[Response], int]:
+        """(cached response or None, db version to pass back to put)."""
+        with self._lock:
+            version = self._data_version()
+            if version != self._version:
+                self._version = version
+                self._entries.clear()
+                METRICS.inc("api_cache_invalidations_total")
+                return None, version
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response, version
+
+    def put(self, key: str, response: Response, version: int):
+        with self._lock:
+            if version != self._version:
+                return   # the db changed while the response was built, it may be stale
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def close(self):
+        self._watcher.close()
+
+
+class QueryAPI:
+    def __init__(self, db_path: Path = DB_PATH, pool_size: int = 4, cache_entries: int = 1024):
+        if not Path(db_path).exists():
+            raise FileNotFoundError(f"No database at {db_path}, run init_db.py first")
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.cache = ResponseLRU(db_path, cache_entries)
+
+    def close(self):
+        self.pool.close()
+        self.cache.close()
+
+    def respond(self, target: str) -> Tuple[str, Response]:
+        """(cache result, response) for a request target; raises KeyError for unknown paths, BadRequest."""
+        parts = urlsplit(target)
+        if parts.path not in ENDPOINTS:
+            raise KeyError(parts.path)
+        params = dict(parse_qsl(parts.query))
+        key = parts.path + "?" + urlencode(sorted(params.items()))
+        response, version = self.cache.get(key)
+        if response is not None:
+            return "hit", response
+
+        sql, args, limit, offset = build_query(parts.path, params)
+        with self.pool.connection() as conn:
+            cursor = conn.execute(sql, args)
+            cols = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        link = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            link = f'<{parts.path}?{urlencode({**params, "offset": offset + limit, "limit": limit})}>; rel="next"'
+        out = io.StringIO()
+        write_table(out, cols, rows)
+        response = Response(out.getvalue().encode("utf-8"), link)
+        self.cache.put(key, response, version)
+        return "miss", response
+
+    def handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive
+            disable_nagle_algorithm = True   # headers and body are separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status: int, payload: dict):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                start = time.perf_counter()
+                endpoint = urlsplit(self.path).path
+                try:
+                    result, response = api.respond(self.path)
+                except KeyError:
+                    endpoint = "unknown"
+                    status = 404
+                    self.send_json(status, {"error": f"unknown endpoint, try one of {', '.join(ENDPOINTS)}"})
+                except BadRequest as e:
+                    status = 400
+                    self.send_json(status, {"error": str(e)})
+                except Exception as e:
+                    # e.g. a locked or missing database: answer instead of dropping the connection
+                    logging.exception(f"Failed to serve {self.path}")
+                    status = 500
+                    self.send_json(status, {"error": f"internal error: {type(e).__name__}"})
+                else:
+                    METRICS.inc("api_cache_total", result=result)
+                    status = self.send_cached(response)
+                METRICS.inc("api_requests_total", endpoint=endpoint, status=status)
+                METRICS.observe("api_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+
+            def send_cached(self, response: Response) -> int:
+                if response.etag in self.headers.get("If-None-Match", ""):
+                    self.send_response(304)
+                    self.send_header("ETag", response.etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return 304
+                body = response.body
+                gzipped = len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+                if gzipped:
+                    body = response.gzipped
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", response.etag)
+                self.send_header("Vary", "Accept-Encoding")
+                self.send_header("Cache-Control", "no-cache")   # revalidate with the ETag
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                if response.link:
+                    self.send_header("Link", response.link)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return 200
+
+        return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, db_path: Path = DB_PATH, pool_size: int = 4,
+          cache_entries: int = 1024):
+    api = QueryAPI(db_path, pool_size, cache_entries)
+    httpd = ThreadingHTTPServer((host, port), api.handler())
+    httpd.daemon_threads = True
+    print(f"Serving {db_path} on http://{host}:{httpd.server_address[1]} ({', '.join(ENDPOINTS)})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        api.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the rankings database as a read-only JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--pool-size", type=int, default=4, help="read-only sqlite connections (default: 4)")
+    parser.add_argument("--cache-entries", type=int, default=1024, help="responses kept in the LRU (default: 1024)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.db, args.pool_size, args.cache_entries)
@@ -1,73 +1,39 @@
+import asyncio
+import hashlib
 import sqlite3
-import sys
+from contextlib import contextmanager
 
-import requests
 import re
+import json
 import logging
+import queue
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Set, Tuple
 import time
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from cache import ResponseCache, current_season_year
+from metrics import COUNT_BUCKETS, METRICS
+from init_db import sql_files
+from summaries import refresh_verified
 
-from mappings import TEAM_ABBREVIATION_MAP
+if TYPE_CHECKING:
+    from espn import ESPNClient   # imported where a client is built: requests is slow to import
 
 # ---------------- Config ----------------
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DB_PATH = PROJECT_ROOT / "database" / "data" / "college.db"
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+# scheme and host of a $ref: a replay server (fixtures.py) rewrites them to its own address and port
+REF_ORIGIN = re.compile(r"https?://[^/\"]+")
 
-# ---------------- ESPN Client ----------------
-class ESPNClient:
-    BASE_URL = "https://sports.core.api.espn.com/v2/sports/football/leagues/college-football"
 
-    def get_request(self, url, sleep_time=1, tries=0):
-        if tries > 10:
-            print("Tries exceeded 10.")
-            sys.exit(1)
-
-        try:
-            resp = requests.get(url)
-            resp.raise_for_status()
-            return resp
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP Error Occured: {e}")
-            print("Sleeping")
-            time.sleep(sleep_time)
-            print("Done")
-            return self.get_request(url, sleep_time=sleep_time*2, tries=tries+1)
-
-    @staticmethod
-    def get_json(url: str) -> Dict[str, Any]:
-        resp = requests.get(url)
-        resp.raise_for_status()
-        return resp.json()
-
-    def get_weeks(self, year: int, poll_id: int) -> List[Dict[str, Any]]:
-        """Fetch all weeks for a given year & poll."""
-        listing_url = f"{self.BASE_URL}/seasons/{year}/rankings/{poll_id}?lang=en&region=us"
-        listing = self.get_json(listing_url)
-
-        weeks = []
-        for r in listing.get("rankings", []):
-            ref = r.get("$ref", "")
-            m = re.search(r"/types/(\d+)/weeks/(\d+)/", ref)
-            if m:
-                weeks.append({
-                    "seasonType": int(m.group(1)),
-                    "week": int(m.group(2)),
-                    "url": ref
-                })
-        return weeks
-
-    def get_poll_data(self, url: str) -> Dict[str, Any]:
-        return self.get_json(url)
-
-    def get_team_data(self, ref: str) -> Dict[str, Any]:
-        return self.get_json(ref)
+def ranks_hash(ranks: List[Dict[str, Any]]) -> str:
+    """sha256 of a week's ranks, with the $ref hosts left out so any server of the same data hashes alike."""
+    return hashlib.sha256(REF_ORIGIN.sub("", json.dumps(ranks, sort_keys=True)).encode()).hexdigest()
 
 
 def normalize_trend(t: str) -> int:
@@ -79,12 +45,68 @@ def normalize_trend(t: str) -> int:
 
 # ---------------- Database Wrapper ----------------
 class Database:
-    def __init__(self, db_path: Path):
-        self.conn = sqlite3.connect(db_path)
+    # lookup tables preloaded into memory by preload_lookups(), keyed by their non-pk column values
+    LOOKUP_TABLES = ("season", "week", "school", "team")
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    def __init__(self, db_path: Path, synchronous: str = "NORMAL", cache_size: int = -64000,
+                 check_same_thread: bool = True):
+        # both go into PRAGMA statements, which take no parameters
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {', '.join(self.SYNCHRONOUS_MODES)}, got {synchronous!r}")
+        cache_size = int(cache_size)
+        self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+        # WAL + synchronous=NORMAL only syncs at checkpoints; cache_size < 0 is in KiB
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(f"PRAGMA synchronous = {synchronous}")
+        self.conn.execute(f"PRAGMA cache_size = {cache_size}")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self._in_transaction = False
+        self._lookups: Dict[str, Dict[tuple, int]] = {}
 
     def close(self):
         self.conn.close()
 
+    @contextmanager
+    def transaction(self):
+        """Group writes into one transaction: a single commit (and fsync) instead of one per row."""
+        if self._in_transaction:
+            yield
+            return
+        self._in_transaction = True
+        try:
+            with METRICS.timer("db_transaction_seconds"):
+                yield
+                with METRICS.timer("db_statement_seconds", statement="commit"):
+                    self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            # rows created in the rolled back transaction must not stay cached
+            self._lookups.clear()
+            raise
+        finally:
+            self._in_transaction = False
+
+    def _commit(self):
+        if not self._in_transaction:
+            self.conn.commit()
+
+    def preload_lookups(self):
+        """Load the lookup tables into dicts so get_or_create rarely touches the db."""
+        for table in self.LOOKUP_TABLES:
+            cursor = self.conn.execute(f"SELECT * FROM {table}")
+            cols = [desc[0] for desc in cursor.description]
+            lookup = self._lookups[table] = {}
+            for row in cursor:
+                values = dict(zip(cols, row))
+                pk = values.pop(f"{table}_pk")
+                lookup[self._lookup_key(values)] = pk
+
+    @staticmethod
+    def _lookup_key(values: Dict[str, Any]) -> tuple:
+        return tuple(sorted(values.items()))
+
     def add_entry(self, table: str, insert_dict: Dict[str, Any], cursor=None) -> int:
         if cursor is None:
             cursor = self.conn.cursor()
@@ -93,31 +115,52 @@ class Database:
         placeholders = ", ".join("?" * len(insert_dict))
         values = tuple(insert_dict.values())
         cursor.execute(f"INSERT INTO {table} ({fields}) VALUES ({placeholders})", values)
-        self.conn.commit()
+        self._commit()
         return cursor.lastrowid
 
     def get_or_create(self, table: str, insert_dict: Dict[str, Any]) -> int:
-        cursor = self.conn.cursor()
-
         # Exclude PK column if it's auto-increment (e.g. "{table}_pk")
         filtered_dict = {
             k: v for k, v in insert_dict.items() if k != f"{table}_pk"
         }
 
-        # Build WHERE clause: col1 = ? AND col2 = ? ...
-        where_clause = " AND ".join([f"{col} = ?" for col in filtered_dict.keys()])
-        values = list(filtered_dict.values())
+        lookup = self._lookups.get(table)
+        if lookup is not None:
+            key = self._lookup_key(filtered_dict)
+            pk = lookup.get(key)
+            if pk is None:
+                pk = lookup[key] = self._get_or_create(table, insert_dict, filtered_dict)
+            else:
+                METRICS.inc("db_lookup_hits_total", table=table)
+            return pk
+        return self._get_or_create(table, insert_dict, filtered_dict)
+
+    def _get_or_create(self, table: str, insert_dict: Dict[str, Any], filtered_dict: Dict[str, Any]) -> int:
+        with METRICS.timer("db_statement_seconds", statement="get_or_create", table=table):
+            return self._insert_or_select(table, insert_dict, filtered_dict)
+
+    def _insert_or_select(self, table: str, insert_dict: Dict[str, Any], filtered_dict: Dict[str, Any]) -> int:
+        cursor = self.conn.cursor()
 
-        cursor.execute(f"SELECT {table}_pk FROM {table} WHERE {where_clause}", values)
+        # Insert unless the natural key (a UNIQUE index, see 10_ADD_INDEXES.sql) already exists
+        fields = ", ".join(insert_dict.keys())
+        placeholders = ", ".join("?" * len(insert_dict))
+        cursor.execute(
+            f"INSERT INTO {table} ({fields}) VALUES ({placeholders}) ON CONFLICT DO NOTHING RETURNING {table}_pk",
+            tuple(insert_dict.values())
+        )
         row = cursor.fetchone()
-
         if row:
-            # Found an existing row with exact same values
+            self._commit()
             return row[0]
 
-        # Otherwise, insert new row
-        cursor_last_row_id = self.add_entry(table=table, insert_dict=insert_dict)
-        return cursor_last_row_id
+        # Found an existing row: look it up through the same index
+        where_clause = " AND ".join([f"{col} = ?" for col in filtered_dict.keys()])
+        cursor.execute(f"SELECT {table}_pk FROM {table} WHERE {where_clause}", list(filtered_dict.values()))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"{table} row {filtered_dict} conflicts with an existing row on its natural key")
+        return row[0]
 
     def ___get_or_create_old___(self, table: str, unique_field: str, unique_value: Any, insert_dict: Dict[str, Any]) -> int:
         cursor = self.conn.cursor()
@@ -130,15 +173,9 @@ class Database:
 
         return cursor_last_row_id
 
-    def insert_ranking(self, poll_pk: int, week_pk: int, team_pk: int, entry: Dict[str, Any]):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO ranking (
-                ranking_poll_fk, ranking_week_fk, ranking_team_fk,
-                ranking_current_rank, ranking_points, ranking_first_place_votes,
-                ranking_record_wins, ranking_record_losses, ranking_trend
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    @staticmethod
+    def ranking_row(poll_pk: int, week_pk: int, team_pk: int, entry: Dict[str, Any]) -> tuple:
+        return (
             poll_pk, week_pk, team_pk,
             entry["current"],
             entry["points"],
@@ -146,13 +183,137 @@ class Database:
             int(entry["record"]["stats"][0]["value"]),
             int(entry["record"]["stats"][1]["value"]),
             normalize_trend(entry["trend"])
-        ))
-        self.conn.commit()
+        )
+
+    def insert_ranking(self, poll_pk: int, week_pk: int, team_pk: int, entry: Dict[str, Any]):
+        self.insert_rankings([self.ranking_row(poll_pk, week_pk, team_pk, entry)])
+
+    def load_ingested(self) -> Dict[Tuple[int, int, int, int], str]:
+        """(season_year, poll_pk, season_type, week_number) -> content hash for every ingested week."""
+        cursor = self.conn.execute("""
+            SELECT s.season_year, il.ingest_log_poll_fk, w.week_season_type_fk, w.week_number, il.ingest_log_content_hash
+            FROM ingest_log il
+            JOIN week w   ON il.ingest_log_week_fk = w.week_pk
+            JOIN season s ON w.week_season_fk = s.season_pk
+        """)
+        return {tuple(row[:4]): row[4] for row in cursor}
+
+    def replace_week(self, poll_pk: int, week_pk: int, rows: List[tuple], content_hash: str):
+        """Swap in a week's rankings and record it in ingest_log, in one transaction."""
+        with self.transaction(), METRICS.timer("db_statement_seconds", statement="replace_week"):
+            self.conn.execute("DELETE FROM ranking WHERE ranking_poll_fk = ? AND ranking_week_fk = ?", (poll_pk, week_pk))
+            self.insert_rankings(rows)
+            self.conn.execute("""
+                INSERT INTO ingest_log (ingest_log_poll_fk, ingest_log_week_fk, ingest_log_content_hash, ingest_log_row_count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (ingest_log_poll_fk, ingest_log_week_fk) DO UPDATE SET
+                    ingest_log_content_hash = excluded.ingest_log_content_hash,
+                    ingest_log_row_count = excluded.ingest_log_row_count,
+                    ingest_log_ingested_at = CURRENT_TIMESTAMP
+            """, (poll_pk, week_pk, content_hash, len(rows)))
+
+    def load_team_identities(self) -> Dict[int, Tuple[str, str, str]]:
+        """ESPN team id -> (school_name, team_name, team_abbreviation) from team_identity."""
+        cursor = self.conn.execute("""
+            SELECT team_identity_espn_id, team_identity_school_name, team_identity_team_name, team_identity_abbreviation
+            FROM team_identity
+        """)
+        return {row[0]: tuple(row[1:]) for row in cursor}
+
+    def save_team_identity(self, espn_id: int, identity: Tuple[str, str, str], team_pk: int, source: str = "espn"):
+        """Record (or point at team_pk) a team id's identity, and take it off the review queue."""
+        self.conn.execute("""
+            INSERT INTO team_identity (
+                team_identity_espn_id, team_identity_school_name, team_identity_team_name,
+                team_identity_abbreviation, team_identity_team_fk, team_identity_source
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (team_identity_espn_id) DO UPDATE SET
+                team_identity_team_fk = excluded.team_identity_team_fk,
+                team_identity_updated_at = CURRENT_TIMESTAMP
+            WHERE team_identity_team_fk IS NOT excluded.team_identity_team_fk
+        """, (espn_id, *identity, team_pk, source))
+        self.conn.execute("DELETE FROM team_identity_review WHERE team_identity_review_espn_id = ?", (espn_id,))
+        self._commit()
+
+    def queue_team_reviews(self, unknown: Dict[int, Dict[str, Any]]):
+        """Add (or bump) unknown team ids in team_identity_review, in one statement."""
+        self.conn.executemany("""
+            INSERT INTO team_identity_review (
+                team_identity_review_espn_id, team_identity_review_ref, team_identity_review_display_name,
+                team_identity_review_nickname, team_identity_review_abbreviation, team_identity_review_error
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (team_identity_review_espn_id) DO UPDATE SET
+                team_identity_review_ref = excluded.team_identity_review_ref,
+                team_identity_review_display_name = excluded.team_identity_review_display_name,
+                team_identity_review_nickname = excluded.team_identity_review_nickname,
+                team_identity_review_abbreviation = excluded.team_identity_review_abbreviation,
+                team_identity_review_error = excluded.team_identity_review_error,
+                team_identity_review_seen_count = team_identity_review_seen_count + 1,
+                team_identity_review_last_seen_at = CURRENT_TIMESTAMP
+        """, [(team_id, r["ref"], r["display_name"], r["nickname"], r["abbreviation"], r["error"])
+              for team_id, r in sorted(unknown.items())])
+        self._commit()
+
+    def replace_poll_coverage(self, poll_id: int, year: int, weeks: List[Dict[str, Any]]):
+        """Record a poll's weeks per season type for a season (see 13_ADD_POLL_COVERAGE.sql) from its listing."""
+        by_type: Dict[int, List[int]] = {}
+        for w in weeks:
+            by_type.setdefault(w["seasonType"], []).append(w["week"])
+        with self.transaction():
+            self.conn.execute(
+                "DELETE FROM poll_coverage WHERE poll_coverage_poll_fk = ? AND poll_coverage_season_year = ?",
+                (poll_id, year)
+            )
+            self.conn.executemany("""
+                INSERT INTO poll_coverage (
+                    poll_coverage_poll_fk, poll_coverage_season_year, poll_coverage_season_type_fk,
+                    poll_coverage_week_count, poll_coverage_first_week, poll_coverage_last_week
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, [(poll_id, year, season_type, len(numbers), min(numbers), max(numbers))
+                  for season_type, numbers in sorted(by_type.items())])
+
+    def save_poll_probes(self, probes: List[Tuple[int, int, bool, float]]):
+        """Upsert (poll id, year, found, probed_at) rows into poll_probe."""
+        self.conn.executemany("""
+            INSERT INTO poll_probe (poll_probe_poll_id, poll_probe_season_year, poll_probe_found, poll_probe_probed_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (poll_probe_poll_id, poll_probe_season_year) DO UPDATE SET
+                poll_probe_found = excluded.poll_probe_found,
+                poll_probe_probed_at = excluded.poll_probe_probed_at
+        """, probes)
+        self._commit()
+
+    def save_listings(self, listings: Dict[Tuple[int, int], List[Dict[str, Any]]]):
+        """
+        Record a backfill's week listings, keyed by (year, poll id), as poll_coverage and poll_probe. A
+        season without weeks (an empty listing or ESPN's 404) gets a negative probe, so the CLI stops
+        asking for it once it has closed (see cli.pending_backfill).
+        """
+        now = time.time()
+        with self.transaction():
+            for (year, poll_id), weeks in sorted(listings.items()):
+                self.replace_poll_coverage(poll_id, year, weeks)
+            self.save_poll_probes([(poll_id, year, bool(weeks), now)
+                                   for (year, poll_id), weeks in sorted(listings.items())])
+
+    def insert_rankings(self, rows: List[tuple]):
+        """Bulk insert rows built by ranking_row()."""
+        with METRICS.timer("db_statement_seconds", statement="insert_rankings"):
+            self.conn.executemany("""
+                INSERT INTO ranking (
+                    ranking_poll_fk, ranking_week_fk, ranking_team_fk,
+                    ranking_current_rank, ranking_points, ranking_first_place_votes,
+                    ranking_record_wins, ranking_record_losses, ranking_trend
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        METRICS.inc("db_rows_written_total", len(rows))
+        self._commit()
 
 
 # ---------------- Backfiller ----------------
 
 def get_corrected_team_data(team_name, abbreviation, school_name) -> (str, str):
+    from mappings import TEAM_ABBREVIATION_MAP
 
     ret = TEAM_ABBREVIATION_MAP.get(abbreviation, None)
 
@@ -173,124 +334,602 @@ def get_corrected_team_data(team_name, abbreviation, school_name) -> (str, str):
     return ret['name'], ret['abbrev']
 
 
-class Backfiller:
-    def __init__(self, db: Database, client: ESPNClient):
-        self.db = db
-        self.client = client
+def normalize_team(team_json: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Map an ESPN team document to (school_name, team_name, team_abbreviation)."""
+    school_name = team_json.get("displayName")
+    team_name = team_json.get("nickname") or team_json.get("shortDisplayName") or school_name
+    abbreviation = team_json.get("abbreviation") or school_name[:4].upper()
 
-    def backfill_poll(self, year: int, poll_id: int):
-        logging.info(f"Backfilling poll id {poll_id} for {year}")
-        weeks = self.client.get_weeks(year, poll_id)
-        if not weeks:
-            logging.warning(f"No weeks found for poll id {poll_id} {year}")
-            return
+    # teams with ambiguous names (SJSU, USM, the Miamis, USC) are pinned by id in mappings.ESPN_TEAM_IDS
+    team_name_corr, abbreviation_corr = get_corrected_team_data(team_name, abbreviation, school_name)
+    return school_name, team_name_corr, abbreviation_corr
 
-        for w in weeks:
-            poll_data = self.client.get_poll_data(w["url"])
-            headline = poll_data.get("headline", f"Week {w['week']}")
-            logging.info(f"Processing {headline}")
-
-            for entry in poll_data.get("ranks", []):
-                print(f'  Inserting record for the team ranked {entry["current"]}')
-                team_json = self.client.get_team_data(entry["team"]["$ref"])
-                self._insert_full_record(year, poll_id, w, entry, team_json)
-
-    def backfill_poll_parallel(self, year: int, poll_id: int):
-        logging.info(f"(parallel) Backfilling poll id {poll_id} for {year}")
-        weeks = self.client.get_weeks(year, poll_id)
-        if not weeks:
-            logging.warning(f"No weeks found for poll id {poll_id} {year}")
-            return
 
-        for w in weeks:
-            poll_data = self.client.get_poll_data(w["url"])
-            headline = poll_data.get("headline", f"Week {w['week']}")
-            logging.info(f"Processing {headline}")
+def parse_team_id(ref: str) -> int:
+    """ESPN's team id from a team $ref (stable across seasons)."""
+    m = re.search(r"/teams/(\d+)", ref)
+    if m is None:
+        raise ValueError(f"Not a team $ref: {ref}")
+    return int(m.group(1))
 
-            ranks = poll_data.get("ranks", [])
-            if not ranks:
-                continue
 
-            # ---- parallel fetch team data (no DB writes here) ----
-            def fetch_team(entry):
-                team_json = self.client.get_team_data(entry["team"]["$ref"])
-                return entry, team_json
+class UnknownTeamError(ValueError):
+    """A team id with no team_identity row whose document cannot be normalized (no mapping)."""
 
-            results = []
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                futures = [executor.submit(fetch_team, entry) for entry in ranks]
-                for f in as_completed(futures):
-                    try:
-                        results.append(f.result())
-                    except Exception as e:
-                        logging.error(f"Failed fetching team: {e}")
-
-            # ---- serial DB inserts (safe for SQLite) ----
-            for entry, team_json in results:
-                self._insert_full_record(year, poll_id, w, entry, team_json)
-
-    def _insert_full_record(self, year: int, poll_id: int, week_info: Dict[str, Any],
-                            entry: Dict[str, Any], team_json: Dict[str, Any]):
-        """Shared insert logic (requires team_json)."""
-
-        # Season
-        season_pk = self.db.get_or_create(
-            "season",
-            {"season_year": year, "season_description": f"{year} season"}
-        )
 
-        # Week
-        week_pk = self.db.get_or_create(
-            "week",
-            {"week_number": week_info["week"],
-             "week_season_fk": season_pk,
-             "week_season_type_fk": week_info['seasonType']}
-        )
+class TeamResolver:
+    """
+    Resolves team $refs to (school_pk, team_pk) through team_identity, keyed by ESPN team id.
 
-        # School & Team
-        school_name = team_json.get("displayName")
-        team_name = team_json.get("nickname") or team_json.get("shortDisplayName") or school_name
-        abbreviation = team_json.get("abbreviation") or school_name[:4].upper()
-
-        # special cases of multiple 'school' names
-        if abbreviation == "SJSU":
-            abbreviation_corr = abbreviation
-            team_name_corr = "San Jose State"  # no é
-            school_name = "San Jose State Spartans"
-        elif abbreviation == "USM":
-            abbreviation_corr = abbreviation
-            team_name_corr = "Southern Mississippi"
-            school_name = "Southern Mississippi Golden Eagles"
-        else:
+    Known ids (seeded from mappings.py or learned by an earlier run) resolve with a dict lookup and
+    no request. Unknown ids have their team document fetched and normalized once per run; those that
+    cannot be normalized are collected in `unknown` for team_identity_review instead of failing the run.
+    identify() runs on the event loop, resolve() on the writer thread.
+    """
+    def __init__(self, db: Database, client: "ESPNClient"):
+        self.db = db
+        self.client = client
+        self._identities = db.load_team_identities()          # team id -> (school, team, abbreviation)
+        self._fetches: Dict[int, asyncio.Future] = {}         # team id -> future of its identity
+        self._keys: Dict[int, Tuple[int, int, str]] = {}     # team id -> (school_pk, team_pk, team_name)
+        self.unknown: Dict[int, Dict[str, Any]] = {}         # team id -> review row
+
+    async def identify(self, ref: str) -> Tuple[str, str, str]:
+        """(school_name, team_name, abbreviation) for a team $ref; raises UnknownTeamError or the fetch error."""
+        team_id = parse_team_id(ref)
+        identity = self._identities.get(team_id)
+        if identity is not None:
+            return identity
+        fut = self._fetches.get(team_id)
+        if fut is None or (fut.done() and not fut.cancelled()
+                           and isinstance(fut.exception(), Exception)
+                           and not isinstance(fut.exception(), UnknownTeamError)):
+            # first sighting, or the previous fetch failed: (re)fetch once for every week waiting on it
+            fut = self._fetches[team_id] = asyncio.ensure_future(self._learn(team_id, ref))
+        return await fut
+
+    async def _learn(self, team_id: int, ref: str) -> Tuple[str, str, str]:
+        team_json = await self.client.aget_team_data(ref)
+        try:
+            identity = normalize_team(team_json)
+        except ValueError as e:
+            logging.warning(f"Unknown team id {team_id}, queued for review: {e}")
+            METRICS.inc("team_identity_total", result="unknown")
+            self.unknown[team_id] = {
+                "ref": ref,
+                "display_name": team_json.get("displayName"),
+                "nickname": team_json.get("nickname"),
+                "abbreviation": team_json.get("abbreviation"),
+                "error": str(e),
+            }
+            raise UnknownTeamError(str(e)) from e
+        METRICS.inc("team_identity_total", result="learned")
+        self._identities[team_id] = identity
+        return identity
+
+    def resolve(self, ref: str) -> Tuple[int, int, str]:
+        """(school_pk, team_pk, team_name) for an identified team $ref; records the identity on first use."""
+        team_id = parse_team_id(ref)
+        key = self._keys.get(team_id)
+        if key is None:
+            school_name, team_name, abbreviation = identity = self._identities[team_id]
+            school_pk = self.db.get_or_create("school", {"school_name": school_name})
+            team_pk = self.db.get_or_create(
+                "team",
+                {"team_name": team_name,
+                 "team_school_fk": school_pk,
+                 "team_abbreviation": abbreviation}
+            )
+            self.db.save_team_identity(team_id, identity, team_pk)
+            key = self._keys[team_id] = (school_pk, team_pk, team_name)
+        return key
+
+
+def grid(years: List[int], poll_ids: List[int], pairs: Optional[List[Tuple[int, int]]] = None) -> List[Tuple[int, int]]:
+    """(year, poll id) pairs to backfill in order: years x poll_ids, limited to pairs if given."""
+    wanted = None if pairs is None else set(pairs)
+    return [(year, poll_id) for year in years for poll_id in poll_ids if wanted is None or (year, poll_id) in wanted]
+
+
+class BackfillError(Exception):
+    @classmethod
+    def for_weeks(cls, failed_weeks: List[str], shown: int = 10):
+        more = f" and {len(failed_weeks) - shown} more" if len(failed_weeks) > shown else ""
+        return cls(f"{len(failed_weeks)} weeks not ingested, rerun to retry: "
+                   + ", ".join(failed_weeks[:shown]) + more)
+
+
+class WriterThread(threading.Thread):
+    """
+    The only thread that touches the database during a backfill.
+
+    Fetched weeks arrive on a bounded queue (put() blocks when it is full, which throttles the
+    fetchers) and are written in batches, several weeks per transaction.
+    """
+    _STOP = object()
+
+    def __init__(self, write_week, queue_size: int = 32, batch_size: int = 8, db: Optional[Database] = None):
+        super().__init__(name="sqlite-writer", daemon=True)
+        self.write_week = write_week
+        self.db = db
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error: Optional[BaseException] = None
+
+    def run(self):
+        try:
+            stop = False
+            while not stop:
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if self._STOP in batch:
+                    stop = True
+                    batch = batch[:batch.index(self._STOP)]
+                if batch:
+                    METRICS.observe("writer_batch_weeks", len(batch), buckets=COUNT_BUCKETS)
+                    with self.db.transaction():
+                        for item in batch:
+                            self.write_week(item)
+        except BaseException as e:
+            logging.error(f"Writer thread failed: {e}")
+            self.error = e
+
+    def put(self, item):
+        """Queue a week for writing; raises if the writer has died instead of blocking forever."""
+        depth = self.queue.qsize()
+        METRICS.observe("writer_queue_depth", depth, buckets=COUNT_BUCKETS)
+        METRICS.max_gauge("writer_queue_depth_max", depth)
+        while True:
+            self.raise_if_failed()
             try:
-                team_name_corr, abbreviation_corr = get_corrected_team_data(team_name, abbreviation, school_name)
-            except Exception as e:
-                print(f"Failed on team abbreviation: {team_name, school_name, abbreviation}")
-                raise e
-        school_pk = self.db.get_or_create("school", {"school_name": school_name})
-        team_pk = self.db.get_or_create(
-            "team",
-            {"team_name": team_name_corr,
-             "team_school_fk": school_pk,
-             "team_abbreviation": abbreviation_corr}
-        )
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
 
-        # Ranking
-        self.db.insert_ranking(poll_id, week_pk, team_pk, entry)
-        logging.info(f'      Added rank for {team_name_corr}')
+    def raise_if_failed(self):
+        if self.error is not None:
+            raise BackfillError("Writer thread failed") from self.error
 
+    def stop(self):
+        """Write whatever is queued, then exit."""
+        if self.is_alive():
+            while self.error is None:
+                try:
+                    self.queue.put(self._STOP, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            self.join()
 
-# ---------------- Main ----------------
-def main(years: list, poll_ids: list):
-    client = ESPNClient()
-    db = Database(DB_PATH)
-    backfiller = Backfiller(db, client)
 
-    for year in years:
-        for poll_id in poll_ids:
-            # backfiller.backfill_poll(year, poll_id)
-            backfiller.backfill_poll_parallel(year, poll_id)
+class Backfiller:
+    def __init__(self, db: Database, client: "ESPNClient", resolver: Optional[TeamResolver] = None,
+                 max_pending_weeks: int = 64, queue_size: int = 32, batch_size: int = 8):
+        self.db = db
+        self.client = client
+        self.resolver = resolver or TeamResolver(db, client)
+        self.max_pending_weeks = max_pending_weeks
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self._week_pks: Dict[Tuple[int, int, int], int] = {}
+        self._ingested: Dict[Tuple[int, int, int, int], str] = {}
+        self.touched_seasons = set()   # seasons whose rankings changed during this run
+        self.failed_weeks: List[str] = []
+        self.held_weeks: List[str] = []   # weeks ranking a team id queued for review
+        self.listings: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}   # (year, poll id) -> weeks ESPN lists
+
+    def backfill(self, years: List[int], poll_ids: List[int],
+                 ingested: Optional[Dict[Tuple[int, int, int, int], str]] = None,
+                 pairs: Optional[List[Tuple[int, int]]] = None):
+        """
+        Fetch every (year, poll) through the client's pool while a writer thread inserts week by week, in order.
+
+        Weeks already in ingest_log are skipped: closed seasons without fetching anything, the current
+        season when the week's ranks hash is unchanged. Each week commits atomically with its log row,
+        so an interrupted run resumes where it stopped. Weeks whose team fetches failed are not written,
+        and raise BackfillError once everything else is committed. Weeks ranking an unmapped team id are
+        held back too, and the ids queued in team_identity_review; they load on a rerun once mapped.
+
+        ingested overrides the log read from the db (a shard run skips what the main db already has),
+        and pairs limits the years x poll_ids grid to those (year, poll id) pairs. The listings fetched
+        are saved as poll_coverage and poll_probe, which lets the CLI tell that a closed season is
+        complete, or has no such poll, without asking ESPN (see cli.pending_backfill).
+        """
+        self._ingested = self.db.load_ingested() if ingested is None else dict(ingested)
+        self.touched_seasons, self.failed_weeks, self.held_weeks, self.listings = set(), [], [], {}
+        writer = WriterThread(self._write_week, self.queue_size, self.batch_size, self.db)
+        writer.start()
+        try:
+            asyncio.run(self._backfill(grid(years, poll_ids, pairs), writer))
+        finally:
+            writer.stop()
+            self.db.save_listings(self.listings)
+        writer.raise_if_failed()
+        if self.resolver.unknown:
+            self.db.queue_team_reviews(self.resolver.unknown)
+            logging.warning(f"{len(self.resolver.unknown)} unknown team ids queued in team_identity_review, "
+                            f"{len(self.held_weeks)} weeks held back until they are added to mappings.py")
+        if self.failed_weeks:
+            raise BackfillError.for_weeks(self.failed_weeks)
+
+    def backfill_poll(self, year: int, poll_id: int):
+        self.backfill([year], [poll_id])
+
+    async def _backfill(self, pairs: List[Tuple[int, int]], writer: WriterThread):
+        # season listings are all fetched at once; week (and team) documents are fetched at most
+        # max_pending_weeks ahead of the writer, and handed to it in (year, poll, week) order so
+        # inserts stay deterministic
+        loop = asyncio.get_running_loop()
+        listings = [(year, poll_id, asyncio.ensure_future(self._list_weeks(year, poll_id))) for year, poll_id in pairs]
+        window = asyncio.Semaphore(self.max_pending_weeks)
+        pending: asyncio.Queue = asyncio.Queue()
+
+        async def feed():
+            # acquires the window in consumption order, so a later week can never starve an earlier one
+            try:
+                for year, poll_id, listing in listings:
+                    for w in await listing:
+                        await window.acquire()
+                        await pending.put(asyncio.ensure_future(self._fetch_week(year, poll_id, w)))
+                        METRICS.max_gauge("pending_weeks_max", pending.qsize())
+            finally:
+                # also when a listing fails: the weeks already queued are written, then `await feeder` raises
+                pending.put_nowait(None)
+
+        feeder = asyncio.ensure_future(feed())
+        try:
+            while (week_fut := await pending.get()) is not None:
+                week = await week_fut
+                if week is None:
+                    METRICS.inc("weeks_skipped_total", reason="unchanged")
+                else:
+                    if week["failed"]:
+                        METRICS.inc("weeks_failed_total")
+                        self.failed_weeks.append(week["headline"])
+                        logging.error(f"Skipping {week['headline']}: {len(week['failed'])} team fetches failed")
+                    elif week["unknown"]:
+                        METRICS.inc("weeks_held_total")
+                        self.held_weeks.append(week["headline"])
+                    else:
+                        await loop.run_in_executor(None, writer.put, week)   # blocks while the writer is behind
+                window.release()
+            await feeder
+        finally:
+            feeder.cancel()
+            for _, _, listing in listings:
+                listing.cancel()
+
+    async def _list_weeks(self, year: int, poll_id: int) -> List[Dict[str, Any]]:
+        from requests.exceptions import HTTPError   # loaded with the client by now
 
-    db.close()
+        logging.info(f"Backfilling poll id {poll_id} for {year}")
+        try:
+            weeks = await self.client.aget_weeks(year, poll_id)
+        except HTTPError as e:
+            # ESPN answers 404 for a poll id it has no rankings of that season, as discover._probe expects
+            if e.response is None or e.response.status_code != 404:
+                raise
+            logging.warning(f"ESPN has no poll id {poll_id} for {year} (404)")
+            weeks = []
+        self.listings[(year, poll_id)] = weeks
+        if not weeks:
+            logging.warning(f"No weeks found for poll id {poll_id} {year}")
+            return []
+        if year < current_season_year():
+            # closed seasons never change once ingested
+            weeks_to_fetch = [w for w in weeks if (year, poll_id, w["seasonType"], w["week"]) not in self._ingested]
+            METRICS.inc("weeks_skipped_total", len(weeks) - len(weeks_to_fetch), reason="closed_season")
+            if not weeks_to_fetch:
+                logging.info(f"Poll id {poll_id} for {year} already ingested")
+            return weeks_to_fetch
+        return weeks
 
+    async def _fetch_week(self, year: int, poll_id: int, week_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The week's poll document and content hash, with every team identified, ready for the writer.
+        None if the week is unchanged since it was ingested; "failed" holds refs whose team fetch failed
+        and "unknown" refs with no mapping.
+        """
+        poll_data = await self.client.aget_poll_data(week_info["url"])
+        ranks = poll_data.get("ranks", [])
+        week_hash = ranks_hash(ranks)
+        if self._ingested.get((year, poll_id, week_info["seasonType"], week_info["week"])) == week_hash:
+            return None
+
+        refs = [entry["team"]["$ref"] for entry in ranks]
+        results = await asyncio.gather(*(self.resolver.identify(ref) for ref in refs), return_exceptions=True)
+
+        failed, unknown = set(), set()
+        for ref, result in zip(refs, results):
+            if isinstance(result, UnknownTeamError):
+                unknown.add(ref)
+            elif isinstance(result, Exception):
+                logging.error(f"Failed fetching team: {result}")
+                failed.add(ref)
+        return {
+            "year": year,
+            "poll_id": poll_id,
+            "week_info": week_info,
+            "headline": poll_data.get("headline", f"{year} poll id {poll_id} week {week_info['week']}"),
+            "ranks": ranks,
+            "content_hash": week_hash,
+            "failed": failed,
+            "unknown": unknown,
+        }
 
+    def _write_week(self, week: Dict[str, Any]):
+        """Writer thread: swap in one week's rankings (inside the writer's transaction)."""
+        year, poll_id, week_info = week["year"], week["poll_id"], week["week_info"]
+        logging.info("Processing %s", week["headline"])
+        week_pk = self._get_week_pk(year, week_info)
+        rows = [self._build_ranking_row(poll_id, week_pk, e) for e in week["ranks"]]
+        self.db.replace_week(poll_id, week_pk, rows, week["content_hash"])
+        self._ingested[(year, poll_id, week_info["seasonType"], week_info["week"])] = week["content_hash"]
+        self.touched_seasons.add(year)
+        METRICS.inc("weeks_written_total", poll_id=poll_id)
+
+    def _get_week_pk(self, year: int, week_info: Dict[str, Any]) -> int:
+        key = (year, week_info["seasonType"], week_info["week"])
+        week_pk = self._week_pks.get(key)
+        if week_pk is None:
+            season_pk = self.db.get_or_create(
+                "season",
+                {"season_year": year, "season_description": f"{year} season"}
+            )
+            week_pk = self._week_pks[key] = self.db.get_or_create(
+                "week",
+                {"week_number": week_info["week"],
+                 "week_season_fk": season_pk,
+                 "week_season_type_fk": week_info['seasonType']}
+            )
+        return week_pk
+
+    def _build_ranking_row(self, poll_id: int, week_pk: int, entry: Dict[str, Any]) -> tuple:
+        """Resolve the team key for one poll entry."""
+        _, team_pk, team_name = self.resolver.resolve(entry["team"]["$ref"])
+        # per row, so only at debug level (-v) and formatted lazily
+        logging.debug("      Adding rank for %s", team_name)
+        return self.db.ranking_row(poll_id, week_pk, team_pk, entry)
+
+
+# ---------------- Sharded backfill ----------------
+def create_shard_db(path: Path, identities: Dict[int, Tuple[str, str, str]]):
+    """Empty database with the full schema (and seed data) for one shard, knowing the main db's team ids."""
+    conn = sqlite3.connect(path)
+    for sql_file in sql_files():
+        conn.executescript(sql_file.read_text())
+    conn.executemany("""
+        INSERT INTO team_identity (
+            team_identity_espn_id, team_identity_school_name, team_identity_team_name,
+            team_identity_abbreviation, team_identity_source
+        ) VALUES (?, ?, ?, ?, 'main')
+    """, [(espn_id, *identity) for espn_id, identity in identities.items()])
+    conn.commit()
+    conn.close()
+
+
+def backfill_shard(year: int, poll_ids: List[int], shard_path: Path,
+                   ingested: Dict[Tuple[int, int, int, int], str], identities: Dict[int, Tuple[str, str, str]],
+                   max_in_flight: int, rate_limit: Optional[float], base_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Worker process: backfill one season into its own shard database.
+
+    Returns what the merge needs besides the shard itself: the ESPN team id behind each shard
+    team_pk, the weeks that failed or were held back, the unknown team ids and the worker's metrics.
+    """
+    from espn import ESPNClient
+
+    METRICS.reset()   # a forked worker starts with a copy of the parent's
+    create_shard_db(shard_path, identities)
+    client = ESPNClient(cache=ResponseCache(), base_url=base_url, max_in_flight=max_in_flight, rate_limit=rate_limit)
+    db = Database(shard_path, check_same_thread=False)
+    db.preload_lookups()
+    backfiller = Backfiller(db, client)
+    failed_weeks = []
+    try:
+        backfiller.backfill([year], poll_ids, ingested=ingested)
+    except BackfillError:
+        failed_weeks = backfiller.failed_weeks
+    finally:
+        db.close()
+        client.close()
+    return {
+        "year": year,
+        "shard_path": shard_path,
+        "team_ids": {team_pk: team_id for team_id, (_, team_pk, _) in backfiller.resolver._keys.items()},
+        "failed_weeks": failed_weeks,
+        "held_weeks": backfiller.held_weeks,
+        "unknown": backfiller.resolver.unknown,
+        "listings": backfiller.listings,
+        "metrics": METRICS.report(),
+    }
+
+
+class ShardedBackfiller:
+    """
+    Backfills each season in a worker process with its own shard database, then merges the shards
+    into db in season order. The request budget is split between the workers.
+    """
+    def __init__(self, db: Database, processes: int, max_in_flight: int = 16, rate_limit: Optional[float] = 50.0,
+                 base_url: Optional[str] = None):
+        self.db = db
+        self.processes = processes
+        self.base_url = base_url
+        self.max_in_flight = max_in_flight
+        self.rate_limit = rate_limit
+        self._team_pks: Dict[int, int] = {}   # ESPN team id -> team_pk, shared across shards
+        self._known_team_ids: Set[int] = set()   # ids the main db had an identity for at the start
+        self.touched_seasons = set()
+        self.failed_weeks: List[str] = []
+        self.held_weeks: List[str] = []
+
+    def backfill(self, years: List[int], poll_ids: List[int], pairs: Optional[List[Tuple[int, int]]] = None):
+        """Same contract as Backfiller.backfill; a failed worker is reported like a failed week."""
+        season_polls: Dict[int, List[int]] = {}
+        for year, poll_id in grid(years, poll_ids, pairs):
+            season_polls.setdefault(year, []).append(poll_id)
+        years = list(season_polls)
+        processes = max(1, min(self.processes, len(years)))
+        worker_in_flight = max(1, self.max_in_flight // processes)
+        worker_rate = self.rate_limit / processes if self.rate_limit else self.rate_limit
+        ingested = self.db.load_ingested()
+        identities = self.db.load_team_identities()
+        self._known_team_ids = set(identities)
+        self.touched_seasons, self.failed_weeks, self.held_weeks, unknown = set(), [], [], {}
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with tempfile.TemporaryDirectory(prefix="backfill-shards-", dir=DB_PATH.parent) as shard_dir, \
+                ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                (year, pool.submit(
+                    backfill_shard, year, season_polls[year], Path(shard_dir) / f"{year}.db",
+                    {key: h for key, h in ingested.items() if key[0] == year}, identities,
+                    worker_in_flight, worker_rate, self.base_url
+                ))
+                for year in years
+            ]
+            # merge strictly in season order, while later seasons are still being fetched
+            for year, future in futures:
+                try:
+                    shard = future.result()
+                except Exception as e:
+                    logging.error(f"Backfill of {year} failed: {e}")
+                    self.failed_weeks.append(f"{year} ({e})")
+                    continue
+                # the worker's db and team identity metrics are about its shard; the merge records the
+                # real writes and the identities the main db learns
+                METRICS.merge(shard["metrics"], prefixes=("http_", "weeks_"))
+                if self.merge_shard(shard):
+                    self.touched_seasons.add(year)
+                self.db.save_listings(shard["listings"])
+                self.failed_weeks.extend(shard["failed_weeks"])
+                self.held_weeks.extend(shard["held_weeks"])
+                new_unknown = shard["unknown"].keys() - unknown.keys()   # counted once per run, as serially
+                if new_unknown:
+                    METRICS.inc("team_identity_total", len(new_unknown), result="unknown")
+                unknown.update(shard["unknown"])
+
+        if unknown:
+            self.db.queue_team_reviews(unknown)
+            logging.warning(f"{len(unknown)} unknown team ids queued in team_identity_review, "
+                            f"{len(self.held_weeks)} weeks held back until they are added to mappings.py")
+
+        if self.failed_weeks:
+            raise BackfillError.for_weeks(self.failed_weeks)
+
+    def merge_shard(self, shard: Dict[str, Any]) -> bool:
+        """
+        Copy a shard's weeks into the main database, translating its surrogate keys.
+
+        Weeks are replayed in the order the shard wrote them, and keys are created in the order a
+        serial run creates them (season and week, then the week's teams by rank), so merging shards
+        in season order gives the same pks as a serial run. Teams are matched on ESPN team id, as
+        TeamResolver does within a run. Returns True if any week was merged.
+        """
+        db = self.db
+        shard_conn = sqlite3.connect(shard["shard_path"])
+        weeks = shard_conn.execute("""
+            SELECT il.ingest_log_poll_fk, il.ingest_log_week_fk, il.ingest_log_content_hash,
+                   s.season_year, s.season_description, w.week_number, w.week_season_type_fk
+            FROM ingest_log il
+            JOIN week w   ON il.ingest_log_week_fk = w.week_pk
+            JOIN season s ON w.week_season_fk = s.season_pk
+            ORDER BY il.ingest_log_pk
+        """).fetchall()
+
+        for poll_pk, shard_week_pk, content_hash, year, description, week_number, season_type in weeks:
+            with db.transaction():
+                season_pk = db.get_or_create("season", {"season_year": year, "season_description": description})
+                week_pk = db.get_or_create(
+                    "week",
+                    {"week_number": week_number, "week_season_fk": season_pk, "week_season_type_fk": season_type}
+                )
+                rows = []
+                for shard_team_pk, *values in shard_conn.execute("""
+                    SELECT ranking_team_fk, ranking_current_rank, ranking_points, ranking_first_place_votes,
+                           ranking_record_wins, ranking_record_losses, ranking_trend
+                    FROM ranking
+                    WHERE ranking_poll_fk = ? AND ranking_week_fk = ?
+                    ORDER BY ranking_pk
+                """, (poll_pk, shard_week_pk)):
+                    rows.append((poll_pk, week_pk, self._team_pk(shard_conn, shard, shard_team_pk), *values))
+                db.replace_week(poll_pk, week_pk, rows, content_hash)
+        shard_conn.close()
+        logging.info(f"Merged {len(weeks)} weeks of {shard['year']}")
+        return bool(weeks)
+
+    def _team_pk(self, shard_conn, shard: Dict[str, Any], shard_team_pk: int) -> int:
+        team_id = shard["team_ids"][shard_team_pk]
+        team_pk = self._team_pks.get(team_id)
+        if team_pk is None:
+            school_name, team_name, abbreviation = shard_conn.execute("""
+                SELECT sc.school_name, t.team_name, t.team_abbreviation
+                FROM team t
+                JOIN school sc ON t.team_school_fk = sc.school_pk
+                WHERE t.team_pk = ?
+            """, (shard_team_pk,)).fetchone()
+            school_pk = self.db.get_or_create("school", {"school_name": school_name})
+            team_pk = self._team_pks[team_id] = self.db.get_or_create(
+                "team",
+                {"team_name": team_name, "team_school_fk": school_pk, "team_abbreviation": abbreviation}
+            )
+            self.db.save_team_identity(team_id, (school_name, team_name, abbreviation), team_pk)
+            if team_id not in self._known_team_ids:
+                METRICS.inc("team_identity_total", result="learned")
+        return team_pk
+
+
+# ---------------- Main ----------------
+def main(years: list, poll_ids: list, max_in_flight: int = 16, rate_limit: Optional[float] = 50.0,
+         processes: int = 1, base_url: Optional[str] = None, record: Optional[Path] = None,
+         pairs: Optional[List[Tuple[int, int]]] = None):
+    """
+    Backfill years x poll_ids (only the (year, poll id) pairs in pairs, if given) into DB_PATH.
+    base_url points the client at another server (e.g. a fixtures.ReplayServer); record saves every
+    response used into a fixture archive (serial only).
+    """
+    if record is not None and processes > 1:
+        raise ValueError("Recording fixtures needs a serial backfill (processes=1)")
+    # owned by the writer thread while a serial backfill runs
+    db = Database(DB_PATH, check_same_thread=False)
+    db.preload_lookups()
+    client = None
+    if processes > 1:
+        backfiller = ShardedBackfiller(db, processes, max_in_flight, rate_limit, base_url)
+    else:
+        recorder = None
+        if record is not None:
+            from fixtures import FixtureRecorder
+            recorder = FixtureRecorder(record)
+        from espn import ESPNClient
+        client = ESPNClient(cache=ResponseCache(), base_url=base_url, max_in_flight=max_in_flight,
+                            rate_limit=rate_limit, recorder=recorder)
+        backfiller = Backfiller(db, client)
+
+    # refresh whatever was committed, even if some weeks failed, as long as it verifies; seasons left
+    # stale by an earlier run are retried too
+    try:
+        try:
+            backfiller.backfill(years, poll_ids, pairs=pairs)
+        except BaseException:
+            # keep the backfill error: a refresh failure on top of it is only logged
+            try:
+                refresh_verified(db.conn, backfiller.touched_seasons)
+            except Exception as e:
+                logging.error(f"Refreshing season summaries failed: {e}")
+            raise
+        report = refresh_verified(db.conn, backfiller.touched_seasons)
+    finally:
+        try:
+            db.close()
+        finally:
+            if client is not None:
+                client.close()
+    if report is not None:
+        report.raise_if_failed()
@@ -0,0 +1,187 @@
+"""
+On-disk cache for ESPN API responses.
+
+Bodies are stored content-addressed (by sha256 of the body) under database/data/http_cache/objects,
+and a small SQLite index maps each URL to its body plus the validators (ETag / Last-Modified)
+needed to revalidate it. Closed seasons never change, so responses fetched after their season closed
+never expire; ones fetched while it was still running are revalidated once more.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+CACHE_DIR = BASE_DIR / "data" / "http_cache"
+
+CURRENT_SEASON_TTL = 60 * 60         # current season polls change weekly, revalidate hourly
+NEGATIVE_TTL = 24 * 60 * 60          # a poll missing from the current season may appear mid-season (playoff rankings)
+DEFAULT_TTL = 24 * 60 * 60           # URLs without a season in them
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+FIRST_YEAR = 2004   # ESPN data is only valid 2004 onward
+
+
+def current_season_year(today: Optional[date] = None) -> int:
+    """A season runs Aug -> Jan, so January still belongs to last year's season."""
+    today = today or date.today()
+    return today.year if today.month >= 2 else today.year - 1
+
+
+def default_years() -> List[int]:
+    """FIRST_YEAR to the current season, the years backfill and discover cover by default."""
+    return list(range(FIRST_YEAR, current_season_year() + 1))
+
+
+def season_closed(year: int, at: Optional[float] = None) -> bool:
+    """Whether season `year` had closed (on Feb 1 of the next year) at unix time `at`, default now."""
+    return year < current_season_year(date.fromtimestamp(at) if at is not None else None)
+
+
+def ttl_for_url(url: str, fetched_at: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds a response stays fresh, or None if it never expires: its season had already closed when
+    it was fetched (fetched_at, unix time, default now). A closed season's response fetched while the
+    season was running (e.g. a listing without the final poll) keeps the current season TTL, so it
+    is revalidated once after the season closed.
+    """
+    m = re.search(r"/seasons/(\d{4})/", url)
+    if m is None:
+        return DEFAULT_TTL
+    if season_closed(int(m.group(1)), fetched_at):
+        return None
+    return CURRENT_SEASON_TTL
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, etag: Optional[str], last_modified: Optional[str],
+                 fetched_at: float, ttl: Optional[float]):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+    def is_fresh(self) -> bool:
+        return self.ttl is None or time.time() - self.fetched_at < self.ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = MAX_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        # shared by the fetch threads, so serialize access ourselves
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.cache_dir / "index.db", check_same_thread=False, isolation_level=None,
+                                    timeout=30)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entry (
+                url TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_entry_body_hash ON entry (body_hash)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_entry_accessed_at ON entry (accessed_at)")
+        self._total_bytes = self._stored_bytes()
+
+    def close(self):
+        self.conn.close()
+
+    def _object_path(self, body_hash: str) -> Path:
+        return self.objects_dir / body_hash[:2] / body_hash
+
+    def _stored_bytes(self) -> int:
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entry)"
+        ).fetchone()
+        return row[0]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body_hash, etag, last_modified, fetched_at FROM entry WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            body_hash, etag, last_modified, fetched_at = row
+            try:
+                body = self._object_path(body_hash).read_bytes()
+            except FileNotFoundError:
+                # index and objects got out of sync (e.g. manual cleanup), treat as a miss
+                self.conn.execute("DELETE FROM entry WHERE url = ?", (url,))
+                return None
+            self.conn.execute("UPDATE entry SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return CachedResponse(body, etag, last_modified, fetched_at, ttl_for_url(url, fetched_at))
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+        now = time.time()
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")   # backfill worker processes share the cache
+                tmp.write_bytes(body)
+                tmp.replace(path)
+            old = self.conn.execute("SELECT body_hash FROM entry WHERE url = ?", (url,)).fetchone()
+            self.conn.execute("""
+                INSERT OR REPLACE INTO entry (url, body_hash, size, etag, last_modified, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (url, body_hash, len(body), etag, last_modified, now, now))
+            if old and old[0] != body_hash:
+                self._drop_object_if_unused(old[0])
+            # from the index, not a running count: sharded backfill workers write to the same cache
+            self._total_bytes = self._stored_bytes()
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def revalidated(self, url: str):
+        """Server answered 304 Not Modified: the cached body is fresh again."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("UPDATE entry SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+
+    def _drop_object_if_unused(self, body_hash: str):
+        in_use = self.conn.execute("SELECT 1 FROM entry WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+        if in_use:
+            return
+        path = self._object_path(body_hash)
+        try:
+            self._total_bytes -= path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        target = int(self.max_bytes * 0.9)
+        rows = self.conn.execute("SELECT url, body_hash FROM entry ORDER BY accessed_at").fetchall()
+        for url, body_hash in rows:
+            if self._total_bytes <= target:
+                break
+            self.conn.execute("DELETE FROM entry WHERE url = ?", (url,))
+            self._drop_object_if_unused(body_hash)
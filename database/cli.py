@@ -0,0 +1,296 @@
+"""
+One command line for the rankings database:
+
+    python database/cli.py init                          # create the db and backfill it from ESPN
+    python database/cli.py init --incremental --polls 1,2,21
+    python database/cli.py backfill --years 2020-2024 --processes 4
+    python database/cli.py export --engine numpy --snapshot
+    python database/cli.py verify --years 2024
+    python database/cli.py discover --polls 0-30
+    python database/cli.py compare --polls 1,2,21
+
+Seasons default to 2004 through the current season and polls to 1,2 (`--polls all` takes every poll
+in the discovered catalog). Every subcommand imports only the modules it runs, so export and verify
+never load requests or asyncio. A backfill first checks in SQLite which (season, poll) pairs can have
+anything new: the current season, and closed seasons whose ingested weeks fall short of the weeks
+ESPN listed (poll_coverage, saved by every backfill). Seasons a poll has no weeks in (poll_probe) are
+left out, and `--polls all` only asks for the seasons the catalog has for each poll. When there is
+nothing to do, backfill.py is never imported and the run exits in milliseconds.
+"""
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from cache import FIRST_YEAR, NEGATIVE_TTL, current_season_year, default_years, season_closed
+from metrics import METRICS, REPORT_PATH
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+DB_PATH = BASE_DIR / "data" / "college.db"
+
+DEFAULT_POLL_IDS = [1, 2]
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+
+def configure_logging(level: int = logging.INFO):
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+def parse_range(value: str) -> List[int]:
+    """'2004-2024' or '1,2,21'."""
+    if "-" in value:
+        start, end = value.split("-")
+        return list(range(int(start), int(end) + 1))
+    return [int(v) for v in value.split(",")]
+
+
+def parse_polls(value: str):
+    return value if value == "all" else parse_range(value)
+
+
+def pending_backfill(conn: sqlite3.Connection, years: Sequence[int], poll_ids: Sequence[int],
+                     catalog_only: bool = False) -> List[Tuple[int, int]]:
+    """
+    (year, poll id) pairs a backfill may change. The current season always: ESPN may have a new or
+    revised week. A closed season only while it has no coverage yet, or fewer ingested weeks than
+    its coverage lists for some season type (an interrupted run, failed or held back weeks), or
+    whose coverage was saved before the season closed (the listing may lack the final polls).
+
+    Pairs ESPN has no weeks for (a negative poll_probe, from discover.py or an earlier backfill) are
+    left out once the season has closed, and for NEGATIVE_TTL in the current season. catalog_only
+    (`--polls all`) also leaves out closed seasons a poll has no coverage for.
+    """
+    now = time.time()
+    missing = {
+        (year, poll_id)
+        for poll_id, year, probed_at in conn.execute(
+            "SELECT poll_probe_poll_id, poll_probe_season_year, poll_probe_probed_at FROM poll_probe "
+            "WHERE NOT poll_probe_found"
+        )
+        if season_closed(year, probed_at) or now - probed_at < NEGATIVE_TTL
+    }
+    coverage, ingested, provisional = {}, {}, set()
+    for poll_id, year, season_type, week_count, discovered_at in conn.execute("""
+        SELECT poll_coverage_poll_fk, poll_coverage_season_year, poll_coverage_season_type_fk,
+               poll_coverage_week_count, poll_coverage_discovered_at
+        FROM poll_coverage
+    """):
+        # CURRENT_TIMESTAMP text compares in date order; a season closes on Feb 1 of the next year
+        if discovered_at < f"{year + 1}-02-01":
+            provisional.add((year, poll_id))
+        coverage.setdefault((year, poll_id), []).append((season_type, week_count))
+    for poll_id, year, season_type, weeks in conn.execute("""
+        SELECT il.ingest_log_poll_fk, s.season_year, w.week_season_type_fk, COUNT(*)
+        FROM ingest_log il
+        JOIN week w   ON il.ingest_log_week_fk = w.week_pk
+        JOIN season s ON w.week_season_fk = s.season_pk
+        GROUP BY 1, 2, 3
+    """):
+        ingested[(year, poll_id, season_type)] = weeks
+
+    current = current_season_year()
+    pending = []
+    for year in years:
+        for poll_id in poll_ids:
+            types = coverage.get((year, poll_id))
+            if (year, poll_id) in missing or (catalog_only and year < current and not types):
+                continue
+            if year >= current or not types or (year, poll_id) in provisional or any(
+                ingested.get((year, poll_id, season_type), 0) < week_count for season_type, week_count in types
+            ):
+                pending.append((year, poll_id))
+    return pending
+
+
+def catalog_poll_ids(conn: sqlite3.Connection, years: Optional[List[int]] = None) -> List[int]:
+    """Poll ids with discovered coverage (in any of years, if given)."""
+    query = "SELECT DISTINCT poll_coverage_poll_fk FROM poll_coverage"
+    params: list = []
+    if years:
+        query += f" WHERE poll_coverage_season_year IN ({', '.join('?' * len(years))})"
+        params = list(years)
+    return [poll_id for (poll_id,) in conn.execute(query + " ORDER BY 1", params)]
+
+
+def refresh_stale(conn: sqlite3.Connection):
+    """Refresh the season summaries an earlier backfill held back, once they verify (see summaries.py)."""
+    from summaries import refresh_verified, stale_seasons
+    if stale_seasons(conn):
+        refresh_verified(conn, []).raise_if_failed()
+
+
+def resolve_polls(args) -> Tuple[List[int], bool]:
+    """(poll ids, whether they come from the discovered catalog)."""
+    if args.polls != "all":
+        return args.polls, False
+    conn = sqlite3.connect(args.db)
+    catalog = catalog_poll_ids(conn, args.years)
+    conn.close()
+    if not catalog:
+        print(f"⚠️  No discovered polls in the catalog (run discover first), using {DEFAULT_POLL_IDS}")
+        return DEFAULT_POLL_IDS, False
+    return catalog, True
+
+
+def run_discover(args, poll_ids: Optional[List[int]] = None):
+    import discover
+    with METRICS.timer("stage_seconds", stage="discover"):
+        if poll_ids is None:
+            discover.main(years=args.years, db_path=args.db)
+        else:
+            discover.main(poll_ids=poll_ids, years=args.years, db_path=args.db)
+
+
+def run_backfill(args):
+    poll_ids, from_catalog = resolve_polls(args)
+    conn = sqlite3.connect(args.db)
+    pending = pending_backfill(conn, args.years, poll_ids, catalog_only=from_catalog)
+    if not pending:
+        print(f"✅ Nothing to backfill: every season of {args.years[0]}-{args.years[-1]} is complete "
+              f"for poll ids {', '.join(map(str, poll_ids))}")
+        try:
+            refresh_stale(conn)
+        finally:
+            conn.close()
+        return
+    conn.close()
+
+    import backfill
+    backfill.DB_PATH = args.db
+    years = sorted({year for year, _ in pending})
+    poll_ids = sorted({poll_id for _, poll_id in pending})
+    logging.info(f"{len(pending)} season x poll pairs to check: seasons {', '.join(map(str, years))}")
+    with METRICS.timer("stage_seconds", stage="backfill"):
+        backfill.main(years=years, poll_ids=poll_ids, processes=args.processes, pairs=pending)
+
+
+def cmd_init(args):
+    import init_db
+    init_db.DB_PATH = args.db
+    print("Initiating Database:")
+    with METRICS.timer("stage_seconds", stage="init_db"):
+        init_db.init_db(drop=not args.incremental)
+    print("DONE.")
+    if args.discover:
+        print("\nDiscovering ESPN polls")
+        run_discover(args)
+        print("DONE.")
+    print("\nBackfilling DB from ESPN")
+    run_backfill(args)
+    print("DONE.")
+
+
+def cmd_backfill(args):
+    if not Path(args.db).exists():
+        raise SystemExit(f"❌ No database at {args.db}, run `cli.py init` first")
+    run_backfill(args)
+
+
+def cmd_export(args):
+    import export
+    export.DB_PATH = args.db
+    export.main(engine=args.engine, combined=args.combined, snapshot=args.snapshot, check=not args.no_verify)
+
+
+def cmd_verify(args):
+    import verify
+    return 0 if verify.main(args.years, args.db) else 1
+
+
+def cmd_discover(args):
+    run_discover(args, args.polls)
+
+
+def cmd_compare(args):
+    import compare  # numpy is only needed for this command
+    compare.main(poll_ids=args.polls, force=args.force, db_path=args.db)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", type=Path, default=DB_PATH, help="database file (default: database/data/college.db)")
+    common.add_argument("-v", "--verbose", action="store_true", help="log every ranking row (debug level)")
+    common.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+
+    # seasons x polls to fetch, and the run report
+    fetch = argparse.ArgumentParser(add_help=False)
+    fetch.add_argument("--years", type=parse_range, default=None,
+                       help=f"seasons, e.g. 2020-2024 or 2004,2024 (default: {FIRST_YEAR} to the current season)")
+    fetch.add_argument("--polls", type=parse_polls, default=DEFAULT_POLL_IDS,
+                       help="poll ids, e.g. 1,2,21, or 'all' for every poll in the discovered catalog (default: 1,2)")
+    fetch.add_argument("--processes", type=int, default=1,
+                       help="backfill seasons in this many worker processes and merge them (default: 1, serial)")
+    fetch.add_argument("--report", type=Path, default=None,
+                       help="where to write the JSON run report (default: database/data/run_report.json)")
+    fetch.add_argument("--prometheus", type=Path, default=None,
+                       help="also write the run's metrics in Prometheus text format to this file")
+
+    parser = argparse.ArgumentParser(description="Build, update, check and export the rankings database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    init = sub.add_parser("init", parents=[common, fetch], help="create (or migrate) the database and backfill it")
+    init.add_argument("--incremental", action="store_true",
+                      help="keep the existing database and only fetch weeks that are missing or changed")
+    init.add_argument("--discover", action="store_true",
+                      help="scan ESPN for poll ids and their seasons (database/discover.py) before backfilling")
+    init.set_defaults(run=cmd_init)
+
+    backfill = sub.add_parser("backfill", parents=[common, fetch],
+                              help="fetch missing or changed weeks into an existing database")
+    backfill.set_defaults(run=cmd_backfill)
+
+    export = sub.add_parser("export", parents=[common], help="export the analytics views as JSON for the frontend")
+    export.add_argument("--engine", choices=["sql", "numpy"], default="sql",
+                        help="compute the views in SQLite (default) or with the NumPy engine in analytics.py")
+    export.add_argument("--combined", action="store_true",
+                        help="also write one combined file per view (rankings.json, overrated.json, …)")
+    export.add_argument("--snapshot", action="store_true",
+                        help="also write the binary columnar snapshot of the rankings (database/snapshot.py)")
+    export.add_argument("--no-verify", action="store_true",
+                        help="export even if the rankings fail the integrity checks (database/verify.py)")
+    export.set_defaults(run=cmd_export)
+
+    check = sub.add_parser("verify", parents=[common], help="check the rankings for integrity problems")
+    check.add_argument("--years", type=parse_range, default=None, help="seasons to check, e.g. 2020-2024 (default: all)")
+    check.set_defaults(run=cmd_verify)
+
+    scan = sub.add_parser("discover", parents=[common], help="discover ESPN poll ids and their season coverage")
+    scan.add_argument("--polls", type=parse_range, default=list(range(100)), help="poll ids to scan (default: 0-99)")
+    scan.add_argument("--years", type=parse_range, default=None,
+                      help=f"seasons to scan (default: {FIRST_YEAR} to the current season)")
+    scan.set_defaults(run=cmd_discover)
+
+    agree = sub.add_parser("compare", parents=[common],
+                           help="compare polls week by week and team by team (database/compare.py)")
+    agree.add_argument("--polls", type=parse_range, default=None,
+                       help="poll ids to compare pairwise (default: compare.POLL_IDS, i.e. 1,2,21)")
+    agree.add_argument("--force", action="store_true", help="recompute every season, not just changed ones")
+    agree.set_defaults(run=cmd_compare)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # per week at the default level; per row only with -v
+    configure_logging(logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO)
+    if args.command in ("init", "backfill", "discover") and args.years is None:
+        args.years = default_years()
+
+    start_time = time.perf_counter()
+    try:
+        status = args.run(args) or 0
+    finally:
+        if args.command in ("init", "backfill"):
+            METRICS.write_report(args.report or REPORT_PATH)
+            if args.prometheus:
+                METRICS.write_prometheus(args.prometheus)
+    if args.command in ("init", "backfill"):
+        print(f"\nTotal execution time: {time.perf_counter() - start_time:.2f} seconds")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Cross-poll comparison (NumPy): how closely polls agree, week by week and team by team.
+
+Polls are aligned on the week they were released for (season, season type, week number, i.e. the
+shared week row), and each week becomes a poll x team rank matrix (26 = unranked). For every pair
+of polls it stores, per week (poll_agreement): Spearman rank correlation over the teams either poll
+ranks, and the top-10 and top-25 overlap; per season and team (poll_team_bias): the mean rank
+difference over the weeks both rank the team, and the weeks only one of them does.
+
+All stale seasons are computed in one vectorized pass. Results are cached per season with a
+fingerprint of the season's ingest_log rows, so a rerun only recomputes seasons that got new data:
+
+    python database/cli.py compare                   # AP, Coaches and Playoff (1, 2, 21)
+    python database/cli.py compare --polls 1,2 --force
+"""
+import hashlib
+import itertools
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from analytics import UNRANKED
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+DB_PATH = BASE_DIR / "data" / "college.db"
+POLL_IDS = [1, 2, 21]   # AP Top 25, AFCA Coaches Poll, Playoff Committee Rankings
+
+
+def season_fingerprints(conn: sqlite3.Connection, poll_ids: Sequence[int]) -> Dict[int, str]:
+    """sha256 per season of its ingest_log rows for poll_ids, by natural keys (stable across rebuilds)."""
+    rows = conn.execute(f"""
+        SELECT s.season_year, il.ingest_log_poll_fk, w.week_season_type_fk, w.week_number, il.ingest_log_content_hash
+        FROM ingest_log il
+        JOIN week w   ON il.ingest_log_week_fk = w.week_pk
+        JOIN season s ON w.week_season_fk = s.season_pk
+        WHERE il.ingest_log_poll_fk IN ({', '.join('?' * len(poll_ids))})
+        ORDER BY 1, 2, 3, 4
+    """, list(poll_ids))
+    digests = defaultdict(hashlib.sha256)
+    for year, poll_id, season_type, week_number, content_hash in rows:
+        digests[year].update(f"{poll_id}:{season_type}:{week_number}:{content_hash}\n".encode())
+    return {year: digest.hexdigest() for year, digest in digests.items()}
+
+
+def average_ranks(ranks: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Per row, the rank of each masked value among the row's masked values, ties averaged."""
+    m = mask[:, None, :]
+    less = ((ranks[:, None, :] < ranks[:, :, None]) & m).sum(axis=2)
+    equal = ((ranks[:, None, :] == ranks[:, :, None]) & m).sum(axis=2)
+    return less + (equal + 1) / 2
+
+
+def masked_correlation(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Per row Pearson correlation over the masked columns; NaN where it is undefined."""
+    n = mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(mask, x - (x * mask).sum(axis=1, keepdims=True) / n[:, None], 0)
+        dy = np.where(mask, y - (y * mask).sum(axis=1, keepdims=True) / n[:, None], 0)
+        return (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+
+
+class PollComparison:
+    def __init__(self, conn: sqlite3.Connection, poll_ids: Sequence[int] = POLL_IDS):
+        if len(poll_ids) < 2:
+            raise ValueError("Need at least two polls to compare")
+        self.conn = conn
+        self.poll_ids = list(poll_ids)
+        self.key = ",".join(map(str, self.poll_ids))
+
+    def stale_seasons(self, fingerprints: Dict[int, str]) -> List[int]:
+        cached = dict(self.conn.execute("""
+            SELECT poll_comparison_season_year, poll_comparison_season_fingerprint
+            FROM poll_comparison_season WHERE poll_comparison_season_polls = ?
+        """, (self.key,)))
+        return sorted(year for year in set(fingerprints) | set(cached) if fingerprints.get(year) != cached.get(year))
+
+    def refresh(self, force: bool = False) -> List[int]:
+        """Recompute the seasons whose data changed (all with force); returns them."""
+        fingerprints = season_fingerprints(self.conn, self.poll_ids)
+        years = sorted(fingerprints) if force else self.stale_seasons(fingerprints)
+        if not years:
+            return []
+        agreement, bias = self.compute(years)
+        self.save(years, fingerprints, agreement, bias)
+        return years
+
+    def compute(self, years: List[int]):
+        """(poll_agreement rows, poll_team_bias rows) for the given seasons."""
+        polls, years_in = ", ".join("?" * len(self.poll_ids)), ", ".join("?" * len(years))
+        rows = self.conn.execute(f"""
+            SELECT r.ranking_poll_fk, r.ranking_week_fk, r.ranking_team_fk, r.ranking_current_rank, s.season_year
+            FROM ranking r
+            JOIN week w   ON r.ranking_week_fk = w.week_pk
+            JOIN season s ON w.week_season_fk = s.season_pk
+            WHERE r.ranking_poll_fk IN ({polls}) AND s.season_year IN ({years_in})
+            ORDER BY s.season_year, w.week_season_type_fk, w.week_number
+        """, self.poll_ids + years).fetchall()
+        if not rows:
+            return [], []
+        poll_fk, week_fk, team_fk, rank, season_year = (np.array(c, dtype=np.int64) for c in zip(*rows))
+
+        # weeks in calendar order (the query's order), teams and polls as matrix axes
+        week_keys, week_first = np.unique(week_fk, return_index=True)
+        calendar = np.argsort(week_first)
+        weeks, week_years = week_keys[calendar], season_year[week_first[calendar]]
+        week_index = np.empty_like(calendar)
+        week_index[calendar] = np.arange(len(calendar))
+        week_idx = week_index[np.searchsorted(week_keys, week_fk)]
+        teams, team_idx = np.unique(team_fk, return_inverse=True)
+        poll_position = np.zeros(max(self.poll_ids) + 1, dtype=np.int64)   # poll id -> axis, in the given order
+        poll_position[self.poll_ids] = np.arange(len(self.poll_ids))
+        poll_idx = poll_position[poll_fk]
+
+        matrix = np.full((len(self.poll_ids), len(weeks), len(teams)), UNRANKED, dtype=np.int64)
+        np.minimum.at(matrix, (poll_idx, week_idx, team_idx), rank)
+        released = np.zeros((len(self.poll_ids), len(weeks)), dtype=bool)
+        released[poll_idx, week_idx] = True
+        season_values, season_idx = np.unique(week_years, return_inverse=True)
+
+        agreement, bias = [], []
+        for a, b in itertools.combinations(range(len(self.poll_ids)), 2):
+            both_weeks = released[a] & released[b]
+            if not both_weeks.any():
+                continue
+            ra, rb = matrix[a][both_weeks], matrix[b][both_weeks]
+            in_a, in_b = ra < UNRANKED, rb < UNRANKED
+            either = in_a | in_b
+            spearman = masked_correlation(average_ranks(ra, either), average_ranks(rb, either), either)
+            top10 = ((ra <= 10) & (rb <= 10)).sum(axis=1)
+            top25 = (in_a & in_b).sum(axis=1)
+            poll_a, poll_b = self.poll_ids[a], self.poll_ids[b]
+            agreement += [
+                (poll_a, poll_b, week, year, teams_ranked, None if np.isnan(rho) else rho, overlap10, overlap25)
+                for week, year, teams_ranked, rho, overlap10, overlap25 in zip(
+                    weeks[both_weeks].tolist(), week_years[both_weeks].tolist(), either.sum(axis=1).tolist(),
+                    spearman.tolist(), top10.tolist(), top25.tolist())
+            ]
+
+            # per season x team sums over the weeks both polls released
+            seasons = season_idx[both_weeks]
+            shape = (len(season_values), len(teams))
+            both, only_a, only_b, diff = (np.zeros(shape, dtype=np.int64) for _ in range(4))
+            np.add.at(both, seasons, in_a & in_b)
+            np.add.at(only_a, seasons, in_a & ~in_b)
+            np.add.at(only_b, seasons, in_b & ~in_a)
+            np.add.at(diff, seasons, np.where(in_a & in_b, ra - rb, 0))
+            for s, t in zip(*np.nonzero(both + only_a + only_b)):
+                mean = diff[s, t] / both[s, t] if both[s, t] else None
+                bias.append((poll_a, poll_b, int(season_values[s]), int(teams[t]), int(both[s, t]),
+                             None if mean is None else float(mean), int(only_a[s, t]), int(only_b[s, t])))
+        return agreement, bias
+
+    def save(self, years: List[int], fingerprints: Dict[int, str], agreement: list, bias: list):
+        polls, years_in = ", ".join("?" * len(self.poll_ids)), ", ".join("?" * len(years))
+        with self.conn:
+            self.conn.execute(f"""
+                DELETE FROM poll_agreement
+                WHERE poll_agreement_season_year IN ({years_in})
+                  AND poll_agreement_poll_a_fk IN ({polls}) AND poll_agreement_poll_b_fk IN ({polls})
+            """, years + self.poll_ids + self.poll_ids)
+            self.conn.execute(f"""
+                DELETE FROM poll_team_bias
+                WHERE poll_team_bias_season_year IN ({years_in})
+                  AND poll_team_bias_poll_a_fk IN ({polls}) AND poll_team_bias_poll_b_fk IN ({polls})
+            """, years + self.poll_ids + self.poll_ids)
+            self.conn.executemany("INSERT INTO poll_agreement VALUES (?, ?, ?, ?, ?, ?, ?, ?)", agreement)
+            self.conn.executemany("INSERT INTO poll_team_bias VALUES (?, ?, ?, ?, ?, ?, ?, ?)", bias)
+            self.conn.execute(f"""
+                DELETE FROM poll_comparison_season
+                WHERE poll_comparison_season_polls = ? AND poll_comparison_season_year IN ({years_in})
+            """, [self.key] + years)
+            self.conn.executemany("""
+                INSERT INTO poll_comparison_season (poll_comparison_season_year, poll_comparison_season_polls,
+                                                    poll_comparison_season_fingerprint)
+                VALUES (?, ?, ?)
+            """, [(year, self.key, fingerprints[year]) for year in years if year in fingerprints])
+
+
+def print_summary(conn: sqlite3.Connection, poll_ids: Sequence[int], biased: int = 5):
+    names = dict(conn.execute("SELECT poll_pk, poll_name FROM poll"))
+    for a, b in itertools.combinations(poll_ids, 2):
+        weeks, spearman, top10, seasons = conn.execute("""
+            SELECT COUNT(*), AVG(poll_agreement_spearman), AVG(poll_agreement_top10_overlap),
+                   COUNT(DISTINCT poll_agreement_season_year)
+            FROM poll_agreement WHERE poll_agreement_poll_a_fk = ? AND poll_agreement_poll_b_fk = ?
+        """, (a, b)).fetchone()
+        if not weeks:
+            continue
+        print(f"\n{names.get(a, a)} vs {names.get(b, b)}: {weeks} weeks over {seasons} seasons, "
+              f"mean Spearman {spearman:.3f}, mean top-10 overlap {top10:.1f}")
+        rows = conn.execute("""
+            SELECT t.team_name, SUM(poll_team_bias_weeks_both),
+                   SUM(poll_team_bias_mean_rank_diff * poll_team_bias_weeks_both) / SUM(poll_team_bias_weeks_both) AS diff
+            FROM poll_team_bias
+            JOIN team t ON poll_team_bias_team_fk = t.team_pk
+            WHERE poll_team_bias_poll_a_fk = ? AND poll_team_bias_poll_b_fk = ? AND poll_team_bias_weeks_both > 0
+            GROUP BY t.team_pk
+            HAVING SUM(poll_team_bias_weeks_both) >= 10
+            ORDER BY ABS(diff) DESC
+            LIMIT ?
+        """, (a, b, biased)).fetchall()
+        for team_name, weeks_both, diff in rows:
+            rated_higher = names.get(b, b) if diff > 0 else names.get(a, a)
+            print(f"  {team_name:30} {abs(diff):5.2f} places higher in {rated_higher} ({weeks_both} weeks)")
+
+
+def main(poll_ids: Optional[Sequence[int]] = None, force: bool = False, db_path: Optional[Path] = None):
+    poll_ids = list(poll_ids or POLL_IDS)
+    conn = sqlite3.connect(db_path or DB_PATH)
+    try:
+        start = time.perf_counter()
+        years = PollComparison(conn, poll_ids).refresh(force=force)
+        print(f"Recomputed {len(years)} season(s) in {time.perf_counter() - start:.2f}s"
+              + (f": {years[0]}-{years[-1]}" if years else ", all cached seasons are current"))
+        print_summary(conn, poll_ids)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from cli import main as cli_main
+
+    sys.exit(cli_main(["compare", *sys.argv[1:]]))
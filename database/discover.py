@@ -0,0 +1,148 @@
+"""
+Discover which ESPN poll ids exist and which seasons they cover, and write the catalog to the db.
+
+Scans a poll id x season grid concurrently through ESPNClient (shared pool, rate limit and http
+cache). Found polls are added to `poll` (named from one of their week documents; existing names are
+kept) and their weeks per season type recorded in `poll_coverage`. Every probe, found or not, goes in
+`poll_probe`, so closed seasons are never asked about again and the current season only after
+NEGATIVE_TTL; a rescan against a warm cache only touches the db.
+
+    python database/discover.py                                  # poll ids 0-99, 2004 to the current season
+    python database/discover.py --polls 0-30 --years 2020-2024
+"""
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from backfill import DB_PATH, Database
+from cache import NEGATIVE_TTL, ResponseCache, default_years, season_closed
+from espn import ESPNClient
+
+SCAN_POLL_IDS = range(100)
+
+
+class Discovery:
+    def __init__(self, db: Database, client: ESPNClient):
+        self.db = db
+        self.client = client
+
+    def pending(self, poll_ids, years) -> List[Tuple[int, int]]:
+        """
+        (poll id, year) pairs that need probing: never probed, or probed before the season closed more
+        than NEGATIVE_TTL ago (a probe of the current season, or of a closed season while it was running).
+        """
+        now = time.time()
+        probed = {
+            (poll_id, year): probed_at
+            for poll_id, year, probed_at in self.db.conn.execute(
+                "SELECT poll_probe_poll_id, poll_probe_season_year, poll_probe_probed_at FROM poll_probe"
+            )
+        }
+        todo = []
+        for year in years:
+            for poll_id in poll_ids:
+                probed_at = probed.get((poll_id, year))
+                if probed_at is None or (not season_closed(year, probed_at) and now - probed_at > NEGATIVE_TTL):
+                    todo.append((poll_id, year))
+        return todo
+
+    def scan(self, poll_ids, years) -> Dict[str, int]:
+        todo = self.pending(poll_ids, years)
+        logging.info(f"Probing {len(todo)} of {len(poll_ids) * len(years)} poll id x season pairs")
+        results, names = asyncio.run(self._scan(todo)) if todo else ({}, {})
+        self._save(results, names)
+        return {
+            "probed": len(todo),
+            "found": sum(isinstance(weeks, list) for weeks in results.values()),
+            "errors": sum(1 for weeks in results.values() if isinstance(weeks, Exception)),
+            "new_polls": len(names),
+        }
+
+    async def _probe(self, poll_id: int, year: int):
+        """The poll's weeks for a season, None if ESPN has no such poll/season, or the exception."""
+        try:
+            weeks = await self.client.aget_weeks(year, poll_id)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            return e
+        except Exception as e:
+            return e
+        return weeks or None
+
+    async def _scan(self, todo: List[Tuple[int, int]]):
+        probes = await asyncio.gather(*(self._probe(poll_id, year) for poll_id, year in todo))
+        results = dict(zip(todo, probes))
+        for (poll_id, year), weeks in results.items():
+            if isinstance(weeks, Exception):
+                logging.warning(f"Probe of poll id {poll_id} {year} failed, will retry next scan: {weeks}")
+
+        # name polls missing from the catalog from their latest week document
+        known = {pk for (pk,) in self.db.conn.execute("SELECT poll_pk FROM poll")}
+        latest: Dict[int, Dict[str, Any]] = {}
+        for (poll_id, year), weeks in sorted(results.items(), key=lambda item: item[0][1]):
+            if poll_id not in known and isinstance(weeks, list):
+                latest[poll_id] = weeks[-1]
+        docs = await asyncio.gather(*(self.client.aget_poll_data(w["url"]) for w in latest.values()),
+                                    return_exceptions=True)
+        names = {}
+        for poll_id, doc in zip(latest, docs):
+            if isinstance(doc, Exception) or not doc.get("name"):
+                logging.warning(f"Could not name poll id {poll_id}: {doc}")
+                names[poll_id] = f"ESPN poll {poll_id}"
+            else:
+                names[poll_id] = doc["name"]
+        return results, names
+
+    def _save(self, results: Dict[Tuple[int, int], Any], names: Dict[int, str]):
+        now = time.time()
+        # a failed probe is not recorded: probe again next scan
+        found = {key: weeks for key, weeks in sorted(results.items()) if not isinstance(weeks, Exception)}
+        probes = [(poll_id, year, weeks is not None, now) for (poll_id, year), weeks in found.items()]
+
+        with self.db.transaction():
+            self.db.conn.executemany("INSERT INTO poll (poll_pk, poll_name) VALUES (?, ?)", sorted(names.items()))
+            for (poll_id, year), weeks in found.items():
+                self.db.replace_poll_coverage(poll_id, year, weeks or [])
+            self.db.save_poll_probes(probes)
+
+
+def print_catalog(conn):
+    rows = conn.execute("""
+        SELECT p.poll_pk, p.poll_name, MIN(c.poll_coverage_season_year), MAX(c.poll_coverage_season_year),
+               COUNT(DISTINCT c.poll_coverage_season_year), GROUP_CONCAT(DISTINCT c.poll_coverage_season_type_fk)
+        FROM poll p
+        JOIN poll_coverage c ON c.poll_coverage_poll_fk = p.poll_pk
+        GROUP BY p.poll_pk
+        ORDER BY p.poll_pk
+    """).fetchall()
+    for poll_pk, name, first, last, seasons, types in rows:
+        print(f"poll_id {poll_pk:>3} → {name}: {first}-{last} ({seasons} seasons, season types {types})")
+
+
+def main(poll_ids=SCAN_POLL_IDS, years: Optional[List[int]] = None, max_in_flight: int = 16,
+         rate_limit: Optional[float] = 50.0, db_path: Optional[Path] = None):
+    years = years or default_years()
+    client = ESPNClient(cache=ResponseCache(), max_in_flight=max_in_flight, rate_limit=rate_limit)
+    db = Database(db_path or DB_PATH)
+    try:
+        start = time.perf_counter()
+        summary = Discovery(db, client).scan(list(poll_ids), years)
+        print(f"Probed {summary['probed']} pairs in {time.perf_counter() - start:.2f}s: {summary['found']} found, "
+              f"{summary['errors']} failed, {summary['new_polls']} new polls")
+        print_catalog(db.conn)
+    finally:
+        db.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from cli import main as cli_main
+
+    sys.exit(cli_main(["discover", *sys.argv[1:]]))
@@ -0,0 +1,201 @@
+"""
+ESPN API client: one pooled `requests` session driven from asyncio, with a cap on requests in
+flight, a token-bucket rate limit, retries with backoff and the on-disk http cache (cache.py).
+
+Kept apart from backfill.py so the database CLI only imports requests when it talks to ESPN.
+"""
+import asyncio
+import functools
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from cache import ResponseCache
+from metrics import METRICS
+
+ENDPOINT_PATTERNS = [
+    ("team", re.compile(r"/seasons/\d+/teams/\d+")),
+    ("week", re.compile(r"/weeks/\d+/rankings/\d+")),
+    ("listing", re.compile(r"/seasons/\d+/rankings/\d+")),
+]
+
+
+def endpoint_type(url: str) -> str:
+    """Metrics label for a request: listing, week, team or other."""
+    for name, pattern in ENDPOINT_PATTERNS:
+        if pattern.search(url):
+            return name
+    return "other"
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` requests per second with bursts up to `burst`."""
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ESPNClient:
+    """
+    ESPN API client. The async methods (`aget_*`) share one keep-alive connection pool, a global cap
+    on requests in flight and a token-bucket rate limit; the sync methods are thin wrappers for scripts.
+    """
+    BASE_URL = "https://sports.core.api.espn.com/v2/sports/football/leagues/college-football"
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, cache: Optional[ResponseCache] = None, base_url: Optional[str] = None,
+                 max_in_flight: int = 16, rate_limit: Optional[float] = 50.0,
+                 max_tries: int = 10, backoff: float = 1.0, timeout: float = 30.0,
+                 recorder=None):
+        if max_tries < 1:
+            raise ValueError(f"max_tries must be at least 1, got {max_tries}")
+        self.cache = cache
+        self.recorder = recorder   # e.g. fixtures.FixtureRecorder, sees every response body used
+        self.base_url = base_url or self.BASE_URL
+        self.max_in_flight = max_in_flight
+        self.rate_limit = rate_limit
+        self.max_tries = max_tries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        # one pooled session for every request; the executor runs its blocking calls
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+        self._loop = None
+        self._in_flight = None
+        self._bucket = None
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def _limits(self):
+        # asyncio primitives belong to one event loop, so rebuild them for each new loop
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+            self._bucket = TokenBucket(self.rate_limit) if self.rate_limit else None
+        return self._in_flight, self._bucket
+
+    async def get_request(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET with retries on 429/5xx and connection errors, backing off without blocking the loop."""
+        in_flight, bucket = self._limits()
+        loop = asyncio.get_running_loop()
+        endpoint = endpoint_type(url)
+        sleep_time = self.backoff
+        for attempt in range(1, self.max_tries + 1):
+            async with in_flight:
+                if bucket is not None:
+                    await bucket.acquire()
+                start = time.perf_counter()
+                try:
+                    resp = await loop.run_in_executor(
+                        self.executor, functools.partial(self.session.get, url, headers=headers, timeout=self.timeout)
+                    )
+                    METRICS.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+                    METRICS.inc("http_requests_total", endpoint=endpoint, status=resp.status_code)
+                    if resp.status_code not in self.RETRY_STATUSES:
+                        resp.raise_for_status()
+                        return resp
+                    error = requests.exceptions.HTTPError(f"{resp.status_code} for url: {url}", response=resp)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    METRICS.inc("http_requests_total", endpoint=endpoint, status=type(e).__name__)
+                    error = e
+            if attempt == self.max_tries:
+                METRICS.inc("http_failures_total", endpoint=endpoint)
+                break
+            METRICS.inc("http_retries_total", endpoint=endpoint)
+            logging.warning(f"HTTP Error Occured: {error}. Retrying in {sleep_time}s ({attempt}/{self.max_tries})")
+            await asyncio.sleep(sleep_time)
+            sleep_time *= 2
+        raise error
+
+    async def aget_json(self, url: str) -> Dict[str, Any]:
+        body = await self.aget_body(url)
+        if self.recorder is not None:
+            self.recorder.record(url, body)
+        return json.loads(body)
+
+    async def aget_body(self, url: str) -> bytes:
+        if self.cache is None:
+            return (await self.get_request(url)).content
+
+        endpoint = endpoint_type(url)
+        cached = self.cache.get(url)
+        if cached is not None and cached.is_fresh():
+            METRICS.inc("http_cache_total", endpoint=endpoint, result="hit")
+            return cached.body
+
+        # stale or missing: revalidate with ETag / Last-Modified when we have them
+        resp = await self.get_request(url, headers=cached.validators() if cached else None)
+        if resp.status_code == 304 and cached is not None:
+            METRICS.inc("http_cache_total", endpoint=endpoint, result="revalidated")
+            self.cache.revalidated(url)
+            return cached.body
+        METRICS.inc("http_cache_total", endpoint=endpoint, result="miss" if cached is None else "stale")
+        self.cache.put(url, resp.content, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return resp.content
+
+    async def aget_weeks(self, year: int, poll_id: int) -> List[Dict[str, Any]]:
+        """Fetch all weeks for a given year & poll."""
+        listing_url = f"{self.base_url}/seasons/{year}/rankings/{poll_id}?lang=en&region=us"
+        listing = await self.aget_json(listing_url)
+
+        weeks = []
+        for r in listing.get("rankings", []):
+            ref = r.get("$ref", "")
+            m = re.search(r"/types/(\d+)/weeks/(\d+)/", ref)
+            if m:
+                weeks.append({
+                    "seasonType": int(m.group(1)),
+                    "week": int(m.group(2)),
+                    "url": ref
+                })
+        return weeks
+
+    async def aget_poll_data(self, url: str) -> Dict[str, Any]:
+        return await self.aget_json(url)
+
+    async def aget_team_data(self, ref: str) -> Dict[str, Any]:
+        return await self.aget_json(ref)
+
+    # sync wrappers, not for use inside a running event loop
+    def get_json(self, url: str) -> Dict[str, Any]:
+        return asyncio.run(self.aget_json(url))
+
+    def get_weeks(self, year: int, poll_id: int) -> List[Dict[str, Any]]:
+        return asyncio.run(self.aget_weeks(year, poll_id))
+
+    def get_poll_data(self, url: str) -> Dict[str, Any]:
+        return asyncio.run(self.aget_poll_data(url))
+
+    def get_team_data(self, ref: str) -> Dict[str, Any]:
+        return asyncio.run(self.aget_team_data(ref))
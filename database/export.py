@@ -1,9 +1,35 @@
 """
 Export data as JSON for use in frontend/data
+
+Each file is a columnar table (tables.py): column names once, one value array per column, and
+string columns dictionary-encoded. Rows are streamed from the cursor into one spool per column
+(spilling to disk past tables.COLUMN_SPOOL_BYTES), so memory stays bounded by the string
+dictionaries, and gzip (and brotli, if installed) siblings are written alongside each file in the
+same pass. Only the SQL engine streams; --engine numpy holds the whole RankingFrame in memory.
+
+By default the views are written as shards (one file per poll, and per poll and season for
+rankings) under data/shards, described by data/manifest.json with each shard's size and sha256.
+Shards whose content did not change are not rewritten, so a redeploy only uploads what changed.
 """
+import gzip
+import hashlib
+import itertools
+import os
+import shutil
 import sqlite3
 import json
+import tempfile
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from summaries import refresh_summaries, stale_seasons
+from tables import write_table
+from verify import verify
+
+try:
+    import brotli
+except ImportError:  # optional, only adds the .br siblings
+    brotli = None
 
 # Resolve paths relative to this script
 BASE_DIR = Path(__file__).resolve().parent.parent   # project root
@@ -21,32 +47,215 @@ EXPORTS = [
     ("v_team_collapse_index_stats", "collapse_stats.json"),
 ]
 
+# Shards: (sqlite view name, shard directory, columns the shards are split on).
+# Views are ordered by these columns, so each shard is a contiguous run of rows.
+SHARDS = [
+    ("v_team_rankings", "rankings", ("poll_name", "season_year")),
+    ("v_team_alltime_summary", "alltime_summary", ("poll_name",)),
+    ("v_team_overrated_index", "overrated", ("poll_name",)),
+    ("v_team_overrated_index_stats", "overrated_stats", ("poll_name",)),
+    ("v_team_collapse_index", "collapse", ("poll_name",)),
+    ("v_team_collapse_index_stats", "collapse_stats", ("poll_name",)),
+]
+SHARD_DIR = "shards"
+MANIFEST = "manifest.json"
+
 
 def query_view(conn, view_name: str):
-    """Return rows from a SQLite view as list of dicts."""
+    """Return (column names, row cursor) for a SQLite view."""
     cursor = conn.cursor()
     cursor.execute(f"SELECT * FROM {view_name}")
     cols = [desc[0] for desc in cursor.description]
-    rows = cursor.fetchall()
-    return [dict(zip(cols, row)) for row in rows]
+    return cols, cursor
+
+
+def query_engine(frame, view_name: str):
+    """Same as query_view, computed by the NumPy engine (analytics.py)."""
+    from analytics import VIEWS
+    return VIEWS[view_name](frame)
 
 
-def export_view(conn, view_name: str, filename: str):
+def sibling_paths(path: Path) -> List[Path]:
+    """The compressed files written next to path: .gz, and .br when brotli is installed."""
+    suffixes = [".gz", ".br"] if brotli is not None else [".gz"]
+    return [path.with_name(path.name + suffix) for suffix in suffixes]
+
+
+class CompressedSiblings:
+    """Text sink that writes path plus path.gz (and path.br) in one pass."""
+    def __init__(self, path: Path):
+        self.files = [open(path, "wb")]
+        self.gz_raw = open(path.with_name(path.name + ".gz"), "wb")
+        # mtime=0 keeps the .gz bytes stable when the content is unchanged
+        self.files.append(gzip.GzipFile(filename="", mode="wb", fileobj=self.gz_raw, compresslevel=9, mtime=0))
+        self.br_file = None
+        if brotli is not None:
+            self.br_file = open(path.with_name(path.name + ".br"), "wb")
+            self.br = brotli.Compressor(quality=11)
+        self.bytes_written = 0
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self.bytes_written += len(data)
+        for f in self.files:
+            f.write(data)
+        if self.br_file is not None:
+            self.br_file.write(self.br.process(data))
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.gz_raw.close()
+        if self.br_file is not None:
+            self.br_file.write(self.br.finish())
+            self.br_file.close()
+
+
+def export_view(conn, view_name: str, filename: str, frame=None):
     print(f"Exporting {view_name} → {filename}")
-    rows = query_view(conn, view_name)
+    cols, rows = query_view(conn, view_name) if frame is None else query_engine(frame, view_name)
+
+    out = CompressedSiblings(OUT_DIR / filename)
+    try:
+        write_table(out, cols, rows)
+    finally:
+        out.close()
+    return out.bytes_written
+
 
-    out_path = OUT_DIR / filename
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(rows, f, ensure_ascii=True, indent=2)  # pretty JSON, UTF-8
+class HashingWriter:
+    """Text sink that writes to a temporary file next to path while hashing what it writes."""
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+        self.file = os.fdopen(fd, "wb")
+        self.path = Path(name)
+        self.sha256 = hashlib.sha256()
+        self.bytes_written = 0
 
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self.bytes_written += len(data)
+        self.sha256.update(data)
+        self.file.write(data)
 
-def main():
+
+def write_if_changed(path: Path, write: Callable[[Any], None],
+                     previous: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Stream write(out) into a temporary file, then copy it to path (plus compressed siblings) unless
+    the manifest says path already holds the same bytes and its siblings exist (one was deleted, or
+    brotli was installed since the last export).
+    """
+    tmp = HashingWriter(path)
+    try:
+        try:
+            write(tmp)
+        finally:
+            tmp.file.close()
+        entry = {"bytes": tmp.bytes_written, "sha256": tmp.sha256.hexdigest()}
+        if previous == entry and all(p.exists() for p in [path, *sibling_paths(path)]):
+            return entry, False
+        out = CompressedSiblings(path)
+        try:
+            with open(tmp.path, "r", encoding="utf-8") as f:
+                shutil.copyfileobj(f, out)
+        finally:
+            out.close()
+        return entry, True
+    finally:
+        tmp.path.unlink(missing_ok=True)
+
+
+def export_shards(conn, view_name: str, shard_name: str, split_on: Tuple[str, ...], poll_pks: Dict[str, int],
+                  previous: Dict[str, Any], frame=None) -> Dict[str, Any]:
+    """Write one view as shards; returns the manifest entries keyed by path relative to OUT_DIR."""
+    cols, rows = query_view(conn, view_name) if frame is None else query_engine(frame, view_name)
+    key_idx = [cols.index(c) for c in split_on]
+    entries, written, seen = {}, 0, set()
+
+    for key, group in itertools.groupby(rows, key=lambda r: tuple(r[i] for i in key_idx)):
+        if key in seen:
+            raise ValueError(f"{view_name} is not ordered by {split_on}, shard {key} is not contiguous")
+        seen.add(key)
+        # poll names become poll_pk in the path: /shards/rankings/1/2024.json
+        parts = [str(poll_pks[k]) if col == "poll_name" else str(k) for col, k in zip(split_on, key)]
+        rel = "/".join([SHARD_DIR, shard_name, *parts]) + ".json"
+
+        entries[rel], changed = write_if_changed(OUT_DIR / rel, lambda out: write_table(out, cols, group),
+                                                 previous.get(rel))
+        written += changed
+    print(f"Exporting {view_name} → {SHARD_DIR}/{shard_name} ({len(entries)} shards, {written} changed)")
+    return entries
+
+
+def main(engine: str = "sql", combined: bool = False, snapshot: bool = False, check: bool = True):
     conn = sqlite3.connect(DB_PATH)
-    for view, fname in EXPORTS:
-        export_view(conn, view, fname)
+    if check:
+        report = verify(conn)
+        report.print()
+        if not report.ok:
+            conn.close()
+            report.raise_if_failed()
+    stale = sorted(stale_seasons(conn))
+    if stale and check:
+        # verified just now, so the refresh a failed backfill held back can run
+        print(f"Refreshing stale season summaries of {', '.join(map(str, stale))}")
+        refresh_summaries(conn, stale)
+    elif stale:
+        print(f"⚠️  Season summaries of {', '.join(map(str, stale))} are stale (they failed verification after "
+              f"an ingest); the overrated/collapse exports do not reflect their latest rankings")
+    frame = None
+    if engine == "numpy":
+        from analytics import RankingFrame  # numpy is only needed for this engine
+        frame = RankingFrame.from_db(conn)
+
+    if combined:
+        for view, fname in EXPORTS:
+            export_view(conn, view, fname, frame)
+
+    manifest_path = OUT_DIR / MANIFEST
+    previous = json.loads(manifest_path.read_text())["shards"] if manifest_path.exists() else {}
+    poll_pks = {name: pk for pk, name in conn.execute("SELECT poll_pk, poll_name FROM poll")}
+
+    shards = {}
+    for view, shard_name, split_on in SHARDS:
+        shards.update(export_shards(conn, view, shard_name, split_on, poll_pks, previous, frame))
+
+    # drop shards that are no longer produced (e.g. a poll or season removed from the db)
+    for rel in set(previous) - set(shards):
+        for suffix in ("", ".gz", ".br"):
+            (OUT_DIR / (rel + suffix)).unlink(missing_ok=True)
+
+    polls = []
+    for name, pk in sorted(poll_pks.items(), key=lambda item: item[1]):
+        prefix = f"{SHARD_DIR}/rankings/{pk}/"
+        seasons = sorted(int(rel[len(prefix):-len(".json")]) for rel in shards if rel.startswith(prefix))
+        if seasons:
+            polls.append({"poll_pk": pk, "poll_name": name, "seasons": seasons})
+    manifest = {"version": 1, "polls": polls, "shards": dict(sorted(shards.items()))}
+    manifest_path.write_text(json.dumps(manifest, indent=1) + "\n", encoding="utf-8")
+
+    if snapshot:
+        from snapshot import SNAPSHOT_PATH, write_snapshot  # numpy is only needed for the snapshot
+        header = write_snapshot(conn, SNAPSHOT_PATH)
+        print(f"Snapshot of {header['tables']['ranking']['rows']} rankings → {SNAPSHOT_PATH}")
+
     conn.close()
     print("✅ All exports complete.")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export analytics views as JSON for the frontend")
+    parser.add_argument("--engine", choices=["sql", "numpy"], default="sql",
+                        help="compute the views in SQLite (default) or with the NumPy engine in analytics.py")
+    parser.add_argument("--combined", action="store_true",
+                        help="also write one combined file per view (rankings.json, overrated.json, …)")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="also write the binary columnar snapshot of the rankings (database/snapshot.py)")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="export even if the rankings fail the integrity checks (database/verify.py)")
+    args = parser.parse_args()
+    main(engine=args.engine, combined=args.combined, snapshot=args.snapshot, check=not args.no_verify)
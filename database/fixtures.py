@@ -0,0 +1,240 @@
+"""
+Record ESPN responses into a fixture archive and replay them from a local stub server.
+
+An archive is gzipped JSON lines: a header with the origin the responses came from, then one
+{"path", "body"} line per URL (path includes the query string), sorted by path.
+
+    python database/fixtures.py record --years 2004-2024 --polls 1,2       # uses the live API (and http cache)
+    python database/fixtures.py serve --latency 0.05 --error-rate 0.02     # replay on http://127.0.0.1:8765
+
+The replay server rewrites the recorded origin in every body ($refs) to its own address, so a
+backfill pointed at it (backfill.main(base_url=server.api_url(ESPNClient.BASE_URL))) never leaves the machine. Latency,
+jitter, 429s and 5xx errors can be injected to exercise the client's limits and retries.
+"""
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+FIXTURE_PATH = BASE_DIR / "data" / "fixtures" / "espn.jsonl.gz"
+ARCHIVE_VERSION = 1
+TEAM_PATH = re.compile(r"/seasons/\d+/teams/(\d+)(?:\?|$)")
+
+
+def url_key(url: str) -> str:
+    """Archive key for a URL: path plus query, without scheme and host."""
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class FixtureRecorder:
+    """Collects response bodies by URL (see ESPNClient(recorder=...)) and writes the archive on close."""
+    def __init__(self, path: Path = FIXTURE_PATH):
+        self.path = Path(path)
+        self.origin = None
+        self.bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def record(self, url: str, body: bytes):
+        parts = urlsplit(url)
+        with self._lock:
+            if self.origin is None:
+                self.origin = f"{parts.scheme}://{parts.netloc}"
+            self.bodies[url_key(url)] = body
+
+    def close(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        # mtime=0 and sorted paths: the same responses give the same archive bytes
+        with open(tmp, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as out:
+            header = {"version": ARCHIVE_VERSION, "origin": self.origin, "responses": len(self.bodies)}
+            out.write((json.dumps(header) + "\n").encode("utf-8"))
+            for key in sorted(self.bodies):
+                line = {"path": key, "body": self.bodies[key].decode("utf-8")}
+                out.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+        tmp.replace(self.path)
+        print(f"Recorded {len(self.bodies)} responses → {self.path}")
+
+
+def load_archive(path: Path = FIXTURE_PATH):
+    """(origin, {path: body}) from an archive written by FixtureRecorder."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported fixture archive version {header.get('version')} in {path}")
+        bodies = {}
+        for line in f:
+            entry = json.loads(line)
+            bodies[entry["path"]] = entry["body"]
+    return header["origin"], bodies
+
+
+class ReplayServer:
+    """
+    Serves a fixture archive over HTTP on a background thread.
+
+    latency + uniform(0, jitter) seconds are added to every response; error_rate and throttle_rate
+    are the fractions of requests answered with a 503 or a 429 instead. Unknown paths get a 404,
+    like ESPN does for missing polls. Use as a context manager, or start()/stop().
+    """
+    def __init__(self, archive: Path = FIXTURE_PATH, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, seed: Optional[int] = 0):
+        origin, bodies = load_archive(archive)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "not_found": 0}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+
+        # point every recorded $ref at this server (ESPN refs are http://, the API base is https://)
+        recorded_host = re.escape(urlsplit(origin).netloc) if origin else None
+        self.bodies = {
+            path: (re.sub(rf"https?://{recorded_host}", self.base_url, body) if recorded_host else body).encode("utf-8")
+            for path, body in bodies.items()
+        }
+        # a backfill fetches each team once per run (TeamResolver), from the first season it is ranked
+        # in, but a sharded run asks for it once per season: serve any recorded season of that team
+        self.team_bodies = {}
+        for path in sorted(self.bodies):
+            m = TEAM_PATH.search(path)
+            if m:
+                self.team_bodies.setdefault(m.group(1), self.bodies[path])
+        self._thread = None
+
+    def lookup(self, path: str) -> Optional[bytes]:
+        body = self.bodies.get(path) or self.bodies.get(path.split("?", 1)[0])
+        if body is None and (m := TEAM_PATH.search(path)):
+            body = self.team_bodies.get(m.group(1))
+        return body
+
+    def api_url(self, api_base: str) -> str:
+        """Where a client base URL (e.g. ESPNClient.BASE_URL) lives on this server."""
+        return self.base_url + urlsplit(api_base).path
+
+    def _fault(self) -> Optional[int]:
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if delay:
+            time.sleep(delay)
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status = server._fault()
+                body = None
+                if status is None:
+                    body = server.lookup(self.path)
+                    status = 200 if body is not None else 404
+                if status == 429:
+                    server._count("throttled")
+                elif status == 503:
+                    server._count("errors")
+                elif status == 404:
+                    server._count("not_found")
+                if body is None:
+                    body = json.dumps({"error": {"message": "fixture replay", "code": status}}).encode("utf-8")
+
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    import argparse
+    import tempfile
+
+    from cli import parse_range
+
+    parser = argparse.ArgumentParser(description="Record or replay ESPN fixtures")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="backfill into a scratch database, saving every response")
+    record.add_argument("--years", type=parse_range, default=parse_range("2004-2024"))
+    record.add_argument("--polls", type=parse_range, default=[1, 2])
+    record.add_argument("--out", type=Path, default=FIXTURE_PATH)
+
+    serve = sub.add_parser("serve", help="replay an archive on a local port until interrupted")
+    serve.add_argument("--archive", type=Path, default=FIXTURE_PATH)
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, at random")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 503")
+    serve.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with a 429")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        import backfill
+        import init_db
+        from cli import configure_logging
+        configure_logging()
+        with tempfile.TemporaryDirectory() as scratch:
+            init_db.DB_PATH = backfill.DB_PATH = Path(scratch) / "college.db"
+            init_db.init_db()
+            backfill.main(years=args.years, poll_ids=args.polls, record=args.out)
+    else:
+        server = ReplayServer(args.archive, port=args.port, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+        from espn import ESPNClient
+        print(f"Replaying {len(server.bodies)} responses, API base {server.api_url(ESPNClient.BASE_URL)}")
+        with server:
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,72 @@
 import sqlite3
 from pathlib import Path
 
+from summaries import refresh_summaries
+
 BASE_DIR = Path(__file__).resolve().parent   # database/
 DB_PATH = BASE_DIR / "data" / "college.db"
 SQL_DIR = BASE_DIR / "sql"
 
 
+# scripts that existed before applied migrations were tracked
+LEGACY_SQL_FILES = [
+    "1_CREATE_DB.sql", "2_ADD_SUPPORT_DATA.sql", "3_ADD_V_TEAM_RANKINGS.sql", "4_ADD_V_TEAM_ALLTIME_SUMMARY.sql",
+    "5_ADD_V_COLLAPSE_INDEX.sql", "6_ADD_V_COLLAPSE_INDEX_STATS.sql", "7_ADD_V_OVERRATED_INDEX.sql",
+    "8_ADD_V_OVERRATED_INDEX_STATS.sql",
+]
+
+
+def sql_files():
+    """.sql files in numeric order (1_, 2_, … 10_, …)"""
+    return sorted(SQL_DIR.glob("*.sql"), key=lambda p: int(p.name.split("_", 1)[0]))
+
+
+def applied_migrations(conn) -> set:
+    cursor = conn.cursor()
+    has_ranking = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ranking'"
+    ).fetchone()
+    has_log = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migration'"
+    ).fetchone()
+    if not has_log:
+        cursor.execute("""
+            CREATE TABLE schema_migration (
+                schema_migration_name TEXT PRIMARY KEY,
+                schema_migration_applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        if has_ranking:
+            # database built before migrations were tracked
+            cursor.executemany("INSERT INTO schema_migration (schema_migration_name) VALUES (?)",
+                               [(name,) for name in LEGACY_SQL_FILES])
+        conn.commit()
+    return {row[0] for row in cursor.execute("SELECT schema_migration_name FROM schema_migration")}
+
+
+def seed_team_identities(conn):
+    """Load mappings.ESPN_TEAM_IDS into team_identity; a seed whose names changed drops its stale team_fk."""
+    from mappings import ESPN_TEAM_IDS   # only needed here, so importing backfill does not load the mappings
+
+    conn.executemany("""
+        INSERT INTO team_identity (
+            team_identity_espn_id, team_identity_school_name, team_identity_team_name,
+            team_identity_abbreviation, team_identity_source
+        ) VALUES (?, ?, ?, ?, 'seed')
+        ON CONFLICT (team_identity_espn_id) DO UPDATE SET
+            team_identity_school_name = excluded.team_identity_school_name,
+            team_identity_team_name = excluded.team_identity_team_name,
+            team_identity_abbreviation = excluded.team_identity_abbreviation,
+            team_identity_team_fk = NULL,
+            team_identity_source = 'seed',
+            team_identity_updated_at = CURRENT_TIMESTAMP
+        WHERE (team_identity_school_name, team_identity_team_name, team_identity_abbreviation, team_identity_source)
+           IS NOT (excluded.team_identity_school_name, excluded.team_identity_team_name,
+                   excluded.team_identity_abbreviation, 'seed')
+    """, [(espn_id, *identity) for espn_id, identity in sorted(ESPN_TEAM_IDS.items())])
+    conn.commit()
+
+
 def init_db(drop=True):
     # Ensure data dir exists
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -19,40 +80,34 @@ def init_db(drop=True):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
-    # Run .sql files in numeric order (1_, 2_, 3_, …)
-    for sql_file in sorted(SQL_DIR.glob("*.sql")):
+    # Run .sql files not applied yet, in numeric order
+    applied = applied_migrations(conn)
+    ran = []
+    for sql_file in sql_files():
+        if sql_file.name in applied:
+            continue
         print(f"Running {sql_file.name}...")
         with open(sql_file, "r") as f:
             cursor.executescript(f.read())
+        cursor.execute("INSERT INTO schema_migration (schema_migration_name) VALUES (?)", (sql_file.name,))
+        conn.commit()
+        ran.append(sql_file.name)
+
+    seed_team_identities(conn)
+
+    # a schema change may add or redefine derived tables, so rebuild them from the rankings
+    if ran and cursor.execute("SELECT 1 FROM ranking LIMIT 1").fetchone():
+        print("Rebuilding season summaries...")
+        refresh_summaries(conn)
 
-    conn.commit()
     conn.close()
     print(f"✅ Database initialized at {DB_PATH}")
 
 
 if __name__ == "__main__":
+    # kept for existing scripts: the same as `python database/cli.py init ...`
+    import sys
 
-    ######
-    YEAR_START = 2004  # ESPN data is only valid 2004 onward
-    YEAR_END = 2024
-    POLL_IDS = [1, 2]
-    ######
-
-    YEARS = list(range(YEAR_START, YEAR_END + 1))
-
-    import backfill
-    import time
-
-    start_time = time.perf_counter()
-
-    print("Initiating Database:")
-    init_db()
-    print("DONE.")
-
-    print("\nBackfilling DB from ESPN")
-    backfill.main(years=YEARS, poll_ids=POLL_IDS)
-    print("DONE.")
+    from cli import main
 
-    end_time = time.perf_counter()
-    elapsed = end_time - start_time
-    print(f"\nTotal execution time: {elapsed:.2f} seconds")
+    sys.exit(main(["init", *sys.argv[1:]]))
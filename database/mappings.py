@@ -126,3 +126,14 @@ TEAM_ABBREVIATION_MAP = {
     "WSU":  {"abbrev": "WSU",  "name": "Washington St"},
     "WVU":  {"abbrev": "WVU",  "name": "West Virginia"},
 }
+
+# Canonical (school_name, team_name, team_abbreviation) by ESPN team id, for teams that string
+# normalization cannot tell apart or gets wrong. Seeded into team_identity by init_db.py; these ids
+# resolve without fetching their team document. Only add ids you have checked against ESPN.
+ESPN_TEAM_IDS = {
+    23:   ("San Jose State Spartans", "San Jose State", "SJSU"),  # no é
+    2572: ("Southern Mississippi Golden Eagles", "Southern Mississippi", "USM"),
+    2390: ("Miami Hurricanes", "Miami (FL)", "MIA"),
+    193:  ("Miami (OH) RedHawks", "Miami (OH)", "MIAOH"),
+    30:   ("USC Trojans", "USC", "USC"),
+}
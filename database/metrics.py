@@ -0,0 +1,223 @@
+"""
+In-process counters, gauges and latency histograms for the ingest pipeline.
+
+Everything records into the module-level METRICS registry, labelled like Prometheus series:
+
+    METRICS.inc("http_requests_total", endpoint="week", status=200)
+    with METRICS.timer("db_statement_seconds", statement="replace_week"):
+        ...
+
+At the end of a run the registry is written as a JSON report (write_report) and optionally in the
+Prometheus text exposition format (write_prometheus), e.g. for a node_exporter textfile collector.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+REPORT_PATH = BASE_DIR / "data" / "run_report.json"
+
+# seconds; covers cache hits (sub-ms) to slow ESPN responses and big transactions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# queue depths and batch sizes
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = None
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max for the +Inf bucket)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+    def merge(self, other: Dict[str, Any]):
+        for i, n in enumerate(other["buckets"].values()):
+            self.counts[i] += n
+        self.count += other["count"]
+        self.sum += other["sum"]
+        if other["max"] is not None:
+            self.max = other["max"] if self.max is None else max(self.max, other["max"])
+
+
+class Metrics:
+    """Thread-safe registry; the writer thread, fetch threads and event loop all record into it."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+            self.counters: Dict[str, Dict[Labels, float]] = {}
+            self.gauges: Dict[str, Dict[Labels, float]] = {}
+            self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def max_gauge(self, name: str, value: float, **labels):
+        """Keep the highest value seen, e.g. a queue's high-water mark."""
+        key = _labels(labels)
+        with self._lock:
+            series = self.gauges.setdefault(name, {})
+            series[key] = max(series.get(key, value), value)
+
+    def observe(self, name: str, value: float, buckets=DEFAULT_BUCKETS, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_total(self, name: str, **labels) -> float:
+        """Sum of a counter over all series matching labels."""
+        want = set(_labels(labels))
+        with self._lock:
+            return sum(v for key, v in self.counters.get(name, {}).items() if want <= set(key))
+
+    # ---------------- export ----------------
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._start
+
+        def series(metrics, value):
+            return {name: [{"labels": dict(key), "value": value(v)} for key, v in sorted(s.items())]
+                    for name, s in sorted(metrics.items())}
+
+        with self._lock:
+            report = {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "elapsed_seconds": round(elapsed, 3),
+                "counters": series(self.counters, lambda v: v),
+                "gauges": series(self.gauges, lambda v: v),
+                "histograms": series(self.histograms, Histogram.to_dict),
+            }
+        requests = self.counter_total("http_requests_total")
+        rows = self.counter_total("db_rows_written_total")
+        report["rates"] = {
+            "http_requests_per_sec": round(requests / elapsed, 1) if elapsed else None,
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+        }
+        return report
+
+    def merge(self, report: Dict[str, Any], prefixes: Optional[Tuple[str, ...]] = None):
+        """Fold in the report of another process (e.g. a backfill worker), optionally only some metric names."""
+        if prefixes is not None:
+            report = {kind: {name: series for name, series in report[kind].items() if name.startswith(prefixes)}
+                      for kind in ("counters", "gauges", "histograms")}
+        with self._lock:
+            for name, series in report["counters"].items():
+                target = self.counters.setdefault(name, {})
+                for s in series:
+                    key = _labels(s["labels"])
+                    target[key] = target.get(key, 0) + s["value"]
+            for name, series in report["gauges"].items():
+                target = self.gauges.setdefault(name, {})
+                for s in series:
+                    key = _labels(s["labels"])
+                    target[key] = max(target.get(key, s["value"]), s["value"])
+            for name, series in report["histograms"].items():
+                target = self.histograms.setdefault(name, {})
+                for s in series:
+                    key = _labels(s["labels"])
+                    if key not in target:
+                        target[key] = Histogram(float(b) for b in list(s["value"]["buckets"])[:-1])
+                    target[key].merge(s["value"])
+
+    def to_prometheus(self, prefix: str = "rank_history_") -> str:
+        def fmt(labels: Labels, extra: Labels = ()) -> str:
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in sorted(metrics.items()):
+                    lines.append(f"# TYPE {prefix}{name} {kind}")
+                    lines += [f"{prefix}{name}{fmt(key)} {v}" for key, v in sorted(series.items())]
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip([*map(str, hist.buckets), "+Inf"], hist.counts):
+                        cumulative += n
+                        lines.append(f"{prefix}{name}_bucket{fmt(key, (('le', bound),))} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{fmt(key)} {hist.sum}")
+                    lines.append(f"{prefix}{name}_count{fmt(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: Path = REPORT_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=1) + "\n")
+        print(f"Run report written to {path}")
+
+    def write_prometheus(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")   # textfile collectors must never see a partial file
+        tmp.write_text(self.to_prometheus())
+        tmp.replace(path)
+
+
+METRICS = Metrics()
@@ -0,0 +1,263 @@
+"""
+Binary columnar snapshot of the ranking fact table and its dimension tables.
+
+Layout (little-endian):
+
+    b"RKSNAP\\0\\0"             magic
+    u32 version, u32 n         then n bytes of JSON header, padded to 8 bytes
+    column data                one fixed-width integer array per column, each 8-byte aligned
+    string dictionary          u32 offsets (count + 1) and the UTF-8 blob they index
+
+The header lists every table with its row count and, per column, dtype, byte offset and the
+value that stands for NULL (nullable columns only). Integer columns use the narrowest dtype that
+holds their values; text columns are int32 codes into the shared string dictionary.
+
+Readers mmap the file and get read-only NumPy views straight onto it, so opening the full history
+costs a header parse and no copies:
+
+    python database/snapshot.py write            # database/data/rankings.snap
+    python database/snapshot.py info
+
+    with Snapshot.open() as snap:
+        ranks = snap.column("ranking", "ranking_current_rank")
+"""
+import json
+import mmap
+import sqlite3
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+DB_PATH = BASE_DIR / "data" / "college.db"
+SNAPSHOT_PATH = BASE_DIR / "data" / "rankings.snap"
+
+MAGIC = b"RKSNAP\0\0"
+VERSION = 1
+ALIGN = 8
+
+# table -> (query, text columns, nullable columns); the pk is always the first column
+TABLES = {
+    "ranking": ("""
+        SELECT ranking_pk, ranking_poll_fk, ranking_week_fk, ranking_team_fk, ranking_current_rank,
+               ranking_points, ranking_first_place_votes, ranking_record_wins, ranking_record_losses, ranking_trend
+        FROM ranking ORDER BY ranking_pk
+    """, (), ("ranking_points", "ranking_first_place_votes", "ranking_record_wins", "ranking_record_losses",
+              "ranking_trend")),
+    "poll": ("SELECT poll_pk, poll_name FROM poll ORDER BY poll_pk", ("poll_name",), ()),
+    "season_type": ("SELECT season_type_pk, season_type_name FROM season_type ORDER BY season_type_pk",
+                    ("season_type_name",), ()),
+    "week": ("""
+        SELECT w.week_pk, s.season_year, w.week_season_type_fk, w.week_number
+        FROM week w JOIN season s ON w.week_season_fk = s.season_pk
+        ORDER BY w.week_pk
+    """, (), ()),
+    "team": ("SELECT team_pk, team_school_fk, team_name, team_abbreviation FROM team ORDER BY team_pk",
+             ("team_name", "team_abbreviation"), ()),
+    "school": ("SELECT school_pk, school_name FROM school ORDER BY school_pk", ("school_name",), ()),
+}
+
+
+def _pad(n: int) -> int:
+    return -n % ALIGN
+
+
+def narrowest_dtype(values: np.ndarray, reserve_null: bool) -> np.dtype:
+    """Smallest signed little-endian integer dtype for values (keeping its minimum free for NULL)."""
+    low = int(values.min()) if len(values) else 0
+    high = int(values.max()) if len(values) else 0
+    for dtype in ("<i1", "<i2", "<i4", "<i8"):
+        info = np.iinfo(dtype)
+        if info.min + reserve_null <= low and high <= info.max:
+            return np.dtype(dtype)
+    raise ValueError(f"Values {low}..{high} do not fit in 64 bits")
+
+
+class _Strings:
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def encode(self):
+        blobs = [s.encode("utf-8") for s in self.codes]
+        offsets = np.zeros(len(blobs) + 1, dtype="<u4")
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+        return offsets, b"".join(blobs)
+
+
+def write_snapshot(conn: sqlite3.Connection, path: Path = SNAPSHOT_PATH) -> Dict[str, Any]:
+    """Write the snapshot atomically; returns its header."""
+    strings = _Strings()
+    arrays: List[Tuple[str, str, np.ndarray]] = []
+    tables: Dict[str, Any] = {}
+    for table, (query, text_columns, nullable_columns) in TABLES.items():
+        cursor = conn.execute(query)
+        names = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        tables[table] = {"rows": len(rows), "columns": {}}
+        for name, values in zip(names, columns):
+            entry: Dict[str, Any] = {}
+            if name in text_columns:
+                data = np.array([strings.code(v) for v in values], dtype="<i4")
+                entry["text"] = True
+            elif name in nullable_columns:
+                present = np.array([v for v in values if v is not None], dtype=np.int64)
+                dtype = narrowest_dtype(present, reserve_null=True)
+                null = int(np.iinfo(dtype).min)
+                data = np.array([null if v is None else v for v in values], dtype=dtype)
+                entry["null"] = null
+            else:
+                data = np.array(values, dtype=np.int64)
+                data = data.astype(narrowest_dtype(data, reserve_null=False))
+            entry["dtype"] = data.dtype.str
+            tables[table]["columns"][name] = entry
+            arrays.append((table, name, data))
+
+    offsets, blob = strings.encode()
+    header = {"version": VERSION, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "tables": tables,
+              "strings": {"count": len(strings.codes)}}
+
+    # offsets depend on the header size and the header holds the offsets: lay out the data first,
+    # relative to the start of the data section, then shift by the final header size
+    position, layout = 0, []
+    for table, name, data in arrays:
+        layout.append((table, name, position))
+        position += data.nbytes + _pad(data.nbytes)
+    strings_offsets_at = position
+    position += offsets.nbytes + _pad(offsets.nbytes)
+    strings_blob_at = position
+
+    def encode_header(base: int) -> bytes:
+        for table, name, relative in layout:
+            header["tables"][table]["columns"][name]["offset"] = base + relative
+        header["strings"].update(offsets=base + strings_offsets_at, blob=base + strings_blob_at, bytes=len(blob))
+        return json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    base = 0
+    while True:   # converges in one or two passes: offsets only grow the header by a few digits
+        encoded = encode_header(base)
+        start = len(MAGIC) + 8 + len(encoded) + _pad(len(MAGIC) + 8 + len(encoded))
+        if start == base:
+            break
+        base = start
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<II", VERSION, len(encoded)) + encoded)
+        f.write(b"\0" * (base - f.tell()))
+        for _, _, data in arrays:
+            f.write(data.tobytes())
+            f.write(b"\0" * _pad(data.nbytes))
+        f.write(offsets.tobytes() + b"\0" * _pad(offsets.nbytes))
+        f.write(blob)
+    tmp.replace(path)
+    return header
+
+
+class Snapshot:
+    """A snapshot file mapped read-only; columns are NumPy views onto the mapping."""
+    def __init__(self, path: Path, mapping: mmap.mmap, header: Dict[str, Any]):
+        self.path = path
+        self._map = mapping
+        self.header = header
+        self.tables = header["tables"]
+        self._strings: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: Path = SNAPSHOT_PATH) -> "Snapshot":
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapping[:len(MAGIC)] != MAGIC:
+            mapping.close()
+            raise ValueError(f"{path} is not a rankings snapshot")
+        version, size = struct.unpack_from("<II", mapping, len(MAGIC))
+        if version != VERSION:
+            mapping.close()
+            raise ValueError(f"Unsupported snapshot version {version} in {path}, expected {VERSION}")
+        start = len(MAGIC) + 8
+        return cls(Path(path), mapping, json.loads(mapping[start:start + size]))
+
+    def rows(self, table: str) -> int:
+        return self.tables[table]["rows"]
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        """Zero-copy, read-only view of a column (text columns are string codes, NULLs the header's null value)."""
+        entry = self.tables[table]["columns"][name]
+        return np.frombuffer(self._map, dtype=np.dtype(entry["dtype"]), count=self.rows(table), offset=entry["offset"])
+
+    def null_mask(self, table: str, name: str) -> np.ndarray:
+        entry = self.tables[table]["columns"][name]
+        column = self.column(table, name)
+        return column == entry["null"] if "null" in entry else np.zeros(len(column), dtype=bool)
+
+    @property
+    def strings(self) -> List[str]:
+        """The string dictionary, decoded on first use."""
+        if self._strings is None:
+            info = self.header["strings"]
+            offsets = np.frombuffer(self._map, dtype="<u4", count=info["count"] + 1, offset=info["offsets"]).tolist()
+            blob = self._map[info["blob"]:info["blob"] + info["bytes"]]
+            self._strings = [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        return self._strings
+
+    def text(self, table: str, name: str) -> List[str]:
+        strings = self.strings
+        return [strings[code] for code in self.column(table, name).tolist()]
+
+    def lookup(self, table: str, name: str) -> Dict[int, Any]:
+        """{pk: value} for a dimension column, e.g. lookup("poll", "poll_name")."""
+        pk = next(iter(self.tables[table]["columns"]))
+        values = self.text(table, name) if self.tables[table]["columns"][name].get("text") \
+            else self.column(table, name).tolist()
+        return dict(zip(self.column(table, pk).tolist(), values))
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            pass   # views are still alive; the mapping is released when they are garbage collected
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(command: str = "write", db_path: Optional[Path] = None, path: Path = SNAPSHOT_PATH):
+    if command == "write":
+        conn = sqlite3.connect(db_path or DB_PATH)
+        start = time.perf_counter()
+        header = write_snapshot(conn, path)
+        conn.close()
+        print(f"Snapshot of {header['tables']['ranking']['rows']} rankings written to {path} "
+              f"({Path(path).stat().st_size / 1024:.0f} KiB, {time.perf_counter() - start:.2f}s)")
+    else:
+        start = time.perf_counter()
+        with Snapshot.open(path) as snap:
+            print(f"{path}: version {snap.header['version']}, created {snap.header['created_at']}, "
+                  f"opened in {(time.perf_counter() - start) * 1000:.1f} ms")
+            for table, info in snap.tables.items():
+                columns = ", ".join(f"{name} {c['dtype']}" for name, c in info["columns"].items())
+                print(f"  {table:12} {info['rows']:>7} rows: {columns}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write or inspect the binary columnar rankings snapshot")
+    parser.add_argument("command", choices=["write", "info"], nargs="?", default="write")
+    parser.add_argument("--path", type=Path, default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+    main(args.command, path=args.path)
@@ -0,0 +1,10 @@
+-- Natural keys for the lookup tables (get_or_create relies on these to detect existing rows)
+CREATE UNIQUE INDEX ux_season_year ON season (season_year);
+CREATE UNIQUE INDEX ux_week_natural_key ON week (week_season_fk, week_season_type_fk, week_number);
+CREATE UNIQUE INDEX ux_school_name ON school (school_name);
+CREATE UNIQUE INDEX ux_team_natural_key ON team (team_school_fk, team_name, team_abbreviation);
+
+-- Rankings are read by (poll, week, team); including the rank makes the index covering for the analytics views
+CREATE INDEX ix_ranking_poll_week_team ON ranking (ranking_poll_fk, ranking_week_fk, ranking_team_fk, ranking_current_rank);
+CREATE INDEX ix_ranking_team_poll ON ranking (ranking_team_fk, ranking_poll_fk, ranking_week_fk, ranking_current_rank);
+CREATE INDEX ix_week_season ON week (week_season_fk, week_pk);
@@ -0,0 +1,69 @@
+-- Materialized per-season summaries behind the overrated / collapse views.
+-- Filled by summaries.refresh_summaries() for the seasons touched by each ingest.
+
+-- First and last ranked week of each poll season
+CREATE TABLE poll_season (
+    poll_season_poll_fk INTEGER NOT NULL,
+    poll_season_season_year INTEGER NOT NULL,
+    poll_season_first_week_fk INTEGER NOT NULL,
+    poll_season_last_week_fk INTEGER NOT NULL,
+    PRIMARY KEY (poll_season_poll_fk, poll_season_season_year),
+    FOREIGN KEY (poll_season_poll_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (poll_season_first_week_fk) REFERENCES week(week_pk),
+    FOREIGN KEY (poll_season_last_week_fk) REFERENCES week(week_pk)
+);
+
+-- Best / start / end rank of every team ranked in a poll season (26 = unranked)
+CREATE TABLE team_season (
+    team_season_poll_fk INTEGER NOT NULL,
+    team_season_season_year INTEGER NOT NULL,
+    team_season_team_fk INTEGER NOT NULL,
+    team_season_best_rank INTEGER NOT NULL,
+    team_season_start_rank INTEGER NOT NULL,
+    team_season_end_rank INTEGER NOT NULL,
+    PRIMARY KEY (team_season_poll_fk, team_season_season_year, team_season_team_fk),
+    FOREIGN KEY (team_season_poll_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (team_season_team_fk) REFERENCES team(team_pk)
+);
+
+
+DROP VIEW IF EXISTS v_team_collapse_index;
+
+CREATE VIEW v_team_collapse_index AS
+SELECT
+    ts.team_season_season_year AS season_year,
+    p.poll_name,
+    t.team_pk,
+    t.team_name,
+    t.team_abbreviation,
+    ts.team_season_best_rank AS best_rank,
+    ts.team_season_end_rank AS final_rank,
+    (ts.team_season_end_rank - ts.team_season_best_rank) AS collapse_index,
+    CASE
+        WHEN ts.team_season_end_rank = 26 THEN 'Unranked'
+        ELSE 'Ranked'
+    END AS final_status
+FROM team_season ts
+JOIN poll p ON ts.team_season_poll_fk = p.poll_pk
+JOIN team t ON ts.team_season_team_fk = t.team_pk
+ORDER BY p.poll_name DESC, season_year, collapse_index DESC;
+
+
+DROP VIEW IF EXISTS v_team_overrated_index;
+
+CREATE VIEW v_team_overrated_index AS
+SELECT
+    p.poll_name,
+    ts.team_season_season_year AS season_year,
+    t.team_pk,
+    t.team_name,
+    ts.team_season_start_rank AS start_rank,
+    CASE WHEN ts.team_season_start_rank = 26 THEN 'Unranked' ELSE 'Ranked' END AS starting_status,
+    ts.team_season_end_rank AS end_rank,
+    CASE WHEN ts.team_season_end_rank = 26 THEN 'Unranked' ELSE 'Ranked' END AS ending_status,
+    (ts.team_season_end_rank - ts.team_season_start_rank) AS overrated_index
+FROM team_season ts
+JOIN poll p ON ts.team_season_poll_fk = p.poll_pk
+JOIN team t ON ts.team_season_team_fk = t.team_pk
+WHERE NOT (ts.team_season_start_rank = 26 AND ts.team_season_end_rank = 26)  -- avoid teams that slip in the rankings then drop mid-season
+ORDER BY p.poll_name, season_year, start_rank;
@@ -0,0 +1,27 @@
+-- Canonical identity of every ESPN team id (stable across seasons, parsed from the team $ref).
+-- Seeded from mappings.ESPN_TEAM_IDS by init_db.py and learned during backfills, so a known id
+-- resolves without fetching or normalizing its team document again.
+CREATE TABLE team_identity (
+    team_identity_espn_id INTEGER PRIMARY KEY,
+    team_identity_school_name TEXT NOT NULL,
+    team_identity_team_name TEXT NOT NULL,
+    team_identity_abbreviation TEXT NOT NULL,
+    team_identity_team_fk INTEGER,          -- set once the team has been ranked
+    team_identity_source TEXT NOT NULL,     -- 'seed' (mappings.py) or 'espn' (normalized team document)
+    team_identity_updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (team_identity_team_fk) REFERENCES team(team_pk)
+);
+
+-- Team ids a backfill could not map (no entry in mappings.py). Their weeks are held back until a
+-- mapping is added and the backfill rerun; the row is removed once the id resolves.
+CREATE TABLE team_identity_review (
+    team_identity_review_espn_id INTEGER PRIMARY KEY,
+    team_identity_review_ref TEXT NOT NULL,
+    team_identity_review_display_name TEXT,
+    team_identity_review_nickname TEXT,
+    team_identity_review_abbreviation TEXT,
+    team_identity_review_error TEXT NOT NULL,
+    team_identity_review_seen_count INTEGER NOT NULL DEFAULT 1,
+    team_identity_review_first_seen_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    team_identity_review_last_seen_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,24 @@
+-- Poll catalog discovered from ESPN by discover.py (the poll table holds the poll names)
+
+-- Which seasons and season types each poll has rankings for
+CREATE TABLE poll_coverage (
+    poll_coverage_poll_fk INTEGER NOT NULL,
+    poll_coverage_season_year INTEGER NOT NULL,
+    poll_coverage_season_type_fk INTEGER NOT NULL,
+    poll_coverage_week_count INTEGER NOT NULL,
+    poll_coverage_first_week INTEGER NOT NULL,
+    poll_coverage_last_week INTEGER NOT NULL,
+    poll_coverage_discovered_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (poll_coverage_poll_fk, poll_coverage_season_year, poll_coverage_season_type_fk),
+    FOREIGN KEY (poll_coverage_poll_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (poll_coverage_season_type_fk) REFERENCES season_type(season_type_pk)
+);
+
+-- Every (poll id, season) probed, found or not, so a rescan only asks ESPN about what may have changed
+CREATE TABLE poll_probe (
+    poll_probe_poll_id INTEGER NOT NULL,
+    poll_probe_season_year INTEGER NOT NULL,
+    poll_probe_found INTEGER NOT NULL,
+    poll_probe_probed_at REAL NOT NULL,   -- unix time
+    PRIMARY KEY (poll_probe_poll_id, poll_probe_season_year)
+);
@@ -0,0 +1,54 @@
+-- Week-by-week rank paths, materialized by summaries.refresh_trajectories() for the seasons touched by each ingest.
+
+-- The weeks of each poll season in calendar order (season type, then week number)
+CREATE TABLE poll_season_week (
+    poll_season_week_poll_fk INTEGER NOT NULL,
+    poll_season_week_season_year INTEGER NOT NULL,
+    poll_season_week_index INTEGER NOT NULL,   -- position in the team_trajectory arrays
+    poll_season_week_week_fk INTEGER NOT NULL,
+    PRIMARY KEY (poll_season_week_poll_fk, poll_season_week_season_year, poll_season_week_index),
+    FOREIGN KEY (poll_season_week_poll_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (poll_season_week_week_fk) REFERENCES week(week_pk)
+);
+
+-- One row per team ranked at least once in a poll season
+CREATE TABLE team_trajectory (
+    team_trajectory_poll_fk INTEGER NOT NULL,
+    team_trajectory_season_year INTEGER NOT NULL,
+    team_trajectory_team_fk INTEGER NOT NULL,
+    team_trajectory_ranks TEXT NOT NULL,            -- JSON array, one rank per poll_season_week (26 = unranked)
+    team_trajectory_deltas TEXT NOT NULL,           -- JSON array, previous rank - rank (places moved up), null for the first week
+    team_trajectory_weeks_ranked INTEGER NOT NULL,
+    team_trajectory_peak_rank INTEGER NOT NULL,     -- best rank
+    team_trajectory_peak_week_index INTEGER NOT NULL,
+    team_trajectory_trough_rank INTEGER NOT NULL,   -- worst rank from the first ranked week on
+    team_trajectory_final_rank INTEGER NOT NULL,
+    team_trajectory_trend_checked INTEGER NOT NULL, -- weeks ranked in both this and the previous poll week
+    team_trajectory_trend_mismatches INTEGER NOT NULL, -- ... where ESPN's trend differs from the derived delta
+    PRIMARY KEY (team_trajectory_poll_fk, team_trajectory_season_year, team_trajectory_team_fk),
+    FOREIGN KEY (team_trajectory_poll_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (team_trajectory_team_fk) REFERENCES team(team_pk)
+);
+CREATE INDEX ix_team_trajectory_team ON team_trajectory (team_trajectory_team_fk, team_trajectory_poll_fk);
+
+DROP VIEW IF EXISTS v_team_trajectory;
+
+CREATE VIEW v_team_trajectory AS
+SELECT
+    p.poll_name,
+    tt.team_trajectory_season_year AS season_year,
+    t.team_pk,
+    t.team_name,
+    t.team_abbreviation,
+    tt.team_trajectory_ranks AS ranks,
+    tt.team_trajectory_deltas AS deltas,
+    tt.team_trajectory_weeks_ranked AS weeks_ranked,
+    tt.team_trajectory_peak_rank AS peak_rank,
+    tt.team_trajectory_peak_week_index AS peak_week_index,
+    tt.team_trajectory_trough_rank AS trough_rank,
+    tt.team_trajectory_final_rank AS final_rank,
+    tt.team_trajectory_trend_mismatches AS trend_mismatches
+FROM team_trajectory tt
+JOIN poll p ON tt.team_trajectory_poll_fk = p.poll_pk
+JOIN team t ON tt.team_trajectory_team_fk = t.team_pk
+ORDER BY p.poll_name DESC, season_year, final_rank;
@@ -0,0 +1,64 @@
+-- Cross-poll comparison, cached per season by compare.py and recomputed when the season's ingest_log changes.
+
+-- Which seasons are computed, for which set of polls, from which ingest_log state
+CREATE TABLE poll_comparison_season (
+    poll_comparison_season_year INTEGER NOT NULL,
+    poll_comparison_season_polls TEXT NOT NULL,         -- compared poll ids, e.g. '1,2,21'
+    poll_comparison_season_fingerprint TEXT NOT NULL,   -- sha256 of the season's ingest_log rows for those polls
+    poll_comparison_season_computed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (poll_comparison_season_year, poll_comparison_season_polls)
+);
+
+-- Agreement of two polls in one week, over the teams either of them ranks (26 = unranked)
+CREATE TABLE poll_agreement (
+    poll_agreement_poll_a_fk INTEGER NOT NULL,
+    poll_agreement_poll_b_fk INTEGER NOT NULL,
+    poll_agreement_week_fk INTEGER NOT NULL,
+    poll_agreement_season_year INTEGER NOT NULL,
+    poll_agreement_teams INTEGER NOT NULL,            -- teams ranked by a or b
+    poll_agreement_spearman REAL,                     -- rank correlation, ties averaged; NULL if undefined
+    poll_agreement_top10_overlap INTEGER NOT NULL,    -- teams in both top 10s
+    poll_agreement_top25_overlap INTEGER NOT NULL,    -- teams ranked by both
+    PRIMARY KEY (poll_agreement_poll_a_fk, poll_agreement_poll_b_fk, poll_agreement_week_fk),
+    FOREIGN KEY (poll_agreement_poll_a_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (poll_agreement_poll_b_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (poll_agreement_week_fk) REFERENCES week(week_pk)
+);
+CREATE INDEX ix_poll_agreement_season ON poll_agreement (poll_agreement_season_year);
+
+-- How differently two polls rank a team over a season
+CREATE TABLE poll_team_bias (
+    poll_team_bias_poll_a_fk INTEGER NOT NULL,
+    poll_team_bias_poll_b_fk INTEGER NOT NULL,
+    poll_team_bias_season_year INTEGER NOT NULL,
+    poll_team_bias_team_fk INTEGER NOT NULL,
+    poll_team_bias_weeks_both INTEGER NOT NULL,       -- weeks ranked by both polls
+    poll_team_bias_mean_rank_diff REAL,               -- mean of rank in a - rank in b over those weeks (> 0: b rates it higher)
+    poll_team_bias_weeks_only_a INTEGER NOT NULL,
+    poll_team_bias_weeks_only_b INTEGER NOT NULL,
+    PRIMARY KEY (poll_team_bias_poll_a_fk, poll_team_bias_poll_b_fk, poll_team_bias_season_year, poll_team_bias_team_fk),
+    FOREIGN KEY (poll_team_bias_poll_a_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (poll_team_bias_poll_b_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (poll_team_bias_team_fk) REFERENCES team(team_pk)
+);
+CREATE INDEX ix_poll_team_bias_season ON poll_team_bias (poll_team_bias_season_year);
+
+DROP VIEW IF EXISTS v_poll_agreement;
+
+CREATE VIEW v_poll_agreement AS
+SELECT
+    pa.poll_name AS poll_a_name,
+    pb.poll_name AS poll_b_name,
+    a.poll_agreement_season_year AS season_year,
+    st.season_type_name,
+    w.week_number,
+    a.poll_agreement_teams AS teams,
+    a.poll_agreement_spearman AS spearman,
+    a.poll_agreement_top10_overlap AS top10_overlap,
+    a.poll_agreement_top25_overlap AS top25_overlap
+FROM poll_agreement a
+JOIN poll pa        ON a.poll_agreement_poll_a_fk = pa.poll_pk
+JOIN poll pb        ON a.poll_agreement_poll_b_fk = pb.poll_pk
+JOIN week w         ON a.poll_agreement_week_fk = w.week_pk
+JOIN season_type st ON w.week_season_type_fk = st.season_type_pk
+ORDER BY poll_a_name, poll_b_name, season_year, w.week_season_type_fk, w.week_number;
@@ -0,0 +1,31 @@
+-- Break ties in the *_stats views explicitly (team name DESC), instead of relying on the order SQLite
+-- happens to emit them in, so analytics.index_stats sorts the same way
+
+DROP VIEW IF EXISTS v_team_collapse_index_stats;
+
+CREATE VIEW v_team_collapse_index_stats AS
+SELECT
+    poll_name,
+    team_name,
+    AVG(collapse_index) AS avg_collapse_index,
+    MIN(collapse_index) AS min_collapse_index,
+    MAX(collapse_index) AS max_collapse_index,
+    COUNT(*) AS seasons_counted
+FROM v_team_collapse_index
+GROUP BY poll_name, team_name
+ORDER BY poll_name DESC, avg_collapse_index DESC, team_name DESC;
+
+
+DROP VIEW IF EXISTS v_team_overrated_index_stats;
+
+CREATE VIEW v_team_overrated_index_stats AS
+SELECT
+    poll_name,
+    team_name,
+    AVG(overrated_index) AS avg_overrated_index,
+    MIN(overrated_index) AS min_overrated_index,
+    MAX(overrated_index) AS max_overrated_index,
+    COUNT(*) AS seasons_counted
+FROM v_team_overrated_index
+GROUP BY poll_name, team_name
+ORDER BY poll_name DESC, avg_overrated_index DESC, team_name DESC;
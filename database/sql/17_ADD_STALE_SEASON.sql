@@ -0,0 +1,7 @@
+-- Seasons whose materialized summaries (poll_season, team_season, team_trajectory) are out of date:
+-- an ingest changed their rankings but they failed verification, so the refresh was held back.
+-- summaries.refresh_summaries() clears a season's row once it has been refreshed.
+CREATE TABLE stale_season (
+    stale_season_year INTEGER PRIMARY KEY,
+    stale_season_marked_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,136 @@
+-- Give the remaining exported views an explicit final tie-break (ranking_pk, or team_pk), as
+-- 16_ADD_V_INDEX_STATS_TIE_BREAK.sql did for the *_stats views: rows that tie on the other keys no
+-- longer come out in whatever order SQLite picks, and analytics.py sorts on the same keys
+
+DROP VIEW IF EXISTS v_team_rankings;
+
+CREATE VIEW v_team_rankings AS
+SELECT
+    r.ranking_pk,
+    r.ranking_poll_fk,
+    r.ranking_week_fk,
+    r.ranking_team_fk,
+
+    s.season_year,
+    st.season_type_name,
+    w.week_pk,
+    w.week_number,
+
+    p.poll_pk,
+    p.poll_name,
+
+    sc.school_pk,
+    sc.school_name,
+
+    t.team_pk,
+    t.team_name,
+    t.team_abbreviation,
+
+    r.ranking_current_rank,
+    r.ranking_points,
+    r.ranking_first_place_votes,
+    r.ranking_record_wins,
+    r.ranking_record_losses,
+    r.ranking_trend
+FROM ranking r
+JOIN poll p        ON r.ranking_poll_fk = p.poll_pk
+JOIN week w        ON r.ranking_week_fk = w.week_pk
+JOIN season s      ON w.week_season_fk = s.season_pk
+JOIN season_type st ON w.week_season_type_fk = st.season_type_pk
+JOIN team t        ON r.ranking_team_fk = t.team_pk
+JOIN school sc     ON t.team_school_fk = sc.school_pk
+ORDER BY
+    p.poll_name DESC,
+    s.season_year,
+    st.season_type_name DESC,
+    w.week_number,
+    r.ranking_current_rank,
+    r.ranking_pk;
+
+
+DROP VIEW IF EXISTS v_team_alltime_summary;
+
+CREATE VIEW v_team_alltime_summary AS
+SELECT
+    p.poll_name,
+    t.team_pk,
+    t.team_name,
+    t.team_abbreviation,
+
+    -- Total weeks ranked
+    COUNT(DISTINCT s.season_year || '-' || st.season_type_name || '-' || w.week_number) AS total_weeks_ranked,
+
+    -- Weeks ranked #1
+    COUNT(DISTINCT CASE
+        WHEN r.ranking_current_rank = 1
+        THEN s.season_year || '-' || st.season_type_name || '-' || w.week_number
+    END) AS weeks_at_number_one,
+
+    -- Weeks ranked Top 3
+    COUNT(DISTINCT CASE
+        WHEN r.ranking_current_rank <= 3
+        THEN s.season_year || '-' || st.season_type_name || '-' || w.week_number
+    END) AS weeks_in_top_3,
+
+    -- Weeks ranked Top 10
+    COUNT(DISTINCT CASE
+        WHEN r.ranking_current_rank <= 10
+        THEN s.season_year || '-' || st.season_type_name || '-' || w.week_number
+    END) AS weeks_in_top_10
+
+FROM ranking r
+JOIN poll p
+  ON r.ranking_poll_fk = p.poll_pk
+JOIN team t
+  ON r.ranking_team_fk = t.team_pk
+JOIN week w
+  ON r.ranking_week_fk = w.week_pk
+JOIN season s
+  ON w.week_season_fk = s.season_pk
+JOIN season_type st
+  ON w.week_season_type_fk = st.season_type_pk
+WHERE r.ranking_current_rank IS NOT NULL
+GROUP BY p.poll_name, t.team_pk, t.team_name, t.team_abbreviation
+ORDER BY p.poll_name, total_weeks_ranked DESC, t.team_pk;
+
+
+DROP VIEW IF EXISTS v_team_collapse_index;
+
+CREATE VIEW v_team_collapse_index AS
+SELECT
+    ts.team_season_season_year AS season_year,
+    p.poll_name,
+    t.team_pk,
+    t.team_name,
+    t.team_abbreviation,
+    ts.team_season_best_rank AS best_rank,
+    ts.team_season_end_rank AS final_rank,
+    (ts.team_season_end_rank - ts.team_season_best_rank) AS collapse_index,
+    CASE
+        WHEN ts.team_season_end_rank = 26 THEN 'Unranked'
+        ELSE 'Ranked'
+    END AS final_status
+FROM team_season ts
+JOIN poll p ON ts.team_season_poll_fk = p.poll_pk
+JOIN team t ON ts.team_season_team_fk = t.team_pk
+ORDER BY p.poll_name DESC, season_year, collapse_index DESC, t.team_pk;
+
+
+DROP VIEW IF EXISTS v_team_overrated_index;
+
+CREATE VIEW v_team_overrated_index AS
+SELECT
+    p.poll_name,
+    ts.team_season_season_year AS season_year,
+    t.team_pk,
+    t.team_name,
+    ts.team_season_start_rank AS start_rank,
+    CASE WHEN ts.team_season_start_rank = 26 THEN 'Unranked' ELSE 'Ranked' END AS starting_status,
+    ts.team_season_end_rank AS end_rank,
+    CASE WHEN ts.team_season_end_rank = 26 THEN 'Unranked' ELSE 'Ranked' END AS ending_status,
+    (ts.team_season_end_rank - ts.team_season_start_rank) AS overrated_index
+FROM team_season ts
+JOIN poll p ON ts.team_season_poll_fk = p.poll_pk
+JOIN team t ON ts.team_season_team_fk = t.team_pk
+WHERE NOT (ts.team_season_start_rank = 26 AND ts.team_season_end_rank = 26)  -- avoid teams that slip in the rankings then drop mid-season
+ORDER BY p.poll_name, season_year, start_rank, t.team_pk;
@@ -0,0 +1,12 @@
+-- One row per ingested (poll, week), so backfills can skip weeks that are already loaded
+CREATE TABLE ingest_log (
+    ingest_log_pk INTEGER PRIMARY KEY AUTOINCREMENT,
+    ingest_log_poll_fk INTEGER NOT NULL,
+    ingest_log_week_fk INTEGER NOT NULL,
+    ingest_log_content_hash TEXT NOT NULL,  -- sha256 of the week's ESPN "ranks"
+    ingest_log_row_count INTEGER NOT NULL,
+    ingest_log_ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (ingest_log_poll_fk, ingest_log_week_fk),
+    FOREIGN KEY (ingest_log_poll_fk) REFERENCES poll(poll_pk),
+    FOREIGN KEY (ingest_log_week_fk) REFERENCES week(week_pk)
+);
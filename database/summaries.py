@@ -0,0 +1,171 @@
+"""
+Refresh the materialized season summary tables (see sql/11_ADD_SEASON_SUMMARY_TABLES.sql) and
+team trajectories (sql/14_ADD_TEAM_TRAJECTORY.sql).
+
+Only the seasons passed in are recomputed, so the cost of a refresh follows the size of the
+latest ingest rather than the whole history. Seasons that failed verification after an ingest are
+left in stale_season (sql/17_ADD_STALE_SEASON.sql) and refreshed by the next run that verifies them.
+"""
+import json
+import logging
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from metrics import METRICS
+from verify import VerificationReport, verify
+
+UNRANKED = 26   # the views' code for a team missing from a poll week
+
+
+def _season_filter(season_years: Optional[Iterable[int]], column: str):
+    if season_years is None:
+        return "1 = 1", []
+    season_years = sorted(set(season_years))
+    return f"{column} IN ({', '.join('?' * len(season_years))})", season_years
+
+
+def refresh_summaries(conn: sqlite3.Connection, season_years: Optional[Iterable[int]] = None):
+    """Recompute poll_season / team_season and the trajectories for the given seasons (all seasons if None)."""
+    if season_years is not None and not season_years:
+        return
+    cursor = conn.cursor()
+
+    where, params = _season_filter(season_years, "poll_season_season_year")
+    cursor.execute(f"DELETE FROM poll_season WHERE {where}", params)
+    where, params = _season_filter(season_years, "team_season_season_year")
+    cursor.execute(f"DELETE FROM team_season WHERE {where}", params)
+
+    # first/last week by week_pk, matching what the views have always used
+    where, params = _season_filter(season_years, "s.season_year")
+    cursor.execute(f"""
+        INSERT INTO poll_season (
+            poll_season_poll_fk, poll_season_season_year, poll_season_first_week_fk, poll_season_last_week_fk
+        )
+        SELECT r.ranking_poll_fk, s.season_year, MIN(r.ranking_week_fk), MAX(r.ranking_week_fk)
+        FROM ranking r
+        JOIN week w   ON r.ranking_week_fk = w.week_pk
+        JOIN season s ON w.week_season_fk = s.season_pk
+        WHERE {where}
+        GROUP BY r.ranking_poll_fk, s.season_year
+    """, params)
+
+    cursor.execute(f"""
+        INSERT INTO team_season (
+            team_season_poll_fk, team_season_season_year, team_season_team_fk,
+            team_season_best_rank, team_season_start_rank, team_season_end_rank
+        )
+        SELECT
+            r.ranking_poll_fk,
+            s.season_year,
+            r.ranking_team_fk,
+            MIN(r.ranking_current_rank),
+            COALESCE(MIN(CASE WHEN r.ranking_week_fk = ps.poll_season_first_week_fk THEN r.ranking_current_rank END), 26),
+            COALESCE(MIN(CASE WHEN r.ranking_week_fk = ps.poll_season_last_week_fk THEN r.ranking_current_rank END), 26)
+        FROM ranking r
+        JOIN week w   ON r.ranking_week_fk = w.week_pk
+        JOIN season s ON w.week_season_fk = s.season_pk
+        JOIN poll_season ps
+          ON ps.poll_season_poll_fk = r.ranking_poll_fk
+         AND ps.poll_season_season_year = s.season_year
+        WHERE {where}
+        GROUP BY r.ranking_poll_fk, s.season_year, r.ranking_team_fk
+    """, params)
+    refresh_trajectories(cursor, season_years)
+    where, params = _season_filter(season_years, "stale_season_year")
+    cursor.execute(f"DELETE FROM stale_season WHERE {where}", params)
+    conn.commit()
+
+
+def stale_seasons(conn: sqlite3.Connection) -> Set[int]:
+    """Seasons whose summaries were held back by a failed verification."""
+    return {year for (year,) in conn.execute("SELECT stale_season_year FROM stale_season")}
+
+
+def mark_stale(conn: sqlite3.Connection, season_years: Iterable[int]):
+    conn.executemany("INSERT OR IGNORE INTO stale_season (stale_season_year) VALUES (?)",
+                     [(year,) for year in sorted(set(season_years))])
+    conn.commit()
+
+
+def refresh_verified(conn: sqlite3.Connection, season_years: Iterable[int]) -> Optional[VerificationReport]:
+    """
+    Verify season_years plus the stale seasons, and refresh them all if they pass; otherwise mark them
+    stale so a later run refreshes them. None if there was nothing to refresh.
+    """
+    seasons = set(season_years) | stale_seasons(conn)
+    if not seasons:
+        return None
+    with METRICS.timer("verify_seconds"):
+        report = verify(conn, seasons)
+    report.print()
+    if report.ok:
+        refresh_summaries(conn, seasons)
+    else:
+        mark_stale(conn, seasons)
+        logging.error(f"Rankings failed verification, season summaries of {', '.join(map(str, sorted(seasons)))} "
+                      f"were not refreshed and are marked stale")
+    return report
+
+
+def trajectory(ranks: List[int], trends: List[Optional[int]]) -> Tuple:
+    """team_trajectory values (from ranks on) for one team's dense rank path and ESPN trends."""
+    deltas = [None] + [prev - rank for prev, rank in zip(ranks, ranks[1:])]
+    peak = min(ranks)
+    first_ranked = next(i for i, rank in enumerate(ranks) if rank < UNRANKED)
+    checked = mismatches = 0
+    for i in range(1, len(ranks)):
+        if ranks[i] < UNRANKED and ranks[i - 1] < UNRANKED and trends[i] is not None:
+            checked += 1
+            mismatches += trends[i] != deltas[i]
+    return (
+        json.dumps(ranks, separators=(",", ":")), json.dumps(deltas, separators=(",", ":")),
+        sum(rank < UNRANKED for rank in ranks), peak, ranks.index(peak), max(ranks[first_ranked:]), ranks[-1],
+        checked, mismatches,
+    )
+
+
+def refresh_trajectories(cursor: sqlite3.Cursor, season_years: Optional[Iterable[int]] = None):
+    """Rebuild poll_season_week / team_trajectory for the given seasons; the caller commits."""
+    where, params = _season_filter(season_years, "poll_season_week_season_year")
+    cursor.execute(f"DELETE FROM poll_season_week WHERE {where}", params)
+    where, params = _season_filter(season_years, "team_trajectory_season_year")
+    cursor.execute(f"DELETE FROM team_trajectory WHERE {where}", params)
+
+    # calendar order: preseason, regular season, postseason, then week number
+    where, params = _season_filter(season_years, "s.season_year")
+    rows = cursor.execute(f"""
+        SELECT r.ranking_poll_fk, s.season_year, w.week_pk, r.ranking_team_fk, r.ranking_current_rank, r.ranking_trend
+        FROM ranking r
+        JOIN week w   ON r.ranking_week_fk = w.week_pk
+        JOIN season s ON w.week_season_fk = s.season_pk
+        WHERE {where}
+        ORDER BY r.ranking_poll_fk, s.season_year, w.week_season_type_fk, w.week_number
+    """, params).fetchall()
+
+    weeks: Dict[Tuple[int, int], Dict[int, int]] = {}   # (poll, year) -> {week_pk: index}
+    for poll_fk, year, week_pk, _, _, _ in rows:
+        season_weeks = weeks.setdefault((poll_fk, year), {})
+        season_weeks.setdefault(week_pk, len(season_weeks))
+
+    paths: Dict[Tuple[int, int, int], Tuple[List[int], List[Optional[int]]]] = {}
+    for poll_fk, year, week_pk, team_fk, rank, trend in rows:
+        key = (poll_fk, year, team_fk)
+        if key not in paths:
+            n = len(weeks[(poll_fk, year)])
+            paths[key] = ([UNRANKED] * n, [None] * n)
+        i = weeks[(poll_fk, year)][week_pk]
+        paths[key][0][i] = rank
+        paths[key][1][i] = trend
+
+    cursor.executemany(
+        "INSERT INTO poll_season_week VALUES (?, ?, ?, ?)",
+        [(poll_fk, year, i, week_pk) for (poll_fk, year), season_weeks in weeks.items()
+         for week_pk, i in season_weeks.items()]
+    )
+    trajectories = [(*key, *trajectory(ranks, trends)) for key, (ranks, trends) in sorted(paths.items())]
+    cursor.executemany(f"INSERT INTO team_trajectory VALUES ({', '.join('?' * 12)})", trajectories)
+
+    checked = sum(t[10] for t in trajectories)
+    mismatches = sum(t[11] for t in trajectories)
+    if mismatches:
+        logging.info(f"ESPN trend disagrees with the derived rank delta in {mismatches} of {checked} team weeks")
@@ -0,0 +1,94 @@
+"""
+The columnar JSON table layout shared by export.py files and api.py responses.
+
+Column names once, one value array per column, and string columns dictionary-encoded (the column
+holds indexes into "dictionaries"):
+
+    {"columns": ["poll_name", "season_year", ...], "length": 2,
+     "values": [[0, 0], [2004, 2004], ...], "dictionaries": {"poll_name": ["AP Top 25"]}}
+
+No imports with side effects, so the API can encode responses without loading the exporter.
+"""
+import itertools
+import json
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, List, Tuple
+
+CHUNK_ROWS = 4096   # rows write_table encodes per column at a time
+# Per-column buffer of write_table before it spills to a temporary file
+COLUMN_SPOOL_BYTES = 256 * 1024
+
+
+class ColumnSpool:
+    """One column's encoded values: kept as text chunks up to COLUMN_SPOOL_BYTES, then in a temporary file."""
+    def __init__(self):
+        self.parts: List[str] = []
+        self.size = 0
+        self.file = None
+
+    def write(self, text: str):
+        if self.file is not None:
+            self.file.write("," + text)
+            return
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size > COLUMN_SPOOL_BYTES:
+            self.file = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+            self.file.write(",".join(self.parts))
+            self.parts = []
+
+    def copy_to(self, out):
+        if self.file is None:
+            out.write(",".join(self.parts))
+        else:
+            self.file.seek(0)
+            shutil.copyfileobj(self.file, out)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def write_table(out, cols: List[str], rows: Iterable[tuple]):
+    """
+    Stream rows into the columnar table layout. Rows are read CHUNK_ROWS at a time and each column
+    is spooled (in memory up to COLUMN_SPOOL_BYTES, then on disk), so only the string dictionaries
+    grow with the table.
+    """
+    dumps = json.JSONEncoder(ensure_ascii=True, separators=(",", ":")).encode
+    codes: List[Dict[str, int]] = [{} for _ in cols]
+    spools = [ColumnSpool() for _ in cols]
+    rows = iter(rows)
+    try:
+        length = 0
+        while True:
+            chunk = list(itertools.islice(rows, CHUNK_ROWS))
+            if not chunk:
+                break
+            length += len(chunk)
+            for column, code, spool in zip(zip(*chunk), codes, spools):
+                # strings become dictionary codes; the C encoder does the rest of the column at once
+                values = [code.setdefault(v, len(code)) if v.__class__ is str else v for v in column]
+                spool.write(dumps(values)[1:-1])
+
+        out.write(f'{{"columns":{dumps(cols)},"length":{length},"values":[')
+        for i, spool in enumerate(spools):
+            out.write(("," if i else "") + "\n[")
+            spool.copy_to(out)
+            out.write("]")
+        dictionaries = {col: list(codes[i]) for i, col in enumerate(cols) if codes[i]}
+        out.write(f'\n],"dictionaries":{dumps(dictionaries)}}}\n')
+    finally:
+        for spool in spools:
+            spool.close()
+
+
+def read_table(data: Dict[str, Any]) -> Tuple[List[str], List[tuple]]:
+    """Decode a table written by write_table back into (column names, rows)."""
+    cols = data["columns"]
+    values = []
+    for col, column in zip(cols, data["values"]):
+        dictionary = data["dictionaries"].get(col)
+        values.append(column if dictionary is None else [None if c is None else dictionary[c] for c in column])
+    return cols, list(zip(*values)) if values else []
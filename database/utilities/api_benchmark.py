@@ -0,0 +1,170 @@
+"""
+Query API throughput for the common per-team and per-week queries (see api.py).
+
+Runs against a full-size synthetic database (21 seasons x 2 polls x 17 weeks x 25 teams, built in a
+scratch directory) or an existing one with --db. Each query kind is measured twice:
+
+- respond: QueryAPI.respond() in a loop, i.e. the server's own cost per request on one core;
+- http: keep-alive HTTP clients against a ThreadingHTTPServer in this process, so the clients share
+  the core with the server and the number is a lower bound.
+
+Both run cold (no response cache: every request runs its SQL) and warm (LRU hits).
+
+    python database/utilities/api_benchmark.py
+    python database/utilities/api_benchmark.py --db database/data/college.db --seconds 5
+"""
+import argparse
+import http.client
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+DATABASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(DATABASE_DIR))
+
+import backfill  # noqa: E402
+import init_db  # noqa: E402
+from api import QueryAPI  # noqa: E402
+from summaries import refresh_summaries  # noqa: E402
+
+YEARS = range(2004, 2025)
+POLLS = [1, 2]
+WEEKS = [(2, week) for week in range(1, 17)] + [(3, 1)]   # regular season, then the final poll
+TEAMS = 130
+RANKED = 25
+
+
+def build_database(path: Path, seed: int = 0):
+    """A database the size of a full backfill, with rankings shuffled week to week."""
+    init_db.DB_PATH = path
+    init_db.init_db()
+    rng = random.Random(seed)
+    db = backfill.Database(path)
+    try:
+        team_pks = []
+        for i in range(TEAMS):
+            school_pk = db.get_or_create("school", {"school_name": f"School {i}"})
+            team_pks.append(db.get_or_create(
+                "team", {"team_name": f"Team {i}", "team_school_fk": school_pk, "team_abbreviation": f"T{i}"}
+            ))
+        for year in YEARS:
+            season_pk = db.get_or_create("season", {"season_year": year, "season_description": str(year)})
+            for poll_pk in POLLS:
+                for season_type, number in WEEKS:
+                    week_pk = db.get_or_create(
+                        "week", {"week_number": number, "week_season_fk": season_pk, "week_season_type_fk": season_type}
+                    )
+                    ranked = rng.sample(team_pks, RANKED)
+                    rows = [(poll_pk, week_pk, team_pk, rank, 1500 - 50 * rank, max(0, 10 - rank), number, rank % 3,
+                             None) for rank, team_pk in enumerate(ranked, 1)]
+                    db.replace_week(poll_pk, week_pk, rows, f"{year}-{poll_pk}-{season_type}-{number}")
+        refresh_summaries(db.conn)
+    finally:
+        db.close()
+
+
+def targets(db_path: Path, kind: str, count: int, seed: int = 0):
+    conn = sqlite3.connect(db_path)
+    try:
+        if kind == "team":
+            teams = [pk for (pk,) in conn.execute("SELECT DISTINCT ranking_team_fk FROM ranking")]
+            return [f"/rankings?team={random.Random(seed + i).choice(teams)}&poll={POLLS[i % 2]}"
+                    for i in range(count)]
+        weeks = conn.execute("""
+            SELECT DISTINCT s.season_year, w.week_number
+            FROM ranking r
+            JOIN week w   ON r.ranking_week_fk = w.week_pk
+            JOIN season s ON w.week_season_fk = s.season_pk
+        """).fetchall()
+        return [f"/rankings?poll={POLLS[i % 2]}&season={year}&week={week}"
+                for i, (year, week) in enumerate(random.Random(seed).choices(weeks, k=count))]
+    finally:
+        conn.close()
+
+
+def bench_respond(api: QueryAPI, urls, seconds: float) -> float:
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        api.respond(urls[done % len(urls)])
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def bench_http(port: int, urls, seconds: float, clients: int) -> float:
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(n: int):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        i = n
+        while time.perf_counter() < deadline:
+            conn.request("GET", urls[i % len(urls)])
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                raise RuntimeError(f"{urls[i % len(urls)]} returned {resp.status}")
+            counts[n] += 1
+            i += clients
+        conn.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def run(db_path: Path, seconds: float, clients: int) -> dict:
+    results = {}
+    for cache, entries in (("cold", 0), ("warm", 1024)):
+        api = QueryAPI(db_path, cache_entries=entries)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), api.handler())
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            for kind in ("team", "week"):
+                # a warm cache holds every target; cold, each request runs its query
+                urls = targets(db_path, kind, 200 if cache == "warm" else 5000)
+                if cache == "warm":
+                    for url in urls:
+                        api.respond(url)
+                results[f"{kind}.{cache}"] = {
+                    "respond_per_sec": round(bench_respond(api, urls, seconds)),
+                    "http_per_sec": round(bench_http(httpd.server_address[1], urls, seconds, clients)),
+                }
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            api.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=None, help="benchmark this database instead of a synthetic one")
+    parser.add_argument("--seconds", type=float, default=2.0, help="per measurement (default: 2)")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent keep-alive HTTP clients (default: 4)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rank-history-api-bench-") as scratch:
+        db_path = args.db
+        if db_path is None:
+            db_path = Path(scratch) / "college.db"
+            build_database(db_path)
+        rows = sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM ranking").fetchone()[0]
+        print(f"{rows} rankings in {db_path}")
+        results = run(db_path, args.seconds, args.clients)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
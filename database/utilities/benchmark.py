@@ -0,0 +1,193 @@
+"""
+End-to-end ingest benchmark: init_db + backfill.main + export.main against a fixture replay server.
+
+Everything runs in a scratch directory (database, http cache, exports), so the real database and
+frontend/data are untouched, and the cache starts cold unless --cache-dir is given. Record the
+fixtures once with `python database/fixtures.py record`, then:
+
+    python database/utilities/benchmark.py --save-baseline                  # record the baseline
+    python database/utilities/benchmark.py --latency 0.02 --error-rate 0.01   # compare, exit 1 on regression
+
+Results are written as JSON (per stage: seconds, cpu seconds, peak RSS; plus requests/s, rows/s and
+export bytes). A metric regresses when it is worse than the baseline by more than --tolerance.
+"""
+import argparse
+import json
+import logging
+import platform
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DATABASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(DATABASE_DIR))
+
+import backfill  # noqa: E402
+import cache  # noqa: E402
+import espn  # noqa: E402
+import export  # noqa: E402
+import init_db  # noqa: E402
+from cli import configure_logging, parse_range  # noqa: E402
+from fixtures import FIXTURE_PATH, ReplayServer  # noqa: E402
+from metrics import METRICS  # noqa: E402
+
+BENCH_DIR = DATABASE_DIR / "data" / "benchmark"
+
+# metric -> which direction is better
+REGRESSION_METRICS = {
+    "init_db.seconds": "lower",
+    "backfill.seconds": "lower",
+    "export.seconds": "lower",
+    "total.seconds": "lower",
+    "backfill.requests_per_sec": "higher",
+    "backfill.rows_per_sec": "higher",
+    "peak_rss_mb": "lower",
+    "export.bytes": "lower",
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process and of finished worker processes (sharded backfill), in MB."""
+    scale = 1 if platform.system() == "Darwin" else 1024   # ru_maxrss is bytes on macOS, KiB on Linux
+    peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    return round(peak * scale / 2 ** 20, 1)
+
+
+def timed(stage: str, results: dict, fn, *args, **kwargs):
+    wall, cpu = time.perf_counter(), time.process_time()
+    fn(*args, **kwargs)
+    results[stage] = {
+        "seconds": round(time.perf_counter() - wall, 3),
+        "cpu_seconds": round(time.process_time() - cpu, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return results[stage]
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="rank-history-bench-") as scratch:
+        scratch = Path(scratch)
+        # point every stage at the scratch directory
+        init_db.DB_PATH = backfill.DB_PATH = export.DB_PATH = scratch / "college.db"
+        cache.CACHE_DIR = args.cache_dir or scratch / "http_cache"
+        export.OUT_DIR = scratch / "export"
+        export.OUT_DIR.mkdir()
+
+        server = ReplayServer(args.archive, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed)
+        stages = {}
+        METRICS.reset()
+        with server:
+            timed("init_db", stages, init_db.init_db, drop=True)
+            backfill_stage = timed(
+                "backfill", stages, backfill.main, years=args.years, poll_ids=args.polls,
+                max_in_flight=args.max_in_flight, rate_limit=args.rate_limit, processes=args.processes,
+                base_url=server.api_url(espn.ESPNClient.BASE_URL)
+            )
+        export_stage = timed("export", stages, export.main, engine=args.engine)
+
+        conn = sqlite3.connect(export.DB_PATH)
+        rows = conn.execute("SELECT COUNT(*) FROM ranking").fetchone()[0]
+        conn.close()
+        backfill_stage.update({
+            "requests": server.stats["requests"],
+            "injected_errors": server.stats["errors"] + server.stats["throttled"],
+            "rows": rows,
+            "requests_per_sec": round(server.stats["requests"] / backfill_stage["seconds"], 1),
+            "rows_per_sec": round(rows / backfill_stage["seconds"], 1),
+        })
+        files = [p for p in export.OUT_DIR.rglob("*") if p.is_file()]
+        export_stage.update({
+            "bytes": sum(p.stat().st_size for p in files if p.suffix == ".json"),
+            "bytes_gz": sum(p.stat().st_size for p in files if p.suffix == ".gz"),
+            "files": len(files),
+        })
+
+    stages["total"] = {"seconds": round(sum(s["seconds"] for s in stages.values()), 3)}
+    return {
+        "config": {
+            "years": [args.years[0], args.years[-1]], "polls": args.polls, "processes": args.processes,
+            "max_in_flight": args.max_in_flight, "rate_limit": args.rate_limit, "engine": args.engine,
+            "latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+            "throttle_rate": args.throttle_rate, "cold_cache": args.cache_dir is None,
+        },
+        "environment": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                        "machine": platform.machine()},
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+        "metrics": METRICS.report(),   # http / db / queue breakdown of the run
+    }
+
+
+def metric(results: dict, name: str):
+    if name == "peak_rss_mb":
+        return results.get(name)
+    stage, key = name.split(".")
+    return results["stages"].get(stage, {}).get(key)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each metric against the baseline; returns the regressed metric names."""
+    if baseline["config"] != results["config"]:
+        print("⚠️  Baseline was recorded with a different config, comparison is only indicative")
+    regressions = []
+    for name, better in REGRESSION_METRICS.items():
+        new, old = metric(results, name), metric(baseline, name)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        worse = change > tolerance if better == "lower" else change < -tolerance
+        if worse:
+            regressions.append(name)
+        print(f"{'❌' if worse else '  '} {name:28} {old:>12} → {new:<12} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archive", type=Path, default=FIXTURE_PATH)
+    parser.add_argument("--years", type=parse_range, default=parse_range("2004-2024"))
+    parser.add_argument("--polls", type=parse_range, default=[1, 2])
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="requests/s for the client (default: unlimited, the replay server is local)")
+    parser.add_argument("--engine", choices=["sql", "numpy"], default="sql")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="reuse an http cache instead of starting cold")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=BENCH_DIR / "results.json")
+    parser.add_argument("--baseline", type=Path, default=BENCH_DIR / "baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative change (default: 0.2)")
+    args = parser.parse_args()
+
+    configure_logging(logging.WARNING)
+    results = run(args)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(results, indent=2) + "\n")
+    print(json.dumps(results["stages"], indent=2))
+    print(f"Results written to {args.out}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"✅ Baseline saved to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
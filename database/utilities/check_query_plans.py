@@ -0,0 +1,70 @@
+"""
+Record EXPLAIN QUERY PLAN output for every exported view, or check it against the recorded plans.
+
+Plans are built on an empty in-memory database created from sql/*.sql, so they only change when the
+schema, indexes or views change (or SQLite itself is upgraded). Re-record after an intended change and review the diff:
+
+    python database/utilities/check_query_plans.py            # record into database/sql/plans
+    python database/utilities/check_query_plans.py --check    # exit 1 if a plan changed
+"""
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+DATABASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(DATABASE_DIR))
+
+from export import EXPORTS  # noqa: E402
+from init_db import sql_files  # noqa: E402
+
+PLANS_DIR = DATABASE_DIR / "sql" / "plans"
+
+
+def build_schema() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    for sql_file in sql_files():
+        conn.executescript(sql_file.read_text())
+    return conn
+
+
+def query_plan(conn, view_name: str) -> str:
+    """EXPLAIN QUERY PLAN as an indented tree (row ids differ between versions, so drop them)."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM {view_name}").fetchall()
+    depth = {0: -1}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="compare against the recorded plans instead of writing")
+    args = parser.parse_args()
+
+    conn = build_schema()
+    PLANS_DIR.mkdir(exist_ok=True)
+    changed = []
+    for view, _ in EXPORTS:
+        plan = query_plan(conn, view)
+        path = PLANS_DIR / f"{view}.txt"
+        recorded = path.read_text() if path.exists() else None
+        if args.check:
+            if plan != recorded:
+                changed.append(view)
+                print(f"❌ Plan changed for {view}:\n{plan}")
+        elif plan != recorded:
+            path.write_text(plan)
+            print(f"Recorded plan for {view}")
+    conn.close()
+
+    if changed:
+        print(f"{len(changed)} query plan(s) differ from {PLANS_DIR}. Re-record if the change is intended.")
+        sys.exit(1)
+    print("✅ Query plans match." if args.check else "✅ Query plans recorded.")
+
+
+if __name__ == "__main__":
+    main()
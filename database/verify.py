@@ -0,0 +1,172 @@
+"""
+Data-integrity checks over the ranking table, run after every backfill and before every export.
+
+Each check is one set-based query (window functions over (poll, week)) that returns the offending
+(poll, season, season type, week, detail) rows, so the whole history verifies in milliseconds:
+
+    rank_sequence        ranks follow competition ranking: 1..N, ties share a rank and skip the next
+    duplicate_team       a team appears once per poll week
+    points_order         points never increase going down the ranking
+    first_place_votes    no team has more points than all voters' first places give (25 x sum of
+                         first-place votes), nor fewer than its own first-place votes give
+    short_week           (warning) a week ranks fewer teams than the poll usually does that season
+    abbreviation_collision (warning) different schools share an abbreviation, e.g. collapsed by
+                         TEAM_ABBREVIATION_MAP
+
+    python database/verify.py                    # all seasons, exits 1 on errors
+    python database/verify.py --years 2020-2024
+"""
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent   # database/
+DB_PATH = BASE_DIR / "data" / "college.db"
+
+POINTS_FOR_FIRST = 25   # a first-place vote is worth 25 points in the top 25 polls
+SHOWN = 10              # offending rows printed per check
+
+# rankings with their week's natural key; {where} limits the seasons
+RANKINGS = """
+    WITH r AS (
+        SELECT r.ranking_poll_fk AS poll, r.ranking_week_fk AS week_fk, s.season_year AS year,
+               w.week_season_type_fk AS season_type, w.week_number AS week, r.ranking_team_fk AS team,
+               r.ranking_current_rank AS rank, r.ranking_points AS points, r.ranking_first_place_votes AS fpv
+        FROM ranking r
+        JOIN week w   ON r.ranking_week_fk = w.week_pk
+        JOIN season s ON w.week_season_fk = s.season_pk
+        WHERE {where}
+    )
+"""
+
+# check -> (severity, query returning poll, season_year, season_type, week_number, detail)
+CHECKS: Dict[str, Tuple[str, str]] = {
+    "rank_sequence": ("error", RANKINGS + """
+        SELECT poll, year, season_type, week, 'team ' || team || ' is ranked ' || rank || ', expected ' || expected
+        FROM (SELECT *, RANK() OVER (PARTITION BY poll, week_fk ORDER BY rank) AS expected FROM r)
+        WHERE rank != expected
+    """),
+    "duplicate_team": ("error", RANKINGS + """
+        SELECT poll, year, season_type, week, 'team ' || team || ' ranked ' || COUNT(*) || ' times'
+        FROM r
+        GROUP BY poll, week_fk, team
+        HAVING COUNT(*) > 1
+    """),
+    "points_order": ("error", RANKINGS + """
+        SELECT poll, year, season_type, week,
+               'team ' || team || ' at rank ' || rank || ' has ' || points || ' points, more than ' || previous_points
+        FROM (SELECT *, LAG(points) OVER (PARTITION BY poll, week_fk ORDER BY rank, points DESC) AS previous_points
+              FROM r)
+        WHERE points > previous_points
+    """),
+    "first_place_votes": ("error", RANKINGS + f"""
+        , weeks AS (
+            SELECT poll, week_fk, SUM(fpv) AS voters FROM r GROUP BY poll, week_fk HAVING SUM(fpv) > 0
+        )
+        SELECT r.poll, r.year, r.season_type, r.week,
+               'team ' || r.team || ': ' || r.points || ' points, ' || r.fpv || ' first-place votes, '
+               || weeks.voters || ' voters'
+        FROM r
+        JOIN weeks ON weeks.poll = r.poll AND weeks.week_fk = r.week_fk
+        WHERE r.points > {POINTS_FOR_FIRST} * weeks.voters OR r.points < {POINTS_FOR_FIRST} * r.fpv
+    """),
+    "short_week": ("warning", RANKINGS + """
+        , sizes AS (
+            SELECT poll, year, season_type, week, COUNT(*) AS teams FROM r GROUP BY poll, week_fk
+        ), usual AS (
+            SELECT poll, year, teams,
+                   ROW_NUMBER() OVER (PARTITION BY poll, year ORDER BY COUNT(*) DESC, teams DESC) AS nth
+            FROM sizes
+            GROUP BY poll, year, teams
+        )
+        SELECT sizes.poll, sizes.year, sizes.season_type, sizes.week,
+               sizes.teams || ' teams ranked, usually ' || usual.teams
+        FROM sizes
+        JOIN usual ON usual.poll = sizes.poll AND usual.year = sizes.year AND usual.nth = 1
+        WHERE sizes.teams < usual.teams
+    """),
+    "abbreviation_collision": ("warning", """
+        SELECT NULL, NULL, NULL, NULL,
+               t.team_abbreviation || ' is used by ' || GROUP_CONCAT(DISTINCT sc.school_name)
+        FROM team t
+        JOIN school sc ON t.team_school_fk = sc.school_pk
+        GROUP BY t.team_abbreviation
+        HAVING COUNT(DISTINCT t.team_school_fk) > 1
+    """),
+}
+
+
+class VerificationError(ValueError):
+    pass
+
+
+class VerificationReport:
+    def __init__(self, problems: Dict[str, List[tuple]], seconds: float):
+        self.problems = problems
+        self.seconds = seconds
+
+    @property
+    def errors(self) -> Dict[str, List[tuple]]:
+        return {name: rows for name, rows in self.problems.items() if CHECKS[name][0] == "error" and rows}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def print(self):
+        for name, rows in self.problems.items():
+            if not rows:
+                continue
+            severity = CHECKS[name][0]
+            print(f"{'❌' if severity == 'error' else '⚠️ '} {name}: {len(rows)} {severity}(s)")
+            for poll, year, season_type, week, detail in rows[:SHOWN]:
+                where = f"poll {poll} {year} type {season_type} week {week}: " if poll is not None else ""
+                print(f"     {where}{detail}")
+            if len(rows) > SHOWN:
+                print(f"     ... and {len(rows) - SHOWN} more")
+        if self.ok:
+            print(f"✅ Rankings verified in {self.seconds * 1000:.0f} ms")
+
+    def raise_if_failed(self):
+        if not self.ok:
+            counts = ", ".join(f"{len(rows)} {name}" for name, rows in self.errors.items())
+            raise VerificationError(f"Rankings failed verification: {counts}")
+
+
+def verify(conn: sqlite3.Connection, season_years: Optional[Iterable[int]] = None) -> VerificationReport:
+    """Run every check over the given seasons (all seasons if None)."""
+    start = time.perf_counter()
+    where, params = "1 = 1", []
+    if season_years is not None:
+        params = sorted(set(season_years))
+        where = f"s.season_year IN ({', '.join('?' * len(params))})" if params else "0 = 1"
+    problems = {}
+    for name, (_, query) in CHECKS.items():
+        if "{where}" in query:
+            problems[name] = conn.execute(query.format(where=where), params).fetchall()
+        else:   # not tied to seasons
+            problems[name] = conn.execute(query).fetchall()
+    return VerificationReport(problems, time.perf_counter() - start)
+
+
+def main(season_years: Optional[List[int]] = None, db_path: Optional[Path] = None) -> bool:
+    conn = sqlite3.connect(db_path or DB_PATH)
+    try:
+        report = verify(conn, season_years)
+    finally:
+        conn.close()
+    report.print()
+    return report.ok
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from cli import parse_range
+
+    parser = argparse.ArgumentParser(description="Check the rankings for integrity problems")
+    parser.add_argument("--years", type=parse_range, default=None, help="seasons to check, e.g. 2020-2024 (default: all)")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.years) else 1)
@@ -16,6 +16,40 @@ async function fetchJSONSafe(url) {
   }
 }
 
+// Exports are columnar tables ({columns, length, values, dictionaries}); older exports hold
+// {columns, rows, dictionaries} or are arrays of objects.
+function decodeTable(data) {
+  if (Array.isArray(data)) return data;
+  const { columns, dictionaries = {} } = data;
+  const dicts = columns.map(c => dictionaries[c] || null);
+  const length = data.values ? data.length : data.rows.length;
+  const cell = data.values ? (i, r) => data.values[i][r] : (i, r) => data.rows[r][i];
+  const out = new Array(length);
+  for (let r = 0; r < length; r++) {
+    const obj = {};
+    for (let i = 0; i < columns.length; i++) {
+      const v = cell(i, r);
+      obj[columns[i]] = (dicts[i] && v !== null) ? dicts[i][v] : v;
+    }
+    out[r] = obj;
+  }
+  return out;
+}
+
+// Fetch the precompressed .gz sibling when the browser can inflate it, else the plain .json
+async function fetchTable(url, query = '') {
+  if ('DecompressionStream' in window) {
+    try {
+      const res = await fetch(`${url}.gz${query}`);
+      if (res.ok) {
+        const text = await new Response(res.body.pipeThrough(new DecompressionStream('gzip'))).text();
+        return decodeTable(JSON.parse(text));
+      }
+    } catch { /* fall back to the plain file */ }
+  }
+  return decodeTable(await fetchJSONSafe(`${url}${query}`));
+}
+
 function uniqueSorted(arr) {
   return [...new Set(arr)].sort((a, b) => (a > b ? 1 : -1));
 }
@@ -68,14 +102,25 @@ class DataStore {
     this.overrated = [];
     this.overratedStats = [];
     this.alltime = [];
+
+    this.manifest = null;       // data/manifest.json; null when only combined exports exist
+    this.shards = new Map();    // shard path -> load promise
   }
 
   async load() {
+    try {
+      const res = await fetch('data/manifest.json', { cache: 'no-cache' });
+      if (res.ok) {
+        this.manifest = await res.json();
+        return;  // shards are fetched on demand by ensurePoll / ensureSeason
+      }
+    } catch { /* fall back to the combined files */ }
+
     const [rankings, overrated, overratedStats, alltime] = await Promise.all([
-      fetchJSONSafe('data/rankings.json'),
-      fetchJSONSafe('data/overrated.json'),
-      fetchJSONSafe('data/overrated_stats.json'),
-      fetchJSONSafe('data/alltime_summary.json'),
+      fetchTable('data/rankings.json'),
+      fetchTable('data/overrated.json'),
+      fetchTable('data/overrated_stats.json'),
+      fetchTable('data/alltime_summary.json'),
     ]);
     this.rankings = rankings;
     this.overrated = overrated;
@@ -83,7 +128,42 @@ class DataStore {
     this.alltime = alltime;
   }
 
+  loadShard(path, target) {
+    const info = this.manifest && this.manifest.shards[path];
+    if (!info) return Promise.resolve();
+    if (!this.shards.has(path)) {
+      // content hash in the query string, so a redeploy never serves a stale cached shard
+      // a failed fetch is evicted so the next call retries instead of reusing the rejection
+      this.shards.set(path, fetchTable(`data/${path}`, `?v=${info.sha256.slice(0, 12)}`)
+        .then(rows => { this[target] = this[target].concat(rows); })
+        .catch(err => { this.shards.delete(path); throw err; }));
+    }
+    return this.shards.get(path);
+  }
+
+  pollPk(poll) {
+    const p = this.manifest.polls.find(x => x.poll_name === poll);
+    return p ? p.poll_pk : null;
+  }
+
+  // Everything the poll-wide widgets need: all-time table, overrated chart and top lists
+  async ensurePoll(poll) {
+    if (!this.manifest || !poll) return;
+    const pk = this.pollPk(poll);
+    await Promise.all([
+      this.loadShard(`shards/alltime_summary/${pk}.json`, 'alltime'),
+      this.loadShard(`shards/overrated/${pk}.json`, 'overrated'),
+      this.loadShard(`shards/overrated_stats/${pk}.json`, 'overratedStats'),
+    ]);
+  }
+
+  async ensureSeason(poll, year) {
+    if (!this.manifest || !poll || year == null) return;
+    await this.loadShard(`shards/rankings/${this.pollPk(poll)}/${year}.json`, 'rankings');
+  }
+
   getPolls() {
+    if (this.manifest) return uniqueSorted(this.manifest.polls.map(p => p.poll_name));
     const fromRankings = this.rankings.map(r => r.poll_name);
     const fromOver = this.overrated.map(r => r.poll_name);
     return uniqueSorted([...fromRankings, ...fromOver]);
@@ -96,6 +176,10 @@ class DataStore {
     }
 
   getYears(poll) {
+    if (this.manifest) {
+      const p = this.manifest.polls.find(x => x.poll_name === poll);
+      return p ? [...p.seasons] : [];
+    }
     return uniqueSorted(
       this.rankings.filter(r => r.poll_name === poll).map(r => r.season_year)
     );
@@ -219,16 +303,18 @@ class App {
 
 
     // Poll selector
-    this.pollFilter.addEventListener('change', () => {
+    this.pollFilter.addEventListener('change', async () => {
       this.state.poll = this.pollFilter.value;
-      this.populateYearWeekDefaults();
+      await this.store.ensurePoll(this.state.poll);
+      await this.populateYearWeekDefaults();
       this.populateTeamChoices();
       this.renderAll();
     });
 
     // Year selector
-    this.yearSelect.addEventListener('change', () => {
+    this.yearSelect.addEventListener('change', async () => {
       this.state.year = Number(this.yearSelect.value);
+      await this.store.ensureSeason(this.state.poll, this.state.year);
       this.populateWeeks();
       this.state.week = Number(this.weekSelect.value);
       this.renderRankings();
@@ -270,11 +356,12 @@ class App {
     this.pollInfo.textContent = polls.length ? `(${polls.length} polls available)` : '(no polls)';
   }
 
-  populateYearWeekDefaults() {
+  async populateYearWeekDefaults() {
     const years = this.store.getYears(this.state.poll);
     this.yearSelect.innerHTML = years.map(y => `<option value="${y}">${y}</option>`).join('');
     this.state.year = years.length ? Number(years[years.length - 1]) : null;
     if (this.state.year != null) this.yearSelect.value = String(this.state.year);
+    await this.store.ensureSeason(this.state.poll, this.state.year);
     this.populateWeeks();
     const weeks = this.store.getWeeks(this.state.poll, this.state.year);
     this.state.week = weeks.length ? weeks[weeks.length - 1].week_pk : null;
@@ -493,7 +580,8 @@ class App {
   async boot() {
       await this.store.load();
       this.populatePolls();
-      this.populateYearWeekDefaults();
+      await this.store.ensurePoll(this.state.poll);
+      await this.populateYearWeekDefaults();
 
       // ✅ Preselect overrated chart teams
       const defaultTeams = ["Alabama", "Ohio State", "Notre Dame"];//, "Texas", "LSU"];
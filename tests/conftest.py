@@ -0,0 +1,56 @@
+"""
+The database modules import each other by name (they run as scripts from database/), so put that
+directory on the path. Every test gets its own database and http cache under tmp_path.
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "database"))
+
+import backfill  # noqa: E402
+import cache  # noqa: E402
+import init_db  # noqa: E402
+from fixtures import ReplayServer  # noqa: E402
+from metrics import METRICS  # noqa: E402
+
+ARCHIVE = ROOT / "tests" / "fixtures" / "espn_small.jsonl.gz"   # see fixtures/make_espn_small.py
+YEARS = [2018, 2019]
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A freshly initialized database; backfill.main and the http cache write under tmp_path."""
+    path = tmp_path / "college.db"
+    monkeypatch.setattr(init_db, "DB_PATH", path)
+    monkeypatch.setattr(backfill, "DB_PATH", path)
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "http_cache")
+    METRICS.reset()
+    init_db.init_db()
+    return path
+
+
+@pytest.fixture
+def replay():
+    """Factory for replay servers of the test archive, stopped after the test."""
+    servers = []
+
+    def start(**faults) -> ReplayServer:
+        server = ReplayServer(ARCHIVE, **faults).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def table(path: Path, query: str) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
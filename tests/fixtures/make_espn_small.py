@@ -0,0 +1,82 @@
+"""
+Writes espn_small.jsonl.gz, the fixture archive the tests replay: polls 1 and 2 for 2018-2019,
+three weeks each (preseason, one regular season week, final), six teams per week. Poll 21 has no
+listings, so the replay server answers 404 for it like ESPN does.
+
+    python tests/fixtures/make_espn_small.py
+"""
+import json
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent.parent / "database"))
+
+from fixtures import FixtureRecorder  # noqa: E402
+
+ORIGIN = "http://sports.core.api.espn.com"
+API = ORIGIN + "/v2/sports/football/leagues/college-football"
+QUERY = "?lang=en&region=us"
+
+# ESPN team id -> team document; 30 (USC) is seeded in mappings.ESPN_TEAM_IDS and never fetched
+TEAMS = {
+    333: {"displayName": "Alabama Crimson Tide", "nickname": "Alabama", "abbreviation": "ALA"},
+    228: {"displayName": "Clemson Tigers", "nickname": "Clemson", "abbreviation": "CLEM"},
+    57: {"displayName": "Florida Gators", "nickname": "Florida", "abbreviation": "FLA"},
+    52: {"displayName": "Florida State Seminoles", "nickname": "Florida State", "abbreviation": "FSU"},
+    2: {"displayName": "Auburn Tigers", "nickname": "Auburn", "abbreviation": "AUB"},
+    30: {"displayName": "USC Trojans", "nickname": "USC", "abbreviation": "USC"},
+}
+WEEKS = [(1, 1), (2, 2), (3, 1)]   # (season type, week number)
+POLLS = {1: "AP Top 25", 2: "AFCA Coaches Poll"}
+YEARS = [2018, 2019]
+FIRST_PLACE_VOTES = [40, 15, 5, 0, 0, 0]
+POINTS = [1450, 1300, 1150, 900, 700, 500]
+
+
+def week_document(year: int, poll_id: int, season_type: int, week: int) -> dict:
+    team_ids = list(TEAMS)
+    shift = (year + poll_id + season_type + week) % len(team_ids)   # a different order every week
+    order = team_ids[shift:] + team_ids[:shift]
+    ranks = []
+    for i, team_id in enumerate(order):
+        ranks.append({
+            "current": i + 1,
+            "previous": 0,
+            "points": float(POINTS[i]),
+            "firstPlaceVotes": FIRST_PLACE_VOTES[i],
+            "trend": "-",
+            "record": {"stats": [{"name": "wins", "value": float(week + i % 3)},
+                                 {"name": "losses", "value": float(i % 2)}]},
+            "team": {"$ref": f"{API}/seasons/{year}/teams/{team_id}{QUERY}"},
+        })
+    return {
+        "id": str(poll_id),
+        "name": POLLS[poll_id],
+        "headline": f"{year} {POLLS[poll_id]}: type {season_type} week {week}",
+        "ranks": ranks,
+    }
+
+
+def main(out: Path = HERE / "espn_small.jsonl.gz"):
+    recorder = FixtureRecorder(out)
+
+    def record(url: str, doc: dict):
+        recorder.record(url, json.dumps(doc, separators=(",", ":")).encode("utf-8"))
+
+    for year in YEARS:
+        for poll_id in POLLS:
+            refs = []
+            for season_type, week in WEEKS:
+                url = f"{API}/seasons/{year}/types/{season_type}/weeks/{week}/rankings/{poll_id}{QUERY}"
+                record(url, week_document(year, poll_id, season_type, week))
+                refs.append({"$ref": url})
+            record(f"{API}/seasons/{year}/rankings/{poll_id}{QUERY}", {"count": len(refs), "rankings": refs})
+        for team_id, doc in TEAMS.items():
+            if team_id != 30:
+                record(f"{API}/seasons/{year}/teams/{team_id}{QUERY}", {"id": str(team_id), **doc})
+    recorder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+import backfill
+import cache
+import init_db
+from conftest import ARCHIVE, YEARS
+from espn import ESPNClient
+from fixtures import ReplayServer
+
+analytics = pytest.importorskip("analytics")   # needs numpy
+
+# each view's ORDER BY, ending on its tie-break: (column, descending)
+ORDER_BY = {
+    "v_team_rankings": [("poll_name", True), ("season_year", False), ("season_type_name", True),
+                        ("week_number", False), ("ranking_current_rank", False), ("ranking_pk", False)],
+    "v_team_alltime_summary": [("poll_name", False), ("total_weeks_ranked", True), ("team_pk", False)],
+    "v_team_collapse_index": [("poll_name", True), ("season_year", False), ("collapse_index", True),
+                              ("team_pk", False)],
+    "v_team_overrated_index": [("poll_name", False), ("season_year", False), ("start_rank", False),
+                               ("team_pk", False)],
+    "v_team_collapse_index_stats": [("poll_name", True), ("avg_collapse_index", True), ("team_name", True)],
+    "v_team_overrated_index_stats": [("poll_name", True), ("avg_overrated_index", True), ("team_name", True)],
+}
+
+
+def sort_key(columns, order_by):
+    """Python sort key for an ORDER BY list (strings compare like SQLite's BINARY collation here)."""
+    positions = [(columns.index(name), desc) for name, desc in order_by]
+
+    class Key:
+        def __init__(self, row):
+            self.values = [(row[i], desc) for i, desc in positions]
+
+        def __lt__(self, other):
+            for (a, desc), (b, _) in zip(self.values, other.values):
+                if a != b:
+                    return a > b if desc else a < b
+            return False
+
+    return Key
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    mp = pytest.MonkeyPatch()
+    path = tmp_path_factory.mktemp("analytics") / "college.db"
+    mp.setattr(init_db, "DB_PATH", path)
+    mp.setattr(backfill, "DB_PATH", path)
+    mp.setattr(cache, "CACHE_DIR", path.parent / "http_cache")
+    init_db.init_db()
+    with ReplayServer(ARCHIVE) as server:
+        backfill.main(YEARS, [1, 2], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL))
+    mp.undo()
+    return path
+
+
+def test_every_view_has_a_documented_order():
+    assert set(ORDER_BY) == set(analytics.VIEWS)
+
+
+@pytest.mark.parametrize("view", sorted(analytics.VIEWS))
+def test_numpy_engine_matches_the_views(database, view):
+    conn = sqlite3.connect(database)
+    cursor = conn.execute(f"SELECT * FROM {view}")
+    columns, rows = [d[0] for d in cursor.description], cursor.fetchall()
+    engine_columns, engine_rows = analytics.VIEWS[view](analytics.RankingFrame.from_db(conn))
+    conn.close()
+    assert engine_columns == columns
+
+    # the ORDER BY key is unique, so both engines have exactly one correct order
+    key = sort_key(columns, ORDER_BY[view])
+    tie_break = [columns.index(name) for name, _ in ORDER_BY[view]]
+    assert len({tuple(row[i] for i in tie_break) for row in rows}) == len(rows)
+    assert rows == sorted(rows, key=key)
+    assert engine_rows == sorted(engine_rows, key=key)
+    # same rows in the same order, averages up to float rounding
+    assert [tuple(pytest.approx(v) if isinstance(v, float) else v for v in row) for row in engine_rows] == rows
@@ -0,0 +1,67 @@
+import json
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import api
+import backfill
+from conftest import YEARS
+from espn import ESPNClient
+
+
+@pytest.fixture
+def query_api(db_path, replay):
+    backfill.main(YEARS, [1], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    query_api = api.QueryAPI(db_path, pool_size=2)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), query_api.handler())
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    query_api.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield query_api
+    httpd.shutdown()
+    httpd.server_close()
+    query_api.close()
+
+
+def get(query_api, target: str):
+    """(status, JSON body) of a GET."""
+    try:
+        with urllib.request.urlopen(query_api.url + target) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_rankings_filtered(query_api):
+    status, body = get(query_api, "/rankings?poll=1&season=2019&limit=5")
+    assert status == 200
+    assert body["length"] == 5
+    season = body["columns"].index("season_year")
+    assert set(body["values"][season]) == {2019}
+
+
+@pytest.mark.parametrize("target", [
+    "/rankings?season=99999999999999999999", "/rankings?limit=0", "/rankings?offset=-1", "/rankings?season=x",
+    "/rankings?conference=1",
+])
+def test_bad_parameters(query_api, target):
+    status, body = get(query_api, target)
+    assert status == 400
+    assert "error" in body
+
+
+def test_unknown_endpoint(query_api):
+    assert get(query_api, "/teams")[0] == 404
+
+
+def test_unexpected_error_is_a_json_500(query_api, monkeypatch):
+    def locked(target):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(query_api, "respond", locked)
+    status, body = get(query_api, "/rankings")
+    assert status == 500
+    assert body == {"error": "internal error: OperationalError"}
@@ -0,0 +1,172 @@
+import threading
+
+import pytest
+import requests
+
+import backfill
+from conftest import YEARS, table
+from espn import ESPNClient
+
+RANKINGS = """
+    SELECT p.poll_pk, s.season_year, w.week_season_type_fk, w.week_number, t.team_name, r.ranking_current_rank,
+           r.ranking_points, r.ranking_first_place_votes, r.ranking_record_wins, r.ranking_record_losses
+    FROM ranking r
+    JOIN poll p   ON r.ranking_poll_fk = p.poll_pk
+    JOIN week w   ON r.ranking_week_fk = w.week_pk
+    JOIN season s ON w.week_season_fk = s.season_pk
+    JOIN team t   ON r.ranking_team_fk = t.team_pk
+    ORDER BY r.ranking_pk
+"""
+
+
+def run(fn, *args, timeout: float = 60, **kwargs):
+    """Call fn on a thread so a hung backfill fails the test instead of hanging the run."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"{fn.__name__} did not finish in {timeout}s"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+def backfill_from(server, years, poll_ids, max_tries: int = 10):
+    """A serial backfill with a fast-retrying client, so injected faults do not slow the test."""
+    client = ESPNClient(base_url=server.api_url(ESPNClient.BASE_URL), rate_limit=None, max_tries=max_tries,
+                        backoff=0.01)
+    db = backfill.Database(backfill.DB_PATH, check_same_thread=False)
+    db.preload_lookups()
+    try:
+        backfill.Backfiller(db, client).backfill(years, poll_ids)
+    finally:
+        db.close()
+        client.close()
+
+
+def test_backfill_loads_every_week(db_path, replay):
+    server = replay()
+    run(backfill.main, YEARS, [1, 2], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL))
+
+    # 2 seasons x 2 polls x 3 weeks x 6 teams
+    assert len(table(db_path, RANKINGS)) == 72
+    assert table(db_path, "SELECT COUNT(*) FROM ingest_log") == [(12,)]
+    assert table(db_path, "SELECT COUNT(*) FROM team_season WHERE team_season_season_year = 2019") == [(12,)]
+    # USC is seeded in mappings.ESPN_TEAM_IDS, so its team document (not in the archive) is never needed
+    assert ("USC",) in table(db_path, "SELECT team_name FROM team")
+
+
+def test_serial_and_sharded_backfill_match(db_path, tmp_path, replay, monkeypatch):
+    run(backfill.main, YEARS, [1, 2], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    serial = {query: table(db_path, query) for query in (
+        RANKINGS, "SELECT * FROM ranking", "SELECT * FROM team",
+        "SELECT ingest_log_poll_fk, ingest_log_week_fk, ingest_log_content_hash FROM ingest_log",
+    )}
+
+    import cache
+    import init_db
+    sharded_path = tmp_path / "sharded" / "college.db"
+    monkeypatch.setattr(init_db, "DB_PATH", sharded_path)
+    monkeypatch.setattr(backfill, "DB_PATH", sharded_path)
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "sharded" / "http_cache")
+    init_db.init_db()
+    # another server, on another port: the content hashes must not depend on it
+    run(backfill.main, YEARS, [1, 2], rate_limit=None, processes=2, base_url=replay().api_url(ESPNClient.BASE_URL))
+
+    for query, rows in serial.items():
+        assert table(sharded_path, query) == rows, query
+
+
+def test_missing_poll_is_skipped(db_path, replay):
+    # the archive has no poll 21 listings: ESPN's 404 for a poll it does not have
+    server = replay()
+    run(backfill.main, YEARS, [1, 21], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL))
+
+    assert table(db_path, "SELECT DISTINCT ranking_poll_fk FROM ranking") == [(1,)]
+    assert server.stats["not_found"] == 2
+
+
+def test_missing_poll_is_skipped_sharded(db_path, replay):
+    server = replay()
+    run(backfill.main, YEARS, [1, 21], rate_limit=None, processes=2, base_url=server.api_url(ESPNClient.BASE_URL))
+
+    assert table(db_path, "SELECT DISTINCT ranking_poll_fk FROM ranking") == [(1,)]
+
+
+def test_server_errors_are_retried(db_path, replay):
+    server = replay(error_rate=0.2, throttle_rate=0.1, seed=1)
+    run(backfill_from, server, YEARS, [1, 2])
+
+    assert server.stats["errors"] + server.stats["throttled"] > 0
+    assert len(table(db_path, RANKINGS)) == 72
+
+
+def test_listing_server_error_fails_the_backfill(db_path, replay):
+    server = replay(error_rate=1.0)
+    with pytest.raises(requests.exceptions.HTTPError, match="503"):
+        run(backfill_from, server, YEARS, [1, 2], max_tries=2)
+    assert table(db_path, "SELECT COUNT(*) FROM ranking") == [(0,)]
+
+
+def test_rerun_of_closed_seasons_fetches_nothing(db_path, replay):
+    run(backfill.main, YEARS, [1, 2], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    hashes = table(db_path, "SELECT ingest_log_week_fk, ingest_log_content_hash FROM ingest_log")
+
+    server = replay()
+    run(backfill_from, server, YEARS, [1, 2])
+    # only the listings are asked for (from the http cache for closed seasons fetched after they closed)
+    assert server.stats["requests"] <= 4
+    assert table(db_path, "SELECT ingest_log_week_fk, ingest_log_content_hash FROM ingest_log") == hashes
+
+
+def test_backfiller_state_is_reset_per_run(db_path, replay):
+    server = replay()
+    client = ESPNClient(base_url=server.api_url(ESPNClient.BASE_URL), rate_limit=None)
+    db = backfill.Database(backfill.DB_PATH, check_same_thread=False)
+    db.preload_lookups()
+    try:
+        backfiller = backfill.Backfiller(db, client)
+        run(backfiller.backfill, YEARS, [1])
+        assert backfiller.touched_seasons == set(YEARS)
+        run(backfiller.backfill, YEARS, [1])   # everything already ingested
+        assert backfiller.touched_seasons == set()
+        assert backfiller.failed_weeks == backfiller.held_weeks == []
+    finally:
+        db.close()
+        client.close()
+
+
+def fail_refresh(conn, seasons):
+    raise RuntimeError("refresh failed")
+
+
+def fail_backfill(self, *args, **kwargs):
+    raise backfill.BackfillError("2 weeks not ingested")
+
+
+@pytest.mark.parametrize("failing_backfill, error, match", [
+    (True, backfill.BackfillError, "2 weeks"),    # the backfill error is kept, the refresh one logged
+    (False, RuntimeError, "refresh failed"),
+])
+def test_failed_refresh_still_closes(db_path, replay, monkeypatch, failing_backfill, error, match):
+    closed = []
+    for cls in (backfill.Database, ESPNClient):
+        def close(self, close=cls.close, name=cls.__name__):
+            closed.append(name)
+            close(self)
+        monkeypatch.setattr(cls, "close", close)
+    monkeypatch.setattr(backfill, "refresh_verified", fail_refresh)
+    if failing_backfill:
+        monkeypatch.setattr(backfill.Backfiller, "backfill", fail_backfill)
+
+    server = replay()
+    with pytest.raises(error, match=match):
+        run(backfill.main, YEARS, [1], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL))
+    assert closed == ["Database", "ESPNClient"]
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from cache import CURRENT_SEASON_TTL, CachedResponse, ResponseCache, season_closed, ttl_for_url
+
+LISTING = "https://sports.core.api.espn.com/v2/sports/football/leagues/college-football/seasons/2025/rankings/1"
+
+
+def fetched(url: str, when: datetime) -> CachedResponse:
+    fetched_at = when.timestamp()
+    return CachedResponse(b"{}", None, None, fetched_at, ttl_for_url(url, fetched_at))
+
+
+def test_response_fetched_while_the_season_ran_is_revalidated():
+    # the 2025 listing fetched in January 2026 may lack the final poll
+    response = fetched(LISTING, datetime(2026, 1, 10))
+    assert response.ttl == CURRENT_SEASON_TTL
+    assert not response.is_fresh()
+
+
+def test_response_fetched_after_the_season_closed_never_expires():
+    response = fetched(LISTING, datetime(2026, 2, 2))
+    assert response.ttl is None
+    assert response.is_fresh()
+
+
+def test_season_closes_on_february_first():
+    assert not season_closed(2025, datetime(2026, 1, 31, 23).timestamp())
+    assert season_closed(2025, datetime(2026, 2, 1, 1).timestamp())
+
+
+def test_revalidation_after_close_makes_the_entry_final(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put(LISTING, b"{}", etag='"v1"')
+    cache.conn.execute("UPDATE entry SET fetched_at = ?", (datetime(2026, 1, 10).timestamp(),))
+    assert cache.get(LISTING).ttl == CURRENT_SEASON_TTL
+    cache.revalidated(LISTING)   # a 304 now, after the season closed
+    assert cache.get(LISTING).ttl is None
+    cache.close()
+
+
+def test_size_bound_covers_every_process_sharing_the_cache(tmp_path):
+    # two handles on one directory, like sharded backfill workers
+    first, second = ResponseCache(tmp_path, max_bytes=1000), ResponseCache(tmp_path, max_bytes=1000)
+    for i in range(4):
+        first.put(f"{LISTING}?page={i}", bytes([i]) * 200)
+    second.put(f"{LISTING}?page=4", b"x" * 200)
+    second.put(f"{LISTING}?page=5", b"y" * 200)
+
+    assert second._stored_bytes() <= 1000
+    assert first.get(f"{LISTING}?page=0") is None   # least recently used, evicted by the other handle
+    assert second.get(f"{LISTING}?page=5") is not None
+    first.close()
+    second.close()
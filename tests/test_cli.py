@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+import backfill
+import cli
+from conftest import YEARS, table
+from espn import ESPNClient
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def test_complete_closed_seasons_are_not_pending(db_path, conn, replay):
+    assert cli.pending_backfill(conn, YEARS, [1, 21]) == [(2018, 1), (2018, 21), (2019, 1), (2019, 21)]
+    backfill.main(YEARS, [1, 21], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+
+    # poll 21 answered 404: recorded as a negative probe, so it is not asked for again
+    probes = "SELECT poll_probe_poll_id, poll_probe_found FROM poll_probe ORDER BY 1, poll_probe_season_year"
+    assert table(db_path, probes) == [(1, 1), (1, 1), (21, 0), (21, 0)]
+    assert cli.pending_backfill(conn, YEARS, [1, 21]) == []
+
+
+def test_short_season_is_pending(db_path, conn, replay):
+    backfill.main(YEARS, [1], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    conn.execute("DELETE FROM ingest_log WHERE ingest_log_pk = (SELECT MAX(ingest_log_pk) FROM ingest_log)")
+    conn.commit()
+    assert cli.pending_backfill(conn, YEARS, [1]) == [(2019, 1)]
+
+
+def test_coverage_saved_before_the_season_closed_is_pending(db_path, conn, replay):
+    backfill.main(YEARS, [1], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    # the 2019 listing was saved in January 2020, before the final poll could be in it
+    conn.execute("UPDATE poll_coverage SET poll_coverage_discovered_at = '2020-01-10 12:00:00' "
+                 "WHERE poll_coverage_season_year = 2019")
+    conn.commit()
+    assert cli.pending_backfill(conn, YEARS, [1]) == [(2019, 1)]
+
+
+def test_catalog_polls_only_cover_their_seasons(db_path, conn, replay):
+    backfill.main([2019], [2], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    conn.execute("DELETE FROM poll_probe")   # e.g. discovered by an older discover.py
+    conn.commit()
+    assert cli.pending_backfill(conn, YEARS, [2]) == [(2018, 2)]
+    assert cli.pending_backfill(conn, YEARS, [2], catalog_only=True) == []
+    current = cli.current_season_year()
+    assert cli.pending_backfill(conn, [2019, current], [2], catalog_only=True) == [(current, 2)]
+
+
+def test_backfill_only_fetches_the_given_pairs(db_path, replay):
+    server = replay()
+    backfill.main(YEARS, [1, 2], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL),
+                  pairs=[(2018, 1), (2019, 2)])
+    assert table(db_path, """
+        SELECT DISTINCT s.season_year, r.ranking_poll_fk FROM ranking r
+        JOIN week w ON r.ranking_week_fk = w.week_pk JOIN season s ON w.week_season_fk = s.season_pk
+        ORDER BY 1
+    """) == [(2018, 1), (2019, 2)]
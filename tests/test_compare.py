@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+import backfill
+import cli
+from conftest import YEARS, table
+from espn import ESPNClient
+
+compare = pytest.importorskip("compare")   # needs numpy
+
+AGREEMENT = """
+    SELECT a.poll_agreement_week_fk, a.poll_agreement_teams, a.poll_agreement_spearman,
+           a.poll_agreement_top10_overlap, a.poll_agreement_top25_overlap
+    FROM poll_agreement a
+    WHERE a.poll_agreement_poll_a_fk = 1 AND a.poll_agreement_poll_b_fk = 2
+    ORDER BY 1
+"""
+
+
+def spearman(a: dict, b: dict) -> float:
+    """Spearman's rho of two complete rankings without ties (team -> rank)."""
+    n = len(a)
+    return 1 - 6 * sum((a[team] - b[team]) ** 2 for team in a) / (n * (n * n - 1))
+
+
+@pytest.fixture
+def ingested(db_path, replay):
+    backfill.main(YEARS, [1, 2], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    return db_path
+
+
+def test_cli_compare_spearman(ingested):
+    assert cli.main(["compare", "--polls", "1,2", "--db", str(ingested)]) == 0
+
+    ranks = {}
+    for poll, week, team, rank in table(ingested, "SELECT ranking_poll_fk, ranking_week_fk, ranking_team_fk, "
+                                                  "ranking_current_rank FROM ranking"):
+        ranks.setdefault((poll, week), {})[team] = rank
+    rows = table(ingested, AGREEMENT)
+    assert len(rows) == 6   # 2 seasons x 3 weeks both polls released
+    for week, teams, rho, top10, top25 in rows:
+        assert (teams, top10, top25) == (6, 6, 6)
+        assert rho == pytest.approx(spearman(ranks[(1, week)], ranks[(2, week)]))
+    # the archive ranks the same six teams in both polls, rotated by one place: d = 1, 1, 1, 1, 1, 5
+    assert rows[0][2] == pytest.approx(1 - 6 * 30 / (6 * 35))
+
+
+def test_unchanged_seasons_come_from_the_cache(ingested, monkeypatch):
+    conn = sqlite3.connect(ingested)
+    try:
+        comparison = compare.PollComparison(conn, [1, 2])
+        assert comparison.refresh() == YEARS
+        before = table(ingested, AGREEMENT)
+
+        computed = []
+        compute = compare.PollComparison.compute
+        monkeypatch.setattr(compare.PollComparison, "compute",
+                            lambda self, years: computed.append(years) or compute(self, years))
+        assert comparison.refresh() == []
+        assert computed == []
+
+        # a re-ingested week (new content hash) makes only its season stale
+        conn.execute("""
+            UPDATE ingest_log SET ingest_log_content_hash = 'changed'
+            WHERE ingest_log_pk = (
+                SELECT il.ingest_log_pk FROM ingest_log il
+                JOIN week w   ON il.ingest_log_week_fk = w.week_pk
+                JOIN season s ON w.week_season_fk = s.season_pk
+                WHERE s.season_year = ? LIMIT 1
+            )
+        """, (YEARS[1],))
+        conn.commit()
+        assert comparison.refresh() == [YEARS[1]]
+        assert computed == [[YEARS[1]]]
+        assert table(ingested, AGREEMENT) == before
+
+        assert comparison.refresh(force=True) == YEARS
+    finally:
+        conn.close()
@@ -0,0 +1,22 @@
+import pytest
+
+from backfill import Database
+
+
+def test_pragmas(tmp_path):
+    db = Database(tmp_path / "college.db", synchronous="full", cache_size="-2000")
+    assert db.conn.execute("PRAGMA synchronous").fetchone() == (2,)   # FULL
+    assert db.conn.execute("PRAGMA cache_size").fetchone() == (-2000,)
+    db.close()
+
+
+@pytest.mark.parametrize("synchronous", ["NORMAL; DROP TABLE ranking", "SOMETIMES"])
+def test_unknown_synchronous_mode_is_rejected(tmp_path, synchronous):
+    with pytest.raises(ValueError, match="synchronous"):
+        Database(tmp_path / "college.db", synchronous=synchronous)
+    assert not (tmp_path / "college.db").exists()
+
+
+def test_cache_size_must_be_an_integer(tmp_path):
+    with pytest.raises(ValueError):
+        Database(tmp_path / "college.db", cache_size="64000; PRAGMA foo")
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+import requests
+
+import backfill
+from conftest import YEARS, table
+from discover import Discovery
+from espn import ESPNClient
+
+COVERAGE = """
+    SELECT poll_coverage_poll_fk, poll_coverage_season_year, poll_coverage_season_type_fk,
+           poll_coverage_week_count, poll_coverage_first_week, poll_coverage_last_week
+    FROM poll_coverage
+    ORDER BY 1, 2, 3
+"""
+PROBES = "SELECT poll_probe_poll_id, poll_probe_season_year, poll_probe_found FROM poll_probe ORDER BY 1, 2"
+
+
+@pytest.fixture
+def discovery(db_path, replay):
+    """Discovery against a replay of the test archive; call with fault options for a faulty server."""
+    handles = []
+
+    def start(**faults) -> Discovery:
+        client = ESPNClient(base_url=replay(**faults).api_url(ESPNClient.BASE_URL), rate_limit=None, max_tries=2,
+                            backoff=0.01)
+        db = backfill.Database(db_path)
+        handles.extend([client, db])
+        return Discovery(db, client)
+
+    yield start
+    for handle in handles:
+        handle.close()
+
+
+def test_scan_records_coverage_and_probes(db_path, discovery):
+    # the archive has polls 1 and 2; ESPN answers 404 for poll 21
+    summary = discovery().scan([1, 2, 21], YEARS)
+    assert summary == {"probed": 6, "found": 4, "errors": 0, "new_polls": 0}
+    assert table(db_path, PROBES) == [(poll_id, year, int(poll_id != 21)) for poll_id in (1, 2, 21) for year in YEARS]
+    # one week per season type: preseason week 1, regular season week 2, final poll week 1
+    assert table(db_path, COVERAGE) == [(poll_id, year, season_type, 1, week, week)
+                                        for poll_id in (1, 2) for year in YEARS
+                                        for season_type, week in ((1, 1), (2, 2), (3, 1))]
+
+    # closed seasons are never probed again, found or not
+    assert discovery().scan([1, 2, 21], YEARS) == {"probed": 0, "found": 0, "errors": 0, "new_polls": 0}
+    assert len(table(db_path, PROBES)) == 6
+
+
+def test_new_poll_is_named_from_its_week_document(db_path, discovery):
+    scanner = discovery()
+    scanner.db.conn.execute("DELETE FROM poll WHERE poll_pk = 2")
+    scanner.db.conn.commit()
+    assert scanner.scan([2], YEARS)["new_polls"] == 1
+    assert table(db_path, "SELECT poll_name FROM poll WHERE poll_pk = 2") == [("AFCA Coaches Poll",)]
+
+
+def test_probe(discovery):
+    scanner = discovery()
+    weeks = asyncio.run(scanner._probe(1, YEARS[0]))
+    assert [(w["seasonType"], w["week"]) for w in weeks] == [(1, 1), (2, 2), (3, 1)]
+    assert asyncio.run(scanner._probe(21, YEARS[0])) is None
+
+
+def test_failed_probe_is_retried_next_scan(db_path, discovery):
+    scanner = discovery(error_rate=1.0)
+    assert isinstance(asyncio.run(scanner._probe(1, YEARS[0])), requests.exceptions.HTTPError)
+    assert scanner.scan([1], YEARS[:1]) == {"probed": 1, "found": 0, "errors": 1, "new_polls": 0}
+    # neither a probe nor coverage is saved, so the next scan asks again
+    assert table(db_path, PROBES) == []
+    assert table(db_path, COVERAGE) == []
+    assert scanner.pending([1], YEARS[:1]) == [(1, YEARS[0])]
@@ -0,0 +1,18 @@
+import pytest
+
+from espn import ESPNClient, endpoint_type
+
+
+def test_max_tries_must_allow_a_request():
+    with pytest.raises(ValueError, match="max_tries"):
+        ESPNClient(max_tries=0)
+
+
+@pytest.mark.parametrize("url, endpoint", [
+    (ESPNClient.BASE_URL + "/seasons/2019/rankings/1?lang=en", "listing"),
+    (ESPNClient.BASE_URL + "/seasons/2019/types/2/weeks/3/rankings/1", "week"),
+    (ESPNClient.BASE_URL + "/seasons/2019/teams/333", "team"),
+    (ESPNClient.BASE_URL + "/seasons/2019", "other"),
+])
+def test_endpoint_type(url, endpoint):
+    assert endpoint_type(url) == endpoint
@@ -0,0 +1,126 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import sqlite3
+
+import pytest
+
+import backfill
+import cache
+import export
+import init_db
+import tables
+from conftest import YEARS
+from espn import ESPNClient
+
+
+def write(text):
+    return lambda out: out.write(text)
+
+
+def test_missing_sibling_is_regenerated(tmp_path):
+    path = tmp_path / "shard.json"
+    entry, written = export.write_if_changed(path, write('{"values":[]}\n'), None)
+    assert written
+    assert export.write_if_changed(path, write('{"values":[]}\n'), entry) == (entry, False)
+
+    path.with_name("shard.json.gz").unlink()
+    assert export.write_if_changed(path, write('{"values":[]}\n'), entry) == (entry, True)
+    assert all(p.exists() for p in export.sibling_paths(path))
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+@pytest.mark.parametrize("view", [view for view, _ in export.EXPORTS])
+def test_write_table_round_trip(db_path, replay, view):
+    with replay() as server:
+        backfill.main(YEARS, [1, 2], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL))
+    conn = sqlite3.connect(db_path)
+    try:
+        out = io.StringIO()
+        tables.write_table(out, *export.query_view(conn, view))
+        cols, rows = tables.read_table(json.loads(out.getvalue()))
+        expected_cols, expected = export.query_view(conn, view)
+        assert cols == expected_cols
+        assert rows == list(expected)
+        assert rows
+    finally:
+        conn.close()
+
+
+def test_write_table_spills_columns(monkeypatch):
+    monkeypatch.setattr(tables, "COLUMN_SPOOL_BYTES", 16)
+    monkeypatch.setattr(tables, "CHUNK_ROWS", 7)
+    rows = [(f"team {i % 3}", i, i / 4, None) for i in range(100)]
+    out = io.StringIO()
+    tables.write_table(out, ["team", "n", "x", "none"], rows)
+    assert tables.read_table(json.loads(out.getvalue())) == (["team", "n", "x", "none"], rows)
+
+
+def export_from(monkeypatch, server, db_path, out_dir, years):
+    """Backfill years from the replay server into db_path, then run export.main into out_dir."""
+    monkeypatch.setattr(backfill, "DB_PATH", db_path)
+    monkeypatch.setattr(export, "DB_PATH", db_path)
+    monkeypatch.setattr(export, "OUT_DIR", out_dir)
+    backfill.main(years, [1, 2], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL))
+    export.main()
+    return json.loads((out_dir / export.MANIFEST).read_text())
+
+
+def shard_files(out_dir):
+    return {p.relative_to(out_dir).as_posix(): p for p in (out_dir / export.SHARD_DIR).rglob("*")
+            if p.is_file()}
+
+
+def manifest_files(out_dir, manifest):
+    """Every file the manifest accounts for: each shard plus its compressed siblings."""
+    return {p.relative_to(out_dir).as_posix() for rel in manifest["shards"]
+            for p in [out_dir / rel, *export.sibling_paths(out_dir / rel)]}
+
+
+def test_manifest_sizes_and_hashes(db_path, replay, tmp_path, monkeypatch):
+    out_dir = tmp_path / "data"
+    manifest = export_from(monkeypatch, replay(), db_path, out_dir, YEARS)
+
+    assert {p["poll_pk"]: p["seasons"] for p in manifest["polls"]} == {1: YEARS, 2: YEARS}
+    assert "shards/rankings/1/2019.json" in manifest["shards"]
+    for rel, entry in manifest["shards"].items():
+        data = (out_dir / rel).read_bytes()
+        assert entry == {"bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+        assert gzip.decompress((out_dir / (rel + ".gz")).read_bytes()) == data
+    assert set(shard_files(out_dir)) == manifest_files(out_dir, manifest)
+
+
+def test_unchanged_shards_are_not_rewritten(db_path, replay, tmp_path, monkeypatch):
+    out_dir = tmp_path / "data"
+    server = replay()
+    first = export_from(monkeypatch, server, db_path, out_dir, YEARS)
+    files = shard_files(out_dir)
+    for path in files.values():
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    before = {rel: (p.stat().st_mtime_ns, p.read_bytes()) for rel, p in files.items()}
+
+    second = export_from(monkeypatch, server, db_path, out_dir, YEARS)
+    assert second == first
+    assert {rel: (p.stat().st_mtime_ns, p.read_bytes()) for rel, p in shard_files(out_dir).items()} == before
+
+
+def test_shards_no_longer_produced_are_removed(replay, tmp_path, monkeypatch):
+    out_dir = tmp_path / "data"
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "http_cache")
+    server = replay()
+    for name, years in [("both.db", YEARS), ("first.db", YEARS[:1])]:
+        path = tmp_path / name
+        monkeypatch.setattr(init_db, "DB_PATH", path)
+        init_db.init_db()
+        manifest = export_from(monkeypatch, server, path, out_dir, years)
+
+    gone = [f"shards/rankings/{pk}/{YEARS[1]}.json" for pk in (1, 2)]
+    assert not set(gone) & set(manifest["shards"])
+    assert {p["poll_pk"]: p["seasons"] for p in manifest["polls"]} == {1: YEARS[:1], 2: YEARS[:1]}
+    for rel in gone:
+        path = out_dir / rel
+        assert not path.exists()
+        assert not any(p.exists() for p in [path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")])
+    assert set(shard_files(out_dir)) == manifest_files(out_dir, manifest)
@@ -0,0 +1,113 @@
+import pytest
+
+import backfill
+import cache
+import init_db
+from conftest import YEARS
+from espn import ESPNClient
+from metrics import COUNT_BUCKETS, METRICS, Metrics
+
+from test_backfill import run
+
+# counters that describe the ingest itself, not how it was split into processes: the team fetches
+# and shard-db lookups of a sharded run are per worker
+RUN_COUNTERS = ("db_rows_written_total", "team_identity_total", "weeks_")
+
+
+def sample() -> Metrics:
+    metrics = Metrics()
+    metrics.inc("http_requests_total", endpoint="week", status=200)
+    metrics.inc("http_requests_total", 2, endpoint="week", status=200)
+    metrics.inc("http_requests_total", endpoint="team", status=503)
+    metrics.max_gauge("writer_queue_depth_max", 3)
+    metrics.max_gauge("writer_queue_depth_max", 1)
+    for value in (0.002, 0.003, 0.2):
+        metrics.observe("http_request_seconds", value, endpoint="week")
+    metrics.observe("writer_batch_weeks", 5, buckets=COUNT_BUCKETS)
+    return metrics
+
+
+def test_registry():
+    metrics = sample()
+    assert metrics.counter_total("http_requests_total") == 4
+    assert metrics.counter_total("http_requests_total", endpoint="week") == 3
+    assert metrics.counter_total("http_requests_total", status=503) == 1
+    assert metrics.counter_total("missing_total") == 0
+
+    report = metrics.report()
+    assert report["gauges"]["writer_queue_depth_max"] == [{"labels": {}, "value": 3}]
+    hist = report["histograms"]["http_request_seconds"][0]
+    assert hist["labels"] == {"endpoint": "week"}
+    assert hist["value"]["count"] == 3
+    assert hist["value"]["p50"] == 0.005   # bucket upper bounds
+    assert hist["value"]["p95"] == 0.25
+    assert hist["value"]["max"] == 0.2
+    assert hist["value"]["sum"] == pytest.approx(0.205)
+    assert report["histograms"]["writer_batch_weeks"][0]["value"]["buckets"]["8"] == 1
+
+
+def test_prometheus_output():
+    metrics = Metrics()
+    metrics.inc("http_requests_total", 2, endpoint="week", status=200)
+    metrics.set_gauge("writer_queue_depth_max", 4)
+    metrics.observe("writer_batch_weeks", 1, buckets=(1, 2))
+    metrics.observe("writer_batch_weeks", 3, buckets=(1, 2))
+    assert metrics.to_prometheus() == "\n".join([
+        "# TYPE rank_history_http_requests_total counter",
+        'rank_history_http_requests_total{endpoint="week",status="200"} 2',
+        "# TYPE rank_history_writer_queue_depth_max gauge",
+        "rank_history_writer_queue_depth_max 4",
+        "# TYPE rank_history_writer_batch_weeks histogram",
+        'rank_history_writer_batch_weeks_bucket{le="1"} 1',
+        'rank_history_writer_batch_weeks_bucket{le="2"} 1',
+        'rank_history_writer_batch_weeks_bucket{le="+Inf"} 2',
+        "rank_history_writer_batch_weeks_sum 4.0",
+        "rank_history_writer_batch_weeks_count 2",
+    ]) + "\n"
+
+
+def test_merge_adds_counters_and_histograms():
+    merged = sample()
+    merged.merge(sample().report())
+    report, single = merged.report(), sample().report()
+    assert merged.counter_total("http_requests_total", endpoint="week") == 6
+    assert report["gauges"] == single["gauges"]   # gauges keep the maximum
+    hist, one = report["histograms"]["http_request_seconds"][0]["value"], \
+        single["histograms"]["http_request_seconds"][0]["value"]
+    assert hist["count"] == 2 * one["count"]
+    assert hist["buckets"] == {bound: 2 * n for bound, n in one["buckets"].items()}
+    assert hist["max"] == one["max"]
+
+    http_only = Metrics()
+    http_only.merge(sample().report(), prefixes=("http_",))
+    assert set(http_only.report()["counters"]) == {"http_requests_total"}
+    assert set(http_only.report()["histograms"]) == {"http_request_seconds"}
+    assert http_only.report()["gauges"] == {}
+
+
+def run_counters(report):
+    return {name: series for name, series in report["counters"].items() if name.startswith(RUN_COUNTERS)}
+
+
+def test_sharded_run_reports_the_serial_counters(db_path, tmp_path, replay, monkeypatch):
+    server = replay()
+    run(backfill.main, YEARS, [1, 2], rate_limit=None, base_url=server.api_url(ESPNClient.BASE_URL))
+    serial = METRICS.report()
+
+    sharded_path = tmp_path / "sharded" / "college.db"
+    monkeypatch.setattr(init_db, "DB_PATH", sharded_path)
+    monkeypatch.setattr(backfill, "DB_PATH", sharded_path)
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "sharded" / "http_cache")
+    init_db.init_db()
+    METRICS.reset()
+    run(backfill.main, YEARS, [1, 2], rate_limit=None, processes=2, base_url=server.api_url(ESPNClient.BASE_URL))
+    sharded = METRICS.report()
+
+    assert run_counters(sharded) == run_counters(serial)
+    assert METRICS.counter_total("weeks_written_total") == 12
+    assert METRICS.counter_total("db_rows_written_total") == 72
+    # listings and weeks are fetched once either way; team documents once per worker
+    for endpoint in ("listing", "week"):
+        assert (METRICS.counter_total("http_requests_total", endpoint=endpoint)
+                == sum(s["value"] for s in serial["counters"]["http_requests_total"]
+                       if s["labels"]["endpoint"] == endpoint))
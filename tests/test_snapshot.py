@@ -0,0 +1,64 @@
+import sqlite3
+import struct
+
+import pytest
+
+import backfill
+from conftest import YEARS
+from espn import ESPNClient
+
+np = pytest.importorskip("numpy")
+analytics = pytest.importorskip("analytics")
+snapshot = pytest.importorskip("snapshot")
+
+
+@pytest.fixture
+def ingested(db_path, replay, tmp_path):
+    """(connection, snapshot path) of the ingested replay fixtures, with some NULL points and trends."""
+    backfill.main(YEARS, [1, 2], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE ranking SET ranking_points = NULL WHERE ranking_pk % 7 = 0")
+    conn.execute("UPDATE ranking SET ranking_trend = CASE WHEN ranking_pk % 3 THEN ranking_pk % 5 - 2 END")
+    conn.commit()
+    path = tmp_path / "rankings.snap"
+    snapshot.write_snapshot(conn, path)
+    yield conn, path
+    conn.close()
+
+
+def test_snapshot_frame_equals_db_frame(ingested):
+    conn, path = ingested
+    expected = analytics.RankingFrame.from_db(conn)
+    with snapshot.Snapshot.open(path) as snap:
+        frame = analytics.RankingFrame.from_snapshot(snap)
+
+        assert set(frame.columns) == set(expected.columns)
+        for name, values in expected.columns.items():
+            assert frame.columns[name].dtype == values.dtype, name
+            np.testing.assert_array_equal(frame.columns[name], values, err_msg=name)   # NaN == NaN here
+        assert np.isnan(frame.columns["points"]).any() and np.isnan(frame.columns["trend"]).any()
+        for names in ("poll_names", "season_type_names", "team_names", "team_abbreviations", "school_names"):
+            assert getattr(frame, names) == getattr(expected, names), names
+
+        for view, compute in analytics.VIEWS.items():
+            assert compute(frame)[1] == compute(expected)[1], view
+
+
+def corrupt(path, offset: int, data: bytes):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def test_wrong_magic_is_rejected(ingested):
+    _, path = ingested
+    corrupt(path, 0, b"NOTSNAP\0")
+    with pytest.raises(ValueError, match="not a rankings snapshot"):
+        snapshot.Snapshot.open(path)
+
+
+def test_wrong_version_is_rejected(ingested):
+    _, path = ingested
+    corrupt(path, len(snapshot.MAGIC), struct.pack("<I", snapshot.VERSION + 1))
+    with pytest.raises(ValueError, match=f"Unsupported snapshot version {snapshot.VERSION + 1}"):
+        snapshot.Snapshot.open(path)
@@ -0,0 +1,107 @@
+import json
+import sqlite3
+
+import pytest
+
+import backfill
+from conftest import YEARS
+from espn import ESPNClient
+from summaries import UNRANKED, refresh_summaries
+
+TRAJECTORY = """
+    SELECT p.poll_pk, v.season_year, v.team_pk, v.ranks, v.deltas, v.weeks_ranked, v.peak_rank, v.peak_week_index,
+           v.trough_rank, v.final_rank, v.trend_mismatches
+    FROM v_team_trajectory v
+    JOIN poll p ON v.poll_name = p.poll_name
+"""
+
+
+def expected_trajectories(conn):
+    """The v_team_trajectory columns, computed straight from ranking."""
+    rows = conn.execute("""
+        SELECT r.ranking_poll_fk, s.season_year, w.week_season_type_fk, w.week_number, r.ranking_team_fk,
+               r.ranking_current_rank, r.ranking_trend
+        FROM ranking r
+        JOIN week w   ON r.ranking_week_fk = w.week_pk
+        JOIN season s ON w.week_season_fk = s.season_pk
+    """).fetchall()
+    weeks, ranked = {}, {}
+    for poll, year, season_type, week, team, rank, trend in rows:
+        weeks.setdefault((poll, year), set()).add((season_type, week))
+        ranked[(poll, year, team, season_type, week)] = (rank, trend)
+
+    expected = {}
+    for (poll, year, team) in {(poll, year, team) for poll, year, _, _, team, _, _ in rows}:
+        calendar = sorted(weeks[(poll, year)])
+        path = [ranked.get((poll, year, team, *week), (UNRANKED, None)) for week in calendar]
+        ranks = [rank for rank, _ in path]
+        deltas = [None] + [ranks[i - 1] - ranks[i] for i in range(1, len(ranks))]
+        first = next(i for i, rank in enumerate(ranks) if rank != UNRANKED)
+        mismatches = sum(1 for i in range(1, len(ranks))
+                         if UNRANKED not in (ranks[i - 1], ranks[i]) and path[i][1] is not None
+                         and path[i][1] != deltas[i])
+        expected[(poll, year, team)] = (
+            ranks, deltas, sum(rank != UNRANKED for rank in ranks), min(ranks), ranks.index(min(ranks)),
+            max(ranks[first:]), ranks[-1], mismatches,
+        )
+    return expected
+
+
+@pytest.fixture
+def ingested(db_path, replay):
+    backfill.main(YEARS, [1, 2], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def actual_trajectories(conn):
+    return {(poll, year, team): (json.loads(ranks), json.loads(deltas), *rest)
+            for poll, year, team, ranks, deltas, *rest in conn.execute(TRAJECTORY)}
+
+
+def test_trajectories_match_the_rankings(ingested):
+    actual = actual_trajectories(ingested)
+    assert actual == expected_trajectories(ingested)
+    # 2 polls x 2 seasons x 6 teams, ranked every week of the archive
+    assert len(actual) == 24
+    assert all(weeks_ranked == 3 for _, _, weeks_ranked, *_ in actual.values())
+
+
+def test_trajectories_with_gaps_and_trends(ingested):
+    # a team missing from a middle week (and so unranked there), and ESPN trends of which some agree
+    # with the derived delta and some do not
+    team, week = ingested.execute("""
+        SELECT r.ranking_team_fk, r.ranking_week_fk
+        FROM ranking r
+        JOIN week w ON r.ranking_week_fk = w.week_pk
+        WHERE r.ranking_poll_fk = 1 AND w.week_season_type_fk = 2
+        ORDER BY r.ranking_pk LIMIT 1
+    """).fetchone()
+    ingested.execute("DELETE FROM ranking WHERE ranking_poll_fk = 1 AND ranking_team_fk = ? AND ranking_week_fk = ?",
+                     (team, week))
+    ingested.execute("UPDATE ranking SET ranking_trend = (ranking_pk % 5) - 2")
+    # the archive has one week per season type, so the previous poll week is the previous season type
+    ingested.execute("""
+        UPDATE ranking SET ranking_trend = (
+            SELECT prev.ranking_current_rank - ranking.ranking_current_rank
+            FROM ranking prev
+            JOIN week pw ON prev.ranking_week_fk = pw.week_pk
+            JOIN week w  ON ranking.ranking_week_fk = w.week_pk
+            WHERE prev.ranking_poll_fk = ranking.ranking_poll_fk AND prev.ranking_team_fk = ranking.ranking_team_fk
+              AND pw.week_season_fk = w.week_season_fk AND pw.week_season_type_fk = w.week_season_type_fk - 1
+        )
+        WHERE ranking_pk % 2 = 0
+    """)
+    ingested.commit()
+    refresh_summaries(ingested)
+
+    actual = actual_trajectories(ingested)
+    expected = expected_trajectories(ingested)
+    assert actual == expected
+    gap = [t for key, t in actual.items() if key[:1] == (1,) and key[2] == team and UNRANKED in t[0]]
+    assert len(gap) == 1
+    assert gap[0][0][1] == UNRANKED and gap[0][2] == 2 and gap[0][5] == UNRANKED   # trough counts the gap
+    mismatches = sum(t[-1] for t in actual.values())
+    checked = ingested.execute("SELECT SUM(team_trajectory_trend_checked) FROM team_trajectory").fetchone()[0]
+    assert 0 < mismatches < checked
@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+
+import backfill
+import verify
+from conftest import YEARS
+from espn import ESPNClient
+
+
+@pytest.fixture
+def conn(db_path, replay):
+    backfill.main(YEARS, [1], rate_limit=None, base_url=replay().api_url(ESPNClient.BASE_URL))
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def test_backfilled_rankings_verify(conn):
+    report = verify.verify(conn)
+    assert report.ok
+    assert not any(report.problems.values())
+    report.raise_if_failed()
+
+
+def test_corrupted_rankings_fail(conn):
+    week_fk, team_fk = conn.execute(
+        "SELECT ranking_week_fk, ranking_team_fk FROM ranking WHERE ranking_current_rank = 2 LIMIT 1"
+    ).fetchone()
+    # the second-ranked team moves to rank 4 with more points than the leader, and is listed twice
+    conn.execute("""
+        UPDATE ranking SET ranking_current_rank = 4, ranking_points = 5000
+        WHERE ranking_week_fk = ? AND ranking_team_fk = ?
+    """, (week_fk, team_fk))
+    conn.execute("""
+        INSERT INTO ranking (ranking_poll_fk, ranking_week_fk, ranking_team_fk, ranking_current_rank, ranking_points,
+                             ranking_first_place_votes, ranking_record_wins, ranking_record_losses, ranking_trend)
+        SELECT ranking_poll_fk, ranking_week_fk, ranking_team_fk, 7, 0, 0, 0, 0, 0
+        FROM ranking WHERE ranking_week_fk = ? AND ranking_team_fk = ?
+    """, (week_fk, team_fk))
+
+    report = verify.verify(conn)
+    assert not report.ok
+    assert set(report.errors) == {"rank_sequence", "duplicate_team", "points_order", "first_place_votes"}
+    with pytest.raises(verify.VerificationError):
+        report.raise_if_failed()
+
+
+def test_checks_only_the_given_seasons(conn):
+    conn.execute("""
+        UPDATE ranking SET ranking_current_rank = 9
+        WHERE ranking_week_fk IN (SELECT w.week_pk FROM week w JOIN season s ON w.week_season_fk = s.season_pk
+                                  WHERE s.season_year = 2018)
+          AND ranking_current_rank = 1
+    """)
+    assert verify.verify(conn, [2019]).ok
+    assert not verify.verify(conn, [2018]).ok
+
+
+def test_failed_verification_leaves_seasons_stale_until_they_pass(conn, db_path):
+    import cli
+    from summaries import refresh_verified, stale_seasons
+
+    first_week_rank = """
+        SELECT ts.team_season_start_rank FROM team_season ts
+        JOIN team t ON ts.team_season_team_fk = t.team_pk
+        WHERE ts.team_season_season_year = 2019 AND t.team_name = 'USC'
+    """
+    before = conn.execute(first_week_rank).fetchone()[0]
+    # an ingest that changed 2019 (USC drops out of its first week) and broke the rank sequence
+    week_fk = conn.execute(
+        "SELECT poll_season_first_week_fk FROM poll_season WHERE poll_season_season_year = 2019"
+    ).fetchone()[0]
+    conn.execute("""
+        DELETE FROM ranking WHERE ranking_week_fk = ?
+          AND ranking_team_fk = (SELECT team_pk FROM team WHERE team_name = 'USC')
+    """, (week_fk,))
+    conn.execute("UPDATE ranking SET ranking_current_rank = 9 WHERE ranking_week_fk = ? AND ranking_current_rank = 1",
+                 (week_fk,))
+    conn.commit()
+
+    assert not refresh_verified(conn, [2019]).ok
+    assert stale_seasons(conn) == {2019}
+    assert conn.execute(first_week_rank).fetchone()[0] == before   # not refreshed
+
+    # fixed by hand: the next backfill has nothing to fetch, but still refreshes the stale season
+    conn.execute("UPDATE ranking SET ranking_current_rank = 1 WHERE ranking_week_fk = ? AND ranking_current_rank = 9",
+                 (week_fk,))
+    conn.commit()
+    assert cli.main(["backfill", "--db", str(db_path), "--years", "2018-2019", "--polls", "1",
+                     "--report", str(db_path.parent / "report.json")]) == 0
+    assert stale_seasons(conn) == set()
+    assert conn.execute(first_week_rank).fetchone()[0] == 26